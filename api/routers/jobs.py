@@ -1,12 +1,24 @@
 # api/routers/jobs.py
-from fastapi import APIRouter, Depends, Query
+import base64
+import binascii
+import uuid
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import text as sql, bindparam, Text, Integer
+from sqlalchemy import text as sql, bindparam, Integer, DateTime
+from sqlalchemy.dialects.postgresql import ARRAY
+from api.services.counts import COUNTS
+from api.services.skills import parse_terms, resolve_skills, text_terms
 from db.session import SessionLocal
 
 
 router = APIRouter(tags=["jobs"])
 
+# sort key of the listing; matches the jobs_active_ts_idx expression, so
+# "newest first after <cursor>" is an index range scan (created_at is naive UTC)
+SORT_TS = "COALESCE(j.posted_at, j.created_at AT TIME ZONE 'UTC')"
+
 def get_db():
     db = SessionLocal()
     try:
@@ -16,18 +28,38 @@ def get_db():
 
 @router.get("/jobs")
 def list_jobs(
-    q: str = Query("", description="Free-text search over title/company/desc/url"),
+    q: str = Query("", description="Full-text search over title/company/description (web search syntax: \"exact phrase\", -word, or)"),
     city: str | None = Query(None, description="Normalized city (e.g., 'Remote, US', 'London, UK')"),
     mode: str | None = Query(None, description="'Remote' | 'Hybrid' | 'On-site' | 'In-Office'"),
-    skill: str = Query("", description="Simple contains match on description or job_skills.skill"),
+    skill: str = Query("", description="Comma-separated skills: canonical name, alias or category (e.g. 'python, sql')"),
+    skill_match: str = Query("all", pattern="^(all|any)$", description="'all' skills must match, or 'any' of them"),
     days: int = Query(90, ge=1, le=3650),
     page: int = Query(1, ge=1),
+    cursor: str | None = Query(None, description="`next_cursor` of the previous page (newest sort); replaces `page`"),
     page_size: int = Query(20, ge=1, le=100),
+    sort: str = Query("newest", pattern="^(relevance|newest)$", description="'relevance' ranks `q` matches; 'newest' by date"),
+    with_total: bool = Query(True, description="Include the number of matches; false returns total=null"),
     db: Session = Depends(get_db),
 ):
     """
-    Jobs with normalized city + mode; respects Mode and City filters
-    and returns newest first.
+    Jobs filtered by normalized city and mode (jobs.city_norm / mode_norm,
+    set at ingest and indexed), newest first. `q` goes through the
+    jobs.search_tsv GIN index; with sort=relevance, matches are ranked by
+    ts_rank_cd (title hits weigh most, then company, then description).
+    A `q` of stopwords only ("the", "it") gives an empty tsquery, which
+    matches no row, so it is ignored like an empty `q`.
+
+    Newest-first pages carry `next_cursor`: pass it back as `cursor` to get
+    the following page by keyset (sort key, job_id) instead of OFFSET, so
+    deep pages cost the same as the first one. Relevance pages use `page`.
+
+    `total` comes from api.services.counts: cached per filter set, and a
+    planner estimate (total_is_estimate=true) when the filters are broad.
+
+    Each `skill` term is resolved to skill_ids once (api.services.skills) and
+    matched on the job_skills (skill_id, job_id) index; a term that names no
+    known skill falls back to the search_tsv index when the text parser keeps
+    it whole, and matches nothing otherwise.
     """
 
     # Canonicalize Mode from UI strings
@@ -41,161 +73,109 @@ def list_jobs(
         elif m == "hybrid":
             mode_canon = "Hybrid"
 
-    q_like = f"%{q.strip()}%" if q else "%"
-    skill_like = f"%{skill.strip()}%" if skill else "%"
-    offset = (page - 1) * page_size
-
-    stmt = sql("""
-    WITH base AS (
-      SELECT
-        j.job_id,
-        j.title,
-        j.company,
-        j.city,
-        j.region,
-        j.country,
-        j.posted_at,
-        j.created_at,
-        j.url,
-        COALESCE(j.remote_flag, false)         AS remote_flag_src,
-        COALESCE(j.description_text, '')       AS description,
-        /* single “newest” sort key (uses posted_at first, then created_at) */
-        COALESCE(j.posted_at, j.created_at)    AS ts
-      FROM jobs j
-      WHERE COALESCE(j.posted_at, j.created_at) >= (NOW() - (:days || ' days')::interval)
-    ),
-    loc_base AS (
-      SELECT
-        job_id, title, company, city, region, country, posted_at, created_at, url, remote_flag_src, description, ts,
-        LOWER(COALESCE(city,''))   AS city_l,
-        UPPER(COALESCE(region,'')) AS region_u,
-        CASE WHEN UPPER(COALESCE(country,''))='GB' THEN 'UK' ELSE UPPER(COALESCE(country,'')) END AS country_u
-      FROM base
-    ),
-    flags AS (
-      SELECT
-        *,
-        (city_l ~* '\\y(remote|distributed|home\\s*based)\\y') AS has_remote_kw,
-        (city_l ~* '\\yhybrid\\y')                            AS has_hybrid_kw
-      FROM loc_base
-    ),
-    step1 AS (
-      SELECT
-        job_id, title, company, region_u, country_u, posted_at, created_at, url, remote_flag_src, description, ts,
-        has_remote_kw, has_hybrid_kw,
-        REGEXP_REPLACE(city_l, '\s*\((remote|hybrid|in-?office|distributed|home\s*based)\)\s*$', '', 'i') AS s1
-      FROM flags
-    ),
-    step2 AS (
-      SELECT
-        job_id, title, company, region_u, country_u, posted_at, created_at, url, remote_flag_src, description, ts,
-        has_remote_kw, has_hybrid_kw,
-        REGEXP_REPLACE(s1,'^\\s*(remote|hybrid|in-?office|office|distributed|home\\s*based)\\y\\s*([-—–:,/]|to|and)?\\s*', '','i') AS s2      
-      FROM step1
-    ),
-    tokens AS (
-      SELECT
-        job_id, title, company, region_u, country_u, posted_at, created_at, url, remote_flag_src, description, ts,
-        has_remote_kw, has_hybrid_kw,
-        NULLIF(TRIM(SUBSTRING(s2 FROM '^[^,;/|]+')), '') AS ccity_raw
-      FROM step2
-    ),
-    city_like AS (
-      SELECT
-        *,
-        NOT COALESCE(
-          ccity_raw ~* '^(us|usa|united\\s*states|uk|gb|de|germany|in|india|ca|canada|au|australia|nz|new\\s*zealand|eu|europe|emea|apac|na|latam|global|worldwide|anywhere|remote)$',
-          FALSE
-        ) AS is_city
-      FROM tokens
-    ),
-    norm AS (
-      SELECT
-        job_id, title, company, posted_at, created_at, url, region_u, country_u, description, ts,
-        CASE
-          WHEN is_city AND country_u='US' AND region_u ~ '^[A-Z]{2}$' THEN INITCAP(ccity_raw) || ', ' || region_u
-          WHEN is_city AND country_u<>''                             THEN INITCAP(ccity_raw) || ', ' || country_u
-          WHEN is_city                                              THEN INITCAP(ccity_raw)
-          WHEN NOT is_city AND has_remote_kw AND country_u<>''      THEN 'Remote, ' || country_u
-          WHEN NOT is_city AND has_remote_kw                        THEN 'Remote'
-          WHEN region_u<>'' AND country_u<>''                       THEN INITCAP(region_u) || ', ' || country_u
-          WHEN region_u<>''                                         THEN INITCAP(region_u)
-          WHEN country_u<>''                                        THEN country_u
-          ELSE NULL
-        END::text AS city_norm,
-        CASE
-          WHEN remote_flag_src OR has_remote_kw THEN 'Remote'
-          WHEN has_hybrid_kw                    THEN 'Hybrid'
-          ELSE 'On-site'
-        END::text AS mode_norm,
-        (remote_flag_src OR has_remote_kw) AS remote_flag
-      FROM city_like
-    ),
-    filtered AS (
-      SELECT *
-      FROM norm
-      WHERE
-        (:q = '' OR title ILIKE :q_like OR company ILIKE :q_like OR description ILIKE :q_like OR url ILIKE :q_like)
-        AND (
-          :skill = ''
-          OR EXISTS (
-          SELECT 1 FROM job_skills js 
-          JOIN skills s ON s.skill_id = js.skill_id
-          WHERE js.job_id = norm.job_id 
-            AND (
-            s.name_canonical ILIKE :skill_like
-            OR s.category ILIKE :skill_like
-            OR s.aliases_json::text ILIKE :skill_like
-            )
-          )
-          OR description ILIKE :skill_like
-        )
-        AND (NULLIF(:mode_canon, '') IS NULL OR mode_norm = :mode_canon)
-        AND (NULLIF(:city, '')       IS NULL OR city_norm  = :city)
-    )
+    q = q.strip()
+    if q and not db.scalar(sql("SELECT numnode(websearch_to_tsquery('english', :q))"), {"q": q}):
+        q = ""
+    relevance = sort == "relevance" and bool(q)
+    after = _decode_cursor(cursor) if cursor and not relevance else None
+    offset = 0 if after else (page - 1) * page_size
+
+    # only the filters in use go into the query, so city/mode hit their indexes
+    where = [
+        "j.active",
+        f"{SORT_TS} >= (NOW() - (:days || ' days')::interval)",
+    ]
+    params = {"days": days, "q": q, "mode_canon": mode_canon, "city": city}
+    binds = [bindparam("days", type_=Integer())]
+    if q:
+        where.append("j.search_tsv @@ websearch_to_tsquery('english', :q)")
+    terms = parse_terms(skill)
+    if terms:
+        skill_ids = resolve_skills(db, terms)
+        searchable = text_terms(db, [t for t in terms if not skill_ids[t]])
+        matches, any_ids = [], []
+        for i, term in enumerate(terms):
+            if not skill_ids[term] and term not in searchable:
+                matches.append("false")  # the tsquery would drop part of the term ("c++" → 'c')
+            elif not skill_ids[term]:
+                params[f"skill_text_{i}"] = term
+                matches.append(f"j.search_tsv @@ plainto_tsquery('english', :skill_text_{i})")
+            elif skill_match == "any":
+                any_ids += skill_ids[term]
+            else:
+                params[f"skill_ids_{i}"] = skill_ids[term]
+                binds.append(bindparam(f"skill_ids_{i}", type_=ARRAY(Integer())))
+                matches.append(f"j.job_id IN (SELECT js.job_id FROM job_skills js WHERE js.skill_id = ANY(:skill_ids_{i}))")
+        if any_ids:
+            params["skill_ids_any"] = sorted(set(any_ids))
+            binds.append(bindparam("skill_ids_any", type_=ARRAY(Integer())))
+            matches.append("j.job_id IN (SELECT js.job_id FROM job_skills js WHERE js.skill_id = ANY(:skill_ids_any))")
+        if skill_match == "any":
+            where.append("(" + " OR ".join(matches) + ")")
+        else:
+            where += matches
+    if mode_canon:
+        where.append("j.mode_norm = :mode_canon")
+    if city:
+        where.append("j.city_norm = :city")
+
+    filters = " AND ".join(where)
+    if after:
+        where.append(f"({SORT_TS}, j.job_id) < (:cursor_ts, CAST(:cursor_id AS uuid))")
+
+    newest = f"{SORT_TS} DESC, j.job_id DESC"
+    if relevance:
+        order = f"ts_rank_cd(j.search_tsv, websearch_to_tsquery('english', :q)) DESC, {newest}"
+    else:
+        order = newest
+
+    params.update({
+        "cursor_ts": after[0] if after else None,
+        "cursor_id": after[1] if after else None,
+        "limit": page_size + 1,  # one extra row tells whether there is a next page
+        "offset": offset,
+    })
+
+    stmt = sql(f"""
     SELECT
-      filtered.job_id::text           AS job_id,
-      filtered.title,
-      filtered.company,
-      /* return original vendor strings for display */
-      (SELECT city    FROM jobs j2 WHERE j2.job_id = filtered.job_id) AS city,
-      (SELECT region  FROM jobs j2 WHERE j2.job_id = filtered.job_id) AS region,
-      (SELECT country FROM jobs j2 WHERE j2.job_id = filtered.job_id) AS country,
-      filtered.posted_at,
-      filtered.created_at,
-      (SELECT url FROM jobs j2 WHERE j2.job_id = filtered.job_id)     AS url,
-      filtered.remote_flag,
-      COUNT(*) OVER()::int AS total,
-      filtered.ts            -- DEBUG: keep to prove sorting key exists
-    FROM filtered
-    ORDER BY filtered.ts DESC NULLS LAST
-    LIMIT :limit OFFSET :offset;
+      j.job_id::text                  AS job_id,
+      j.title,
+      j.company,
+      j.city,
+      j.region,
+      j.country,
+      j.posted_at,
+      j.created_at,
+      j.url,
+      (j.mode_norm = 'Remote')        AS remote_flag,
+      {SORT_TS}                       AS sort_ts
+    FROM jobs j
+    WHERE {" AND ".join(where)}
+    ORDER BY {order}
+    LIMIT :limit OFFSET :offset
     """).bindparams(
-    bindparam("mode_canon", type_=Text()),
-    bindparam("city",       type_=Text()),
-    bindparam("q",          type_=Text()),
-    bindparam("skill",      type_=Text()),
-    bindparam("limit",      type_=Integer()),
-    bindparam("offset",     type_=Integer()),
-    bindparam("days",       type_=Integer()),
-)
-
-    rows = db.execute(
-        stmt,
-        {
-            "days": days,
-            "q": q.strip(),
-            "q_like": q_like,
-            "skill": skill.strip(),
-            "skill_like": skill_like,
-            "mode_canon": mode_canon,
-            "city": city,
-            "limit": page_size,
-            "offset": offset,
-        },
-    ).mappings().all()
-
-    total = rows[0]["total"] if rows else 0
+        bindparam("limit",  type_=Integer()),
+        bindparam("offset", type_=Integer()),
+        *binds,
+    )
+    if after:
+        stmt = stmt.bindparams(bindparam("cursor_ts", type_=DateTime(timezone=True)))
+
+    rows = db.execute(stmt, params).mappings().all()
+    more = len(rows) > page_size
+    rows = rows[:page_size]
+
+    next_cursor = None
+    if more and not relevance:
+        next_cursor = _encode_cursor(rows[-1]["sort_ts"], rows[-1]["job_id"])
+
+    total, total_is_estimate = None, False
+    if with_total:
+        # filters only: the cursor narrows the page, not the match count
+        total, total_is_estimate = COUNTS.count(
+            db, "jobs j", filters, params, binds=binds,
+        )
+
     items = [
         {
             "job_id": r["job_id"],
@@ -211,4 +191,25 @@ def list_jobs(
         }
         for r in rows
     ]
-    return {"total": total, "page": page, "page_size": page_size, "items": items}
+    return {
+        "total": total,
+        "total_is_estimate": total_is_estimate,
+        "page": page,
+        "page_size": page_size,
+        "next_cursor": next_cursor,
+        "items": items,
+    }
+
+
+def _encode_cursor(ts: datetime, job_id: str) -> str:
+    raw = f"{ts.isoformat()}|{job_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        ts, job_id = raw.split("|")
+        return datetime.fromisoformat(ts), str(uuid.UUID(job_id))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="invalid cursor")
@@ -19,23 +19,14 @@ def modes(
     db: Session = Depends(get_db)
 ):
     """
-    Returns counts for { Remote | Hybrid | On-site } from jobs.city text.
+    Returns counts for { Remote | Hybrid | On-site } from jobs.mode_norm
+    (ingest.location_utils.normalize_mode).
     """
     q = sql("""
-      WITH src AS (
-        SELECT LOWER(COALESCE(city,'')) AS city_l FROM jobs
-      ),
-      labeled AS (
-        SELECT CASE
-          WHEN city_l ~ '\\b(remote|distributed|home\\s*based)\\b' THEN 'Remote'
-          WHEN city_l ~ '\\bhybrid\\b' THEN 'Hybrid'
-          ELSE 'On-site'
-        END AS mode
-        FROM src
-      )
-      SELECT mode, COUNT(*)::int AS cnt
-      FROM labeled
-      GROUP BY mode
+      SELECT mode_norm AS mode, COUNT(*)::int AS cnt
+      FROM jobs
+      WHERE active
+      GROUP BY mode_norm
       HAVING COUNT(*) >= :min_count
       ORDER BY cnt DESC, mode;
     """)
@@ -57,7 +57,7 @@ def recommend(db: Session = Depends(get_db)):
       SELECT job_id, title, company, city, region, country, posted_at, created_at, url,
              1 - (embedding <#> :v) AS sim
       FROM jobs
-      WHERE embedding IS NOT NULL
+      WHERE embedding IS NOT NULL AND active
       ORDER BY embedding <#> :v
       LIMIT 200
     """), {"v": vec}).mappings().all()
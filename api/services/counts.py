@@ -0,0 +1,103 @@
+# api/services/counts.py
+"""
+Result totals for the job listing.
+
+A total costs a full pass over the matching rows, which is most of the work
+of a listing request once pages come from the keyset index. CountService
+resolves it in three steps:
+
+1. a cached total for the same filters (the WHERE clause plus the values
+   it binds), fresh for JME_COUNT_TTL_SECONDS;
+2. the planner's row estimate (EXPLAIN, no execution): when it is at least
+   JME_COUNT_ESTIMATE_ABOVE the filters are broad, an exact number would not
+   be read anyway, and the estimate is returned with is_estimate=True;
+3. an exact COUNT(*).
+
+Only totals of at least JME_COUNT_CACHE_MIN rows are cached; smaller ones
+are cheap to recount and stay exact right after an ingest.
+"""
+from __future__ import annotations
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import text as sql
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import BindParameter
+
+COUNT_TTL = float(os.getenv("JME_COUNT_TTL_SECONDS", "60"))
+COUNT_ESTIMATE_ABOVE = int(os.getenv("JME_COUNT_ESTIMATE_ABOVE", "50000"))
+COUNT_CACHE_MIN = int(os.getenv("JME_COUNT_CACHE_MIN", "1000"))
+COUNT_CACHE_SIZE = int(os.getenv("JME_COUNT_CACHE_SIZE", "2048"))  # filter signatures kept
+
+
+def signature(where: str, params: Dict[str, Any]) -> str:
+    """The filters as a cache key: the clause and the values of the params it uses."""
+    used = {k: v for k, v in params.items() if f":{k}" in where}
+    return json.dumps([where, sorted(used.items())], default=str)
+
+
+class CountService:
+    def __init__(self, ttl: float = COUNT_TTL, estimate_above: int = COUNT_ESTIMATE_ABOVE,
+                 cache_min: int = COUNT_CACHE_MIN, maxsize: int = COUNT_CACHE_SIZE,
+                 clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self.estimate_above = estimate_above
+        self.cache_min = cache_min
+        self.maxsize = maxsize
+        self._clock = clock
+        self._cache: OrderedDict[str, Tuple[float, int, bool]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Tuple[int, bool]]:
+        with self._lock:
+            hit = self._cache.get(key)
+            if hit is None:
+                return None
+            expires, total, is_estimate = hit
+            if expires <= self._clock():
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+            return total, is_estimate
+
+    def put(self, key: str, total: int, is_estimate: bool) -> None:
+        with self._lock:
+            self._cache[key] = (self._clock() + self.ttl, total, is_estimate)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def count(self, db: Session, table: str, where: str, params: Dict[str, Any],
+              binds: Iterable[BindParameter] = ()) -> Tuple[int, bool]:
+        """(total, is_estimate) of `SELECT ... FROM <table> WHERE <where>`."""
+        key = signature(f"{table} WHERE {where}", params)
+        hit = self.get(key)
+        if hit is not None:
+            return hit
+        binds = list(binds)
+
+        plan = db.execute(
+            sql(f"EXPLAIN (FORMAT JSON) SELECT 1 FROM {table} WHERE {where}").bindparams(*binds), params
+        ).scalar_one()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        estimate = int(plan[0]["Plan"]["Plan Rows"])
+        if estimate >= self.estimate_above:
+            self.put(key, estimate, True)
+            return estimate, True
+
+        total = db.execute(sql(f"SELECT COUNT(*) FROM {table} WHERE {where}").bindparams(*binds), params).scalar_one()
+        if total >= self.cache_min:
+            self.put(key, total, False)
+        return total, False
+
+
+COUNTS = CountService()
@@ -0,0 +1,65 @@
+# api/services/skills.py
+"""
+Skill terms → skill_ids for the job listing's skill filter.
+
+A term names a skill by its canonical name, one of its aliases or its
+category ("py", "python", "language"), case-insensitively. Each of the three
+is an expression index on `skills`, so resolving a term is a few index
+probes; the listing then filters on job_skills (skill_id, job_id) instead of
+matching text per job.
+
+A term that names no skill is matched against the search_tsv index instead,
+but only when the text parser keeps it whole: "c++" or "f#" parse to the
+single letter before the symbols, which would match nearly every job, so
+such a term matches nothing.
+"""
+from __future__ import annotations
+from typing import Dict, List, Set
+
+from sqlalchemy import bindparam, text as sql
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import Session
+from sqlalchemy.types import Text
+
+RESOLVE_SQL = sql("""
+SELECT t.term,
+       ARRAY(
+         SELECT s.skill_id FROM skills s
+         WHERE lower(s.name_canonical) = t.term
+            OR lower(s.aliases_json)::jsonb ? t.term
+            OR lower(s.category) = t.term
+         ORDER BY s.skill_id
+       ) AS skill_ids
+FROM unnest(:terms) AS t(term)
+""").bindparams(bindparam("terms", type_=ARRAY(Text())))
+
+# a term survives plainto_tsquery when its tokens, minus the separators and
+# the parts of hyphenated words, spell out the term without its whitespace
+TEXT_TERMS_SQL = sql("""
+SELECT t.term
+FROM unnest(:terms) AS t(term)
+WHERE (SELECT string_agg(p.token, '' ORDER BY p.n)
+       FROM ts_parse('default', t.term) WITH ORDINALITY AS p(tokid, token, n)
+       JOIN ts_token_type('default') tt ON tt.tokid = p.tokid
+       WHERE tt.alias NOT IN ('blank', 'hword_part', 'hword_numpart', 'hword_asciipart'))
+      = regexp_replace(t.term, '\\s+', '', 'g')
+""").bindparams(bindparam("terms", type_=ARRAY(Text())))
+
+
+def parse_terms(value: str) -> List[str]:
+    """ "Python, SQL,, py" → ["python", "sql", "py"] (comma-separated, lowercased, de-duplicated)."""
+    return list(dict.fromkeys(t.strip().lower() for t in value.split(",") if t.strip()))
+
+
+def resolve_skills(db: Session, terms: List[str]) -> Dict[str, List[int]]:
+    """skill_ids per term; a term no skill answers to maps to []."""
+    if not terms:
+        return {}
+    return {term: list(ids) for term, ids in db.execute(RESOLVE_SQL, {"terms": terms})}
+
+
+def text_terms(db: Session, terms: List[str]) -> Set[str]:
+    """The terms plainto_tsquery keeps whole ("node.js", "full-stack"; not "c++")."""
+    if not terms:
+        return set()
+    return set(db.scalars(TEXT_TERMS_SQL, {"terms": terms}))
@@ -0,0 +1,38 @@
+"""jobs.search_tsv: weighted full-text vector (title > company > description) + GIN index
+
+Revision ID: 0b7d4e9a2c15
+Revises: f2a9d6c4b318
+Create Date: 2025-11-19 11:52:40.017366
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0b7d4e9a2c15"
+down_revision: Union[str, Sequence[str], None] = "f2a9d6c4b318"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # STORED generated column: Postgres keeps it current on every insert/update.
+    # Adding it rewrites jobs once (ACCESS EXCLUSIVE for the duration).
+    op.execute("""
+        ALTER TABLE jobs ADD COLUMN IF NOT EXISTS search_tsv tsvector GENERATED ALWAYS AS (
+          setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+          setweight(to_tsvector('english', coalesce(company, '')), 'B') ||
+          setweight(to_tsvector('english', coalesce(description_text, '')), 'C')
+        ) STORED
+    """)
+
+    with op.get_context().autocommit_block():
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS jobs_search_tsv_idx ON jobs USING gin (search_tsv)")
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS jobs_search_tsv_idx")
+    op.execute("ALTER TABLE jobs DROP COLUMN IF EXISTS search_tsv")
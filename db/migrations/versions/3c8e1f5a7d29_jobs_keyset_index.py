@@ -0,0 +1,33 @@
+"""jobs keyset index: (COALESCE(posted_at, created_at), job_id) over active jobs
+
+Revision ID: 3c8e1f5a7d29
+Revises: 0b7d4e9a2c15
+Create Date: 2025-11-21 15:30:12.684905
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3c8e1f5a7d29"
+down_revision: Union[str, Sequence[str], None] = "0b7d4e9a2c15"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # the exact sort key of /api/jobs (api.routers.jobs.SORT_TS), so "newest
+    # first after <cursor>" is one index range scan. created_at is a naive UTC
+    # timestamp; AT TIME ZONE 'UTC' keeps the expression immutable.
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS jobs_active_ts_idx "
+            "ON jobs ((COALESCE(posted_at, created_at AT TIME ZONE 'UTC')) DESC, job_id DESC) WHERE active"
+        )
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS jobs_active_ts_idx")
@@ -0,0 +1,57 @@
+"""unlogged staging tables for bulk job writes
+
+Revision ID: 3f6b2d9c81a4
+Revises: a025be194585
+Create Date: 2025-10-20 10:12:41.318702
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3f6b2d9c81a4"
+down_revision: Union[str, Sequence[str], None] = "a025be194585"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # UNLOGGED: rows only live between COPY and the merge, no need to WAL them.
+    # batch_id lets several writers share the tables without stepping on each other.
+    op.execute("""
+        CREATE UNLOGGED TABLE IF NOT EXISTS jobs_stage (
+          batch_id          uuid        NOT NULL,
+          job_id            uuid        NOT NULL,
+          title             text        NOT NULL,
+          company           text        NOT NULL,
+          city              text,
+          region            text,
+          country           text,
+          posted_at         timestamptz,
+          source            text        NOT NULL,
+          url               text,
+          url_hash          bytea,
+          description_text  text        NOT NULL,
+          desc_hash         bytea,
+          seniority         text,
+          salary_usd_annual numeric
+        )
+    """)
+    op.execute("CREATE INDEX IF NOT EXISTS jobs_stage_batch_idx ON jobs_stage (batch_id)")
+
+    op.execute("""
+        CREATE UNLOGGED TABLE IF NOT EXISTS job_skills_stage (
+          batch_id   uuid    NOT NULL,
+          job_id     uuid    NOT NULL,
+          skill_id   integer NOT NULL,
+          confidence float8  NOT NULL
+        )
+    """)
+    op.execute("CREATE INDEX IF NOT EXISTS job_skills_stage_batch_idx ON job_skills_stage (batch_id)")
+
+def downgrade():
+    op.execute("DROP TABLE IF EXISTS job_skills_stage")
+    op.execute("DROP TABLE IF EXISTS jobs_stage")
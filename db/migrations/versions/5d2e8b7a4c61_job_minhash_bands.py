@@ -0,0 +1,42 @@
+"""MinHash signatures and LSH band index for near-duplicate postings
+
+Revision ID: 5d2e8b7a4c61
+Revises: 7c1e4a2f9b30
+Create Date: 2025-10-29 14:12:47.208311
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5d2e8b7a4c61"
+down_revision: Union[str, Sequence[str], None] = "7c1e4a2f9b30"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # 128 x uint32 little-endian; NULL until scripts/backfill_minhash.py has run
+    op.execute("ALTER TABLE jobs ADD COLUMN IF NOT EXISTS minhash bytea")
+    op.execute("ALTER TABLE jobs_stage ADD COLUMN IF NOT EXISTS minhash bytea")
+
+    # the PK (band, band_hash, job_id) is the lookup index: probes are
+    # "(band, band_hash) IN (...)" over every band of the incoming postings
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS job_minhash_bands (
+          band      smallint NOT NULL,
+          band_hash bigint   NOT NULL,
+          job_id    uuid     NOT NULL REFERENCES jobs(job_id) ON DELETE CASCADE,
+          PRIMARY KEY (band, band_hash, job_id)
+        )
+    """)
+    # new, empty table: no need for CONCURRENTLY; serves the cascade on job deletes
+    op.execute("CREATE INDEX IF NOT EXISTS job_minhash_bands_job_idx ON job_minhash_bands (job_id)")
+
+def downgrade():
+    op.execute("DROP TABLE IF EXISTS job_minhash_bands")
+    op.execute("ALTER TABLE jobs_stage DROP COLUMN IF EXISTS minhash")
+    op.execute("ALTER TABLE jobs DROP COLUMN IF EXISTS minhash")
@@ -0,0 +1,69 @@
+"""skill filter indexes: skill lookup by name/alias/category, job_skills (skill_id, job_id)
+
+Revision ID: 6e1b9c3f5a28
+Revises: 3c8e1f5a7d29
+Create Date: 2025-11-24 10:12:48.203517
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "6e1b9c3f5a28"
+down_revision: Union[str, Sequence[str], None] = "3c8e1f5a7d29"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# aliases_json is plain text: the ::jsonb cast in skills_aliases_idx would make
+# the whole migration fail on one hand-edited row, so those are reset first
+RESET_BAD_ALIASES_SQL = """
+DO $$
+DECLARE r record;
+BEGIN
+    FOR r IN SELECT skill_id, aliases_json FROM skills LOOP
+        BEGIN
+            PERFORM r.aliases_json::jsonb;
+        EXCEPTION WHEN invalid_text_representation THEN
+            RAISE WARNING 'skills.aliases_json of skill % is not JSON, reset to []', r.skill_id;
+            UPDATE skills SET aliases_json = '[]' WHERE skill_id = r.skill_id;
+        END;
+    END LOOP;
+END $$
+"""
+
+# an interrupted CREATE INDEX CONCURRENTLY leaves an INVALID index behind,
+# which IF NOT EXISTS would then keep
+INVALID_INDEX_SQL = """
+SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+WHERE c.relname = :name AND NOT i.indisvalid
+"""
+
+
+def upgrade():
+    # api.services.skills resolves a term with these three; aliases_json holds
+    # a JSON array of strings, so `lower(aliases_json)::jsonb ? term` is a GIN probe
+    op.execute(RESET_BAD_ALIASES_SQL)
+    op.execute("CREATE INDEX IF NOT EXISTS skills_name_lower_idx ON skills (lower(name_canonical))")
+    op.execute("CREATE INDEX IF NOT EXISTS skills_category_lower_idx ON skills (lower(category))")
+    op.execute("CREATE INDEX IF NOT EXISTS skills_aliases_idx ON skills USING gin ((lower(aliases_json)::jsonb))")
+
+    # skill_id → job_ids as an index-only scan; supersedes job_skills_skill_idx (skill_id)
+    with op.get_context().autocommit_block():
+        if op.get_bind().execute(sa.text(INVALID_INDEX_SQL), {"name": "job_skills_skill_job_idx"}).first():
+            op.execute("DROP INDEX CONCURRENTLY job_skills_skill_job_idx")
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS job_skills_skill_job_idx ON job_skills (skill_id, job_id)"
+        )
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS job_skills_skill_idx")
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS job_skills_skill_idx ON job_skills (skill_id)")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS job_skills_skill_job_idx")
+    op.execute("DROP INDEX IF EXISTS skills_aliases_idx")
+    op.execute("DROP INDEX IF EXISTS skills_category_lower_idx")
+    op.execute("DROP INDEX IF EXISTS skills_name_lower_idx")
@@ -0,0 +1,58 @@
+"""source watermarks, provider job ids and jobs.active
+
+Revision ID: 7c1e4a2f9b30
+Revises: 3f6b2d9c81a4
+Create Date: 2025-10-22 09:41:03.552190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7c1e4a2f9b30"
+down_revision: Union[str, Sequence[str], None] = "3f6b2d9c81a4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # provider-side id (Greenhouse job id, Lever posting id); NULL for seed/html rows
+    op.execute("ALTER TABLE jobs ADD COLUMN IF NOT EXISTS external_id text")
+    # constant default: no table rewrite on PG 11+
+    op.execute("ALTER TABLE jobs ADD COLUMN IF NOT EXISTS active boolean NOT NULL DEFAULT true")
+    op.execute("ALTER TABLE jobs ADD COLUMN IF NOT EXISTS closed_at timestamptz")
+    op.execute("ALTER TABLE jobs_stage ADD COLUMN IF NOT EXISTS external_id text")
+
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS source_state (
+          source          text        PRIMARY KEY,
+          last_updated_at timestamptz,
+          job_ids         text[]      NOT NULL DEFAULT '{}',
+          updated_at      timestamptz NOT NULL DEFAULT now()
+        )
+    """)
+
+    with op.get_context().autocommit_block():
+        # closing postings of one board
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS jobs_source_external_idx "
+            "ON jobs (source, external_id) WHERE external_id IS NOT NULL"
+        )
+        # read endpoints only list live postings, newest first
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS jobs_active_recent_idx "
+            "ON jobs (posted_at DESC NULLS LAST, created_at DESC) WHERE active"
+        )
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS jobs_active_recent_idx")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS jobs_source_external_idx")
+    op.execute("DROP TABLE IF EXISTS source_state")
+    op.execute("ALTER TABLE jobs_stage DROP COLUMN IF EXISTS external_id")
+    op.execute("ALTER TABLE jobs DROP COLUMN IF EXISTS closed_at")
+    op.execute("ALTER TABLE jobs DROP COLUMN IF EXISTS active")
+    op.execute("ALTER TABLE jobs DROP COLUMN IF EXISTS external_id")
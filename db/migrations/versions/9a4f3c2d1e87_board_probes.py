@@ -0,0 +1,34 @@
+"""board_probes: cached board-slug lookups per provider
+
+Revision ID: 9a4f3c2d1e87
+Revises: 5d2e8b7a4c61
+Create Date: 2025-11-04 10:27:15.640218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9a4f3c2d1e87"
+down_revision: Union[str, Sequence[str], None] = "5d2e8b7a4c61"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # one row per probed (provider, slug): hits and misses, each with its own TTL
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS board_probes (
+          provider   text        NOT NULL,
+          slug       text        NOT NULL,
+          found      boolean     NOT NULL,
+          checked_at timestamptz NOT NULL DEFAULT now(),
+          PRIMARY KEY (provider, slug)
+        )
+    """)
+
+def downgrade():
+    op.execute("DROP TABLE IF EXISTS board_probes")
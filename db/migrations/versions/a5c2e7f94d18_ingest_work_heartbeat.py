@@ -0,0 +1,28 @@
+"""ingest_work: claims committed up front, kept alive by a heartbeat
+
+Revision ID: a5c2e7f94d18
+Revises: 6e1b9c3f5a28
+Create Date: 2025-11-27 16:05:37.418260
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a5c2e7f94d18"
+down_revision: Union[str, Sequence[str], None] = "6e1b9c3f5a28"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # a claimed row is status 'claimed' + worker; a claim whose heartbeat goes
+    # stale is handed to the next worker (ingest.work_queue)
+    op.execute("ALTER TABLE ingest_work ADD COLUMN IF NOT EXISTS heartbeat_at timestamptz")
+
+def downgrade():
+    op.execute("UPDATE ingest_work SET status = 'queued', worker = NULL WHERE status = 'claimed'")
+    op.execute("ALTER TABLE ingest_work DROP COLUMN IF EXISTS heartbeat_at")
@@ -0,0 +1,52 @@
+"""ingest run ledger: ingest_runs + ingest_stage_stats
+
+Revision ID: b7e2d5f1a093
+Revises: 9a4f3c2d1e87
+Create Date: 2025-11-10 16:05:32.118406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b7e2d5f1a093"
+down_revision: Union[str, Sequence[str], None] = "9a4f3c2d1e87"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS ingest_runs (
+          run_id           uuid        PRIMARY KEY,
+          source           text        NOT NULL,
+          status           text        NOT NULL,
+          error            text,
+          started_at       timestamptz NOT NULL,
+          finished_at      timestamptz,
+          seconds          double precision NOT NULL DEFAULT 0,
+          bytes_downloaded bigint      NOT NULL DEFAULT 0,
+          items_seen       integer     NOT NULL DEFAULT 0,
+          items_skipped    integer     NOT NULL DEFAULT 0,
+          items_added      integer     NOT NULL DEFAULT 0,
+          errors           integer     NOT NULL DEFAULT 0
+        )
+    """)
+    # latest run per source (metrics export) and per-board history
+    op.execute("CREATE INDEX IF NOT EXISTS ingest_runs_source_started_idx ON ingest_runs (source, started_at)")
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS ingest_stage_stats (
+          run_id  uuid NOT NULL REFERENCES ingest_runs(run_id) ON DELETE CASCADE,
+          stage   text NOT NULL,
+          seconds double precision NOT NULL,
+          calls   integer NOT NULL DEFAULT 0,
+          PRIMARY KEY (run_id, stage)
+        )
+    """)
+
+def downgrade():
+    op.execute("DROP TABLE IF EXISTS ingest_stage_stats")
+    op.execute("DROP TABLE IF EXISTS ingest_runs")
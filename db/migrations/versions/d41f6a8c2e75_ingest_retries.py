@@ -0,0 +1,40 @@
+"""ingest_retries: durable retry queue for failed board and posting fetches
+
+Revision ID: d41f6a8c2e75
+Revises: b7e2d5f1a093
+Create Date: 2025-11-12 09:41:07.530214
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d41f6a8c2e75"
+down_revision: Union[str, Sequence[str], None] = "b7e2d5f1a093"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS ingest_retries (
+          source          text        NOT NULL,
+          url             text        NOT NULL,
+          kind            text        NOT NULL,
+          payload         jsonb,
+          attempts        integer     NOT NULL DEFAULT 1,
+          last_error      text,
+          next_attempt_at timestamptz NOT NULL,
+          first_failed_at timestamptz NOT NULL DEFAULT now(),
+          updated_at      timestamptz NOT NULL DEFAULT now(),
+          PRIMARY KEY (source, url)
+        )
+    """)
+    # the retry pass asks for "everything due now"
+    op.execute("CREATE INDEX IF NOT EXISTS ingest_retries_due_idx ON ingest_retries (next_attempt_at)")
+
+def downgrade():
+    op.execute("DROP TABLE IF EXISTS ingest_retries")
@@ -0,0 +1,38 @@
+"""ingest_work: per-batch source claims for sharded ingest workers
+
+Revision ID: e8c3b19d7f42
+Revises: d41f6a8c2e75
+Create Date: 2025-11-13 14:22:51.804417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e8c3b19d7f42"
+down_revision: Union[str, Sequence[str], None] = "d41f6a8c2e75"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS ingest_work (
+          batch       text        NOT NULL,
+          source      text        NOT NULL,
+          status      text        NOT NULL DEFAULT 'queued',
+          worker      text,
+          added       integer,
+          error       text,
+          claimed_at  timestamptz,
+          finished_at timestamptz,
+          created_at  timestamptz NOT NULL DEFAULT now(),
+          PRIMARY KEY (batch, source)
+        )
+    """)
+
+def downgrade():
+    op.execute("DROP TABLE IF EXISTS ingest_work")
@@ -0,0 +1,42 @@
+"""jobs.city_norm / jobs.mode_norm: normalized location and work mode, indexed
+
+Revision ID: f2a9d6c4b318
+Revises: e8c3b19d7f42
+Create Date: 2025-11-17 10:08:26.441930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f2a9d6c4b318"
+down_revision: Union[str, Sequence[str], None] = "e8c3b19d7f42"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # filled at ingest by ingest.location_utils; existing rows by
+    # scripts/backfill_location_norm.py (until then city_norm is NULL and
+    # mode_norm 'On-site')
+    op.execute("ALTER TABLE jobs ADD COLUMN IF NOT EXISTS city_norm text")
+    op.execute("ALTER TABLE jobs ADD COLUMN IF NOT EXISTS mode_norm text NOT NULL DEFAULT 'On-site'")
+    op.execute("ALTER TABLE jobs_stage ADD COLUMN IF NOT EXISTS city_norm text")
+    op.execute("ALTER TABLE jobs_stage ADD COLUMN IF NOT EXISTS mode_norm text")
+
+    with op.get_context().autocommit_block():
+        # every listing/facet query is over active jobs
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS jobs_city_norm_idx ON jobs (city_norm) WHERE active")
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS jobs_mode_norm_idx ON jobs (mode_norm) WHERE active")
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS jobs_mode_norm_idx")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS jobs_city_norm_idx")
+    op.execute("ALTER TABLE jobs_stage DROP COLUMN IF EXISTS mode_norm")
+    op.execute("ALTER TABLE jobs_stage DROP COLUMN IF EXISTS city_norm")
+    op.execute("ALTER TABLE jobs DROP COLUMN IF EXISTS mode_norm")
+    op.execute("ALTER TABLE jobs DROP COLUMN IF EXISTS city_norm")
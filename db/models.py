@@ -5,11 +5,11 @@ import uuid
 import datetime as dt
 from sqlalchemy import (
     Text, String, Boolean, Numeric, DateTime, ForeignKey,
-    Integer, Float, LargeBinary, Index, UniqueConstraint
+    Integer, Float, LargeBinary, Index, UniqueConstraint, SmallInteger, BigInteger, Computed
 )
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import UUID, JSONB, TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import ARRAY
+from sqlalchemy import ARRAY, text
 from db.base import Base
 from pgvector.sqlalchemy import Vector
 
@@ -28,6 +28,10 @@ class Job(Base):
 
     remote_flag: Mapped[bool] = mapped_column(Boolean, default=False, server_default="false")
 
+    # ingest.location_utils.normalize_city / normalize_mode, set at ingest
+    city_norm: Mapped[str | None] = mapped_column(Text, nullable=True)  # "San Francisco, CA", "Remote, US"
+    mode_norm: Mapped[str] = mapped_column(Text, default="On-site", server_default="On-site")  # Remote | Hybrid | On-site
+
     salary_min: Mapped[float] = mapped_column(Numeric, default=0.0, server_default="0")
     salary_max: Mapped[float] = mapped_column(Numeric, default=0.0, server_default="0")
     salary_currency: Mapped[str] = mapped_column(Text, default="USD", server_default="USD")
@@ -38,11 +42,24 @@ class Job(Base):
 
     source: Mapped[str] = mapped_column(Text, default="manual", server_default="manual")
     url: Mapped[str | None] = mapped_column(String, unique=True)
+    external_id: Mapped[str | None] = mapped_column(Text, nullable=True)  # provider job id
+
+    active: Mapped[bool] = mapped_column(Boolean, default=True, server_default="true")
+    closed_at: Mapped[dt.datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
 
     description_text: Mapped[str] = mapped_column(Text, default="", server_default="")
 
     url_hash: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)
     desc_hash: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)
+    minhash: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)  # uint32[128] signature
+
+    # /api/jobs?q= full-text search; maintained by Postgres
+    search_tsv: Mapped[str | None] = mapped_column(TSVECTOR, Computed(
+        "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(company, '')), 'B') || "
+        "setweight(to_tsvector('english', coalesce(description_text, '')), 'C')",
+        persisted=True,
+    ))
 
     created_at: Mapped[dt.datetime] = mapped_column(DateTime, default=dt.datetime.utcnow, server_default="now()")
     updated_at: Mapped[dt.datetime] = mapped_column(DateTime, default=dt.datetime.utcnow, onupdate=dt.datetime.utcnow, server_default="now()")
@@ -50,11 +67,116 @@ class Job(Base):
     __table_args__ = (
         UniqueConstraint("url_hash", name="jobs_url_hash_uq"),
         Index("jobs_desc_hash_idx", "desc_hash"),
+        Index("jobs_source_external_idx", "source", "external_id", postgresql_where=text("external_id IS NOT NULL")),
+        Index("jobs_active_recent_idx", text("posted_at DESC NULLS LAST"), text("created_at DESC"),
+              postgresql_where=text("active")),
+        Index("jobs_city_norm_idx", "city_norm", postgresql_where=text("active")),
+        Index("jobs_mode_norm_idx", "mode_norm", postgresql_where=text("active")),
+        Index("jobs_search_tsv_idx", "search_tsv", postgresql_using="gin"),
+        Index("jobs_active_ts_idx", text("(COALESCE(posted_at, created_at AT TIME ZONE 'UTC')) DESC"),
+              text("job_id DESC"), postgresql_where=text("active")),
         # Index("jobs_seniority_idx", "seniority"),
         # Index("jobs_salary_usd_idx", "salary_usd_annual"),
     )
 
 
+class SourceState(Base):
+    """Per-source watermark: newest provider timestamp and the ids seen last run."""
+    __tablename__ = "source_state"
+
+    source: Mapped[str] = mapped_column(Text, primary_key=True)  # e.g. "greenhouse:cloudflare"
+    last_updated_at: Mapped[dt.datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    job_ids: Mapped[list[str]] = mapped_column(ARRAY(Text), default=list, server_default="{}")
+    updated_at: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), server_default="now()")
+
+
+class IngestRun(Base):
+    """One ingest run of one source (ingest.metrics.RunStats)."""
+    __tablename__ = "ingest_runs"
+
+    run_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    source: Mapped[str] = mapped_column(Text, nullable=False)
+    status: Mapped[str] = mapped_column(Text, nullable=False)  # ok | not_modified | error
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    started_at: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    finished_at: Mapped[dt.datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    seconds: Mapped[float] = mapped_column(Float, default=0.0)
+    bytes_downloaded: Mapped[int] = mapped_column(BigInteger, default=0)
+    items_seen: Mapped[int] = mapped_column(Integer, default=0)
+    items_skipped: Mapped[int] = mapped_column(Integer, default=0)
+    items_added: Mapped[int] = mapped_column(Integer, default=0)
+    errors: Mapped[int] = mapped_column(Integer, default=0)
+
+    __table_args__ = (Index("ingest_runs_source_started_idx", "source", "started_at"),)
+
+
+class IngestStageStat(Base):
+    __tablename__ = "ingest_stage_stats"
+
+    run_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("ingest_runs.run_id", ondelete="CASCADE"), primary_key=True
+    )
+    stage: Mapped[str] = mapped_column(Text, primary_key=True)  # fetch | parse | extract | dedupe | write
+    seconds: Mapped[float] = mapped_column(Float, nullable=False)
+    calls: Mapped[int] = mapped_column(Integer, default=0)
+
+
+class IngestRetry(Base):
+    """A failed board or posting fetch waiting for its next attempt (ingest.retry_queue)."""
+    __tablename__ = "ingest_retries"
+
+    source: Mapped[str] = mapped_column(Text, primary_key=True)
+    url: Mapped[str] = mapped_column(Text, primary_key=True)
+    kind: Mapped[str] = mapped_column(Text, nullable=False)  # board | posting
+    payload: Mapped[dict | None] = mapped_column(JSONB, nullable=True)  # posting stub to re-enrich
+    attempts: Mapped[int] = mapped_column(Integer, default=1)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    next_attempt_at: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    first_failed_at: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), server_default="now()")
+    updated_at: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), server_default="now()")
+
+    __table_args__ = (Index("ingest_retries_due_idx", "next_attempt_at"),)
+
+
+class IngestWork(Base):
+    """One source of one sharded ingest batch (ingest.work_queue)."""
+    __tablename__ = "ingest_work"
+
+    batch: Mapped[str] = mapped_column(Text, primary_key=True)  # e.g. "2025-11-13"
+    source: Mapped[str] = mapped_column(Text, primary_key=True)
+    status: Mapped[str] = mapped_column(Text, default="queued", server_default="queued")  # queued | claimed | done | failed
+    worker: Mapped[str | None] = mapped_column(Text, nullable=True)
+    added: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    claimed_at: Mapped[dt.datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    heartbeat_at: Mapped[dt.datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    finished_at: Mapped[dt.datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    created_at: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), server_default="now()")
+
+
+class BoardProbe(Base):
+    """Cached answer to "does <provider> have a board called <slug>?" (SourceAdapter.resolve_board)."""
+    __tablename__ = "board_probes"
+
+    provider: Mapped[str] = mapped_column(Text, primary_key=True)
+    slug: Mapped[str] = mapped_column(Text, primary_key=True)
+    found: Mapped[bool] = mapped_column(Boolean, nullable=False)
+    checked_at: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), server_default="now()")
+
+
+class JobMinhashBand(Base):
+    """LSH index for near-duplicate lookups: one row per (band, band hash) of a job's MinHash."""
+    __tablename__ = "job_minhash_bands"
+
+    band: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+    band_hash: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    job_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("jobs.job_id", ondelete="CASCADE"), primary_key=True
+    )
+
+    __table_args__ = (Index("job_minhash_bands_job_idx", "job_id"),)
+
+
 class Skill(Base):
     __tablename__ = "skills"
 
@@ -63,6 +185,12 @@ class Skill(Base):
     category: Mapped[str | None] = mapped_column(Text, default=None)
     aliases_json: Mapped[str] = mapped_column(Text, default="[]")  # JSON text for now
 
+    __table_args__ = (
+        Index("skills_name_lower_idx", text("lower(name_canonical)")),
+        Index("skills_category_lower_idx", text("lower(category)")),
+        Index("skills_aliases_idx", text("(lower(aliases_json)::jsonb)"), postgresql_using="gin"),
+    )
+
 
 class JobSkill(Base):
     __tablename__ = "job_skills"
@@ -77,6 +205,8 @@ class JobSkill(Base):
     confidence: Mapped[float] = mapped_column(Float, default=0.9)
     source: Mapped[str] = mapped_column(Text, default="dict_v1")
 
+    __table_args__ = (Index("job_skills_skill_job_idx", "skill_id", "job_id"),)
+
 
 class User(Base):
     __tablename__ = "users"
@@ -0,0 +1,77 @@
+# ingest/aho_corasick.py
+"""
+Aho-Corasick multi-pattern matcher for the "aho" skills backend.
+
+Uses the C extension from `pyahocorasick` when it is installed and falls back
+to a pure-Python automaton otherwise. Both report every occurrence of every
+key as (start, end, key); word-boundary checks are left to the caller.
+"""
+from __future__ import annotations
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+try:  # optional C accelerator: pip install pyahocorasick
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+
+class Automaton:
+    def __init__(self, keys: Iterable[str], accelerate: bool = True):
+        keys = [k for k in dict.fromkeys(keys) if k]
+        self.size = len(keys)
+        self.accelerated = bool(ahocorasick and accelerate)
+        if self.accelerated:
+            self._a = ahocorasick.Automaton()
+            for k in keys:
+                self._a.add_word(k, k)
+            if keys:
+                self._a.make_automaton()
+        else:
+            self._build(keys)
+
+    def _build(self, keys: List[str]) -> None:
+        goto: List[Dict[str, int]] = [{}]
+        out: List[Tuple[str, ...]] = [()]
+        for k in keys:
+            state = 0
+            for ch in k:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    out.append(())
+                state = nxt
+            out[state] += (k,)
+
+        # breadth-first so a state's fail link is final before its children need it
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            r = queue.popleft()
+            for ch, s in goto[r].items():
+                queue.append(s)
+                f = fail[r]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[s] = goto[f].get(ch, 0)
+                out[s] += out[fail[s]]
+        self._goto, self._fail, self._out = goto, fail, out
+
+    def iter(self, text: str) -> Iterator[Tuple[int, int, str]]:
+        if not self.size:
+            return
+        if self.accelerated:
+            for last, k in self._a.iter(text):
+                yield last + 1 - len(k), last + 1, k
+            return
+
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for k in out[state]:
+                yield i + 1 - len(k), i + 1, k
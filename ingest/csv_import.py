@@ -0,0 +1,139 @@
+# ingest/csv_import.py
+"""
+Streaming import of board CSV exports.
+
+The files carry the JobDoc columns (id, title, location, absolute_url,
+updated_at, departments, offices, content_html) with HTML-escaped content,
+as in tanium_jobs.csv:
+
+    python -m ingest.csv_import tanium_jobs.csv --board tanium
+
+Rows are read lazily and pushed through IngestStream (HTML → text, skill
+extraction, dedupe, write), which holds at most a few BATCH_SIZE chunks at
+a time, so memory stays flat no matter how large the export is. Writes go
+through COPY + merge whenever the driver supports it.
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import csv
+import sys
+import time
+from datetime import datetime, timezone
+from itertools import islice
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterator, Optional
+
+from sqlalchemy.orm import Session
+
+from db.session import engine
+from ingest.location_utils import normalize_location
+from ingest.pipeline import BATCH_SIZE
+from ingest.sources.base import JobDoc
+from ingest.stream import IngestStream
+
+REQUIRED_COLUMNS = ("id", "title", "absolute_url")
+PROGRESS_EVERY = 10000  # rows between progress lines
+
+
+def _posted_at(value: str) -> Optional[datetime]:
+    # "2025-09-23T15:53:16-04:00" → naive UTC, like the board adapters emit
+    if not value:
+        return None
+    try:
+        ts = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return ts.astimezone(timezone.utc).replace(tzinfo=None) if ts.tzinfo else ts
+
+
+def read_jobdocs(path: Path | str, board_id: str) -> Iterator[JobDoc]:
+    """JobDocs of a CSV export, one row at a time."""
+    csv.field_size_limit(sys.maxsize)  # content_html cells run to hundreds of KB
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        reader = csv.DictReader(f)
+        missing = [c for c in REQUIRED_COLUMNS if c not in (reader.fieldnames or ())]
+        if missing:
+            raise ValueError(f"{path}: missing CSV columns {', '.join(missing)}")
+        for r in reader:
+            yield JobDoc(
+                board_id=board_id,
+                job_id=r["id"],
+                title=r["title"],
+                location=r.get("location") or "",
+                absolute_url=r["absolute_url"],
+                departments=r.get("departments") or "",
+                offices=r.get("offices") or "",
+                updated_at=r.get("updated_at") or "",
+                content_html=r.get("content_html"),
+            )
+
+
+def jobdoc_item(doc: JobDoc, source: str, company: str) -> Dict[str, Any]:
+    """One JobDoc as a pipeline item (description still HTML; the stream strips it)."""
+    city, region, country = normalize_location(doc.location)
+    return {
+        "title": doc.title.strip(),
+        "company": company,
+        "description_html": doc.content_html or "",
+        "url": doc.absolute_url or None,
+        "city": city or "N/A",
+        "region": region,
+        "country": country,
+        "location": doc.location,
+        "posted_at": _posted_at(doc.updated_at),
+        "source": source,
+        "external_id": doc.job_id or None,
+    }
+
+
+async def import_csv(path: Path | str, board_id: str, source: Optional[str] = None,
+                     company: Optional[str] = None, db: Optional[Session] = None,
+                     bulk: Optional[bool] = None, chunk_size: int = BATCH_SIZE,
+                     progress_every: int = PROGRESS_EVERY) -> Dict[str, Any]:
+    """
+    Load one export. `source` defaults to "csv:<board_id>", `company` to the
+    board id in title case, `bulk` to COPY + merge when the driver is psycopg.
+    Returns {"rows", "added", "seconds"}.
+    """
+    source = source or f"csv:{board_id}"
+    company = company or board_id.replace("_", " ").replace("-", " ").title()
+    if bulk is None:
+        bulk = (db.get_bind() if db is not None else engine).dialect.driver == "psycopg"
+
+    docs = read_jobdocs(path, board_id)
+    read = 0
+    t0 = time.perf_counter()
+
+    async def items() -> AsyncIterator[Dict[str, Any]]:
+        nonlocal read
+        # file reads and CSV parsing happen off the loop, one chunk at a time
+        while batch := await asyncio.to_thread(lambda: list(islice(docs, chunk_size))):
+            for doc in batch:
+                yield jobdoc_item(doc, source, company)
+            before, read = read, read + len(batch)
+            if progress_every and read // progress_every > before // progress_every:
+                secs = time.perf_counter() - t0
+                print(f"[csv] {read:,} rows  {read / secs:,.0f} rows/s")
+
+    async with IngestStream(db=db, bulk=bulk) as stream:
+        added = await stream.ingest_items(source, items())
+
+    secs = time.perf_counter() - t0
+    print(f"Imported {added:,} new jobs from {read:,} rows of {path} in {secs:.1f}s "
+          f"({read / secs if secs else 0:,.0f} rows/s, {'copy+merge' if bulk else 'row-at-a-time'})")
+    return {"rows": read, "added": added, "seconds": secs}
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Import a board CSV export (JobDoc columns)")
+    ap.add_argument("path")
+    ap.add_argument("--board", help="board id; defaults to the file name minus a _jobs suffix")
+    ap.add_argument("--source", help='jobs.source tag (default "csv:<board>")')
+    ap.add_argument("--company", help="company name (default: board id, title-cased)")
+    ap.add_argument("--chunk", type=int, default=BATCH_SIZE, help="rows per read")
+    ap.add_argument("--row-path", action="store_true", help="write row by row instead of COPY + merge")
+    args = ap.parse_args()
+    board = args.board or Path(args.path).stem.removesuffix("_jobs")
+    asyncio.run(import_csv(args.path, board, source=args.source, company=args.company,
+                           bulk=False if args.row_path else None, chunk_size=args.chunk))
@@ -1,5 +1,8 @@
 # ingest/dedupe.py
-import hashlib, re, urllib.parse as up
+import hashlib, os, re, zlib, urllib.parse as up
+from typing import List, Optional, Tuple
+
+import numpy as np
 
 TRACKING_PARAMS = {"utm_source","utm_medium","utm_campaign","utm_term","utm_content","gh_src","gh_jid"}
 
@@ -25,3 +28,90 @@ def normalize_text(s: str) -> str:
 def desc_hash(text: str) -> bytes:
     # hash only the normalized description text (title/company can vary)
     return sha256_bytes(normalize_text(text))
+
+# --- near-duplicates: MinHash signatures + LSH banding ------------------------
+#
+# Reposts often differ from the stored posting only by a date line or a
+# sentence of boilerplate, so desc_hash misses them. Each description gets
+# a NUM_PERM-value MinHash signature over word 5-shingles; the fraction of
+# equal positions in two signatures estimates the Jaccard similarity of their
+# shingle sets. Signatures are cut into BANDS bands of ROWS values; postings
+# sharing any band hash are candidates (rows in `job_minhash_bands`), and a
+# candidate counts as a duplicate when its estimated Jaccard >= NEAR_DUP_THRESHOLD
+# and it has the same company, title and location (pipeline.posting_key):
+# regional variants of one req share nearly all of their text.
+
+NUM_PERM = 128
+SHINGLE_WORDS = 5
+NEAR_DUP_THRESHOLD = float(os.getenv("JME_NEAR_DUP_THRESHOLD", "0.8"))
+
+_WORDS = re.compile(r"\w+")
+_PRIME = np.uint64((1 << 61) - 1)
+_MAX32 = np.uint64((1 << 32) - 1)
+# fixed seed: signatures stored in the DB must stay comparable across runs
+_rng = np.random.RandomState(20240601)
+_A = _rng.randint(1, int(_PRIME), size=NUM_PERM, dtype=np.uint64)
+_B = _rng.randint(0, int(_PRIME), size=NUM_PERM, dtype=np.uint64)
+
+
+def lsh_params(threshold: float, num_perm: int = NUM_PERM) -> Tuple[int, int]:
+    """
+    (bands, rows) with bands*rows == num_perm whose S-curve midpoint
+    (1/bands)**(1/rows) is the highest one still at or below `threshold`,
+    so pairs right at the threshold are found with good probability.
+    """
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        if (1 / bands) ** (1 / rows) <= threshold:
+            best = (bands, rows)
+    return best
+
+
+BANDS, ROWS = lsh_params(NEAR_DUP_THRESHOLD)
+
+
+def shingles(text: str) -> set:
+    words = _WORDS.findall(normalize_text(text))
+    if not words:
+        return set()
+    k = min(SHINGLE_WORDS, len(words))
+    return {zlib.crc32(" ".join(words[i:i + k]).encode("utf-8")) for i in range(len(words) - k + 1)}
+
+
+def minhash(text: str) -> Optional[np.ndarray]:
+    """uint32[NUM_PERM] signature of `text`, or None when it has no words."""
+    sh = shingles(text)
+    if not sh:
+        return None
+    h = np.fromiter(sh, dtype=np.uint64, count=len(sh))
+    # (a*x + b) mod p, truncated to 32 bits; uint64 wrap-around is intended
+    return (((np.outer(_A, h) + _B[:, None]) % _PRIME) & _MAX32).min(axis=1).astype(np.uint32)
+
+
+def minhash_many(texts: List[str]) -> List[Optional[np.ndarray]]:
+    return [minhash(t) for t in texts]
+
+
+def band_hashes(sig: np.ndarray, bands: int = BANDS, rows: int = ROWS) -> List[int]:
+    """One signed 64-bit key per band (fits a Postgres bigint)."""
+    out = []
+    for b in range(bands):
+        d = hashlib.blake2b(sig[b * rows:(b + 1) * rows].tobytes(), digest_size=8, person=b"jme-lsh%d" % rows)
+        out.append(int.from_bytes(d.digest(), "big", signed=True))
+    return out
+
+
+def jaccard(a: np.ndarray, b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return float(np.count_nonzero(a == b)) / len(a)
+
+
+def sig_to_bytes(sig: np.ndarray) -> bytes:
+    return sig.astype("<u4").tobytes()
+
+
+def sig_from_bytes(raw: bytes) -> np.ndarray:
+    return np.frombuffer(raw, dtype="<u4").astype(np.uint32)
@@ -0,0 +1,139 @@
+# ingest/en_tokens.py
+"""
+Token boundaries of spaCy's English tokenizer, without spaCy.
+
+The "aho" skills backend must match the same phrases as the PhraseMatcher,
+which only matches whole tokens, so it needs the same token boundaries.
+This is a port of the rules that decide them for Latin-script text
+(spacy.lang.punctuation, spacy.lang.tokenizer_exceptions and the loop in
+Tokenizer.explain):
+
+* text splits on whitespace, and each piece loses prefixes ("(", "#") and
+  suffixes (",", "'s", a "." after a lowercase letter) until none match;
+* what is left stays whole when it looks like a URL ("node.js",
+  "react.js/node.js") or is a special case ("C++"), and is otherwise split
+  on infixes: hyphens and "/" between letters ("scikit-learn",
+  "ci/cd"), "." between a lowercase and an uppercase letter ("Node.JS").
+
+Everything else, e.g. "c++11" or "C#/.NET", is one token, as in spaCy.
+Contractions, which spaCy splits ("do", "n't"), are the one known gap.
+"""
+from __future__ import annotations
+import re
+from typing import List, Tuple
+
+_AL = "a-zß-öø-ÿ"
+_AU = "A-ZÀ-ÖØ-Þ"
+_A = _AL + _AU
+_QUOTES = ["'", '"', "”", "“", "`", "‘", "´", "’", "‚", ",", "„", "»", "«"]
+_Q = "".join(re.escape(q) for q in _QUOTES)
+_PUNCT = ["…", "……", ",", ":", ";", "!", "?", "¿", "¡", "(", ")", "[", "]", "{", "}",
+          "<", ">", "_", "#", "*", "&"]
+_P = "".join(re.escape(p) for p in _PUNCT)
+_ELLIPSES = [r"\.\.+", "…"]
+_CURRENCY = ["$", "£", "€", "¥", "US$", "C$", "A$"]
+_UNITS = ("km m dm cm mm ha nm yd in ft kg g mg t lb oz m/s km/h kmh mph hPa Pa mbar mb MB kb KB gb GB "
+          "tb TB T G M K %").split()
+_HYPHENS = "-|–|—|--|---|——|~"
+
+_PREFIXES = (
+    ["§", "%", "=", "—", "–", r"\+(?![0-9])"]
+    + [re.escape(p) for p in _PUNCT] + _ELLIPSES + [re.escape(q) for q in _QUOTES]
+    + [re.escape(c) for c in _CURRENCY]
+)
+_SUFFIXES = (
+    [re.escape(p) for p in _PUNCT] + _ELLIPSES + [re.escape(q) for q in _QUOTES]
+    + ["'s", "'S", "’s", "’S", "—", "–"]
+    + [
+        r"(?<=[0-9])\+",
+        r"(?<=°[FfCcKk])\.",
+        r"(?<=[0-9])(?:%s)" % "|".join(re.escape(c) for c in _CURRENCY),
+        r"(?<=[0-9])(?:%s)" % "|".join(re.escape(u) for u in _UNITS),
+        r"(?<=[0-9%s%%²\-\+%s|%s])\." % (_AL, _P, _Q),
+        r"(?<=[%s][%s])\." % (_AU, _AU),
+    ]
+)
+_INFIXES = _ELLIPSES + [
+    r"(?<=[0-9])[+\-\*^](?=[0-9-])",
+    r"(?<=[%s%s])\.(?=[%s%s])" % (_AL, _Q, _AU, _Q),
+    r"(?<=[%s]),(?=[%s])" % (_A, _A),
+    r"(?<=[%s0-9])(?:%s)(?=[%s])" % (_A, _HYPHENS, _A),
+    r"(?<=[%s0-9])[:<>=/](?=[%s])" % (_A, _A),
+]
+
+_prefix_search = re.compile("|".join("^" + p for p in _PREFIXES)).search
+_suffix_search = re.compile("|".join(s + "$" for s in _SUFFIXES)).search
+_infix_finditer = re.compile("|".join(_INFIXES)).finditer
+_url_match = re.compile(
+    r"^(?:(?:[\w\+\-\.]{2,})://)?(?:\S+(?::\S*)?@)?(?:"
+    r"(?!(?:10|127)(?:\.\d{1,3}){3})(?!(?:169\.254|192\.168)(?:\.\d{1,3}){2})"
+    r"(?!172\.(?:1[6-9]|2\d|3[0-1])(?:\.\d{1,3}){2})"
+    r"(?:[1-9]\d?|1\d\d|2[01]\d|22[0-3])(?:\.(?:1?\d{1,2}|2[0-4]\d|25[0-5])){2}"
+    r"(?:\.(?:[1-9]\d?|1\d\d|2[0-4]\d|25[0-4]))"
+    r"|(?:(?:[A-Za-z0-9¡-￿][A-Za-z0-9¡-￿_-]{0,62})?[A-Za-z0-9¡-￿]\.)+"
+    r"(?:[%s]{2,63}))(?::\d{2,5})?(?:[/?#]\S*)?$" % _AL
+).match
+
+# tokenizer exceptions that keep a "." or "+" attached ("c." is not the skill "c");
+# contractions ("don't" -> "do", "n't") are left out
+_SPECIAL = {"C++"} | set("""
+    ._. 10a.m. 10p.m. 11a.m. 11p.m. 12a.m. 12p.m. 1a.m. 1p.m. 2a.m. 2p.m. 3a.m. 3p.m. 4a.m.
+    4p.m. 5a.m. 5p.m. 6a.m. 6p.m. 7a.m. 7p.m. 8a.m. 8p.m. 9a.m. 9p.m. Adm. Ak. Ala. Apr. Ariz.
+    Ark. Aug. Bros. Calif. Co. Colo. Conn. Corp. D.C. Dec. Del. Dr. E.G. E.g. Feb. Fla. Ga. Gen.
+    Gov. I.E. I.e. Ia. Id. Ill. Inc. Ind. Jan. Jr. Jul. Jun. Kan. Kans. Ky. La. Ltd. Mar. Mass.
+    Md. Messrs. Mich. Minn. Miss. Mo. Mont. Mr. Mrs. Ms. Mt. N.C. N.D. N.H. N.J. N.M. N.Y. Neb.
+    Nebr. Nev. Nov. Oct. Okla. Ore. Pa. Ph.D. Prof. Rep. Rev. S.C. Sen. Sep. Sept. St. Tenn. Va.
+    Wash. Wis. a. a.m. b. c. co. d. e. e.g. f. g. h. i. i.e. j. k. l. m. n. o. p. p.m. q. r. s.
+    t. u. v. v.s. vs. w. x. y. z. °C. °F. °K. °c. °f. °k. ä. ö. ü.
+""".split())
+
+_WS = re.compile(r"\S+")
+
+
+def _split(piece: str, offset: int, out: List[Tuple[int, int]]) -> None:
+    """Append the (start, end) spans of one whitespace-free piece."""
+    start, end = 0, len(piece)
+    suffixes: List[Tuple[int, int]] = []
+    s = piece
+    while s and s not in _SPECIAL and (_prefix_search(s) or _suffix_search(s)):
+        m = _prefix_search(s)
+        if m:
+            if m.end() == 0:
+                break
+            out.append((offset + start, offset + start + m.end()))
+            start += m.end()
+            s = piece[start:end]
+            if s in _SPECIAL:
+                break
+        m = _suffix_search(s)
+        if m:
+            if m.start() == len(s):
+                break
+            suffixes.append((offset + start + m.start(), offset + end))
+            end = start + m.start()
+            s = piece[start:end]
+    if start < end:
+        s = piece[start:end]
+        if _url_match(s) or s in _SPECIAL:
+            out.append((offset + start, offset + end))
+        else:
+            pos = 0
+            for m in _infix_finditer(s):
+                if pos == 0 and m.start() == 0:
+                    continue
+                if m.start() > pos:
+                    out.append((offset + start + pos, offset + start + m.start()))
+                if m.end() > m.start():
+                    out.append((offset + start + m.start(), offset + start + m.end()))
+                pos = m.end()
+            if pos < len(s):
+                out.append((offset + start + pos, offset + end))
+    out.extend(reversed(suffixes))
+
+
+def token_spans(text: str) -> List[Tuple[int, int]]:
+    """(start, end) of every non-whitespace token of `text`, in order."""
+    out: List[Tuple[int, int]] = []
+    for m in _WS.finditer(text):
+        _split(m.group(), m.start(), out)
+    return out
@@ -3,15 +3,16 @@ import json
 from pathlib import Path
 from collections import Counter
 from db.session import SessionLocal
-from ingest.skills_extract import build_matcher, extract
+from ingest.skills_extract import build_matcher, extract_many
 
-def main(fi="data/eval_samples.jsonl"):
+def main(fi="data/eval_samples.jsonl", n_process=1):
     lines = [json.loads(l) for l in Path(fi).read_text(encoding="utf-8").splitlines()]
     tp = fp = fn = 0
     with SessionLocal() as db:
         build_matcher(db)
-    for ex in lines:
-        pred = set(k for k,_ in extract(ex["text"]))
+    preds = extract_many([ex["text"] for ex in lines], n_process=n_process)
+    for ex, hits in zip(lines, preds):
+        pred = set(k for k,_ in hits)
         gold = set(ex["labels"])  # canonical
         tp += len(pred & gold)
         fp += len(pred - gold)
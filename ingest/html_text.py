@@ -0,0 +1,152 @@
+# ingest/html_text.py
+"""
+HTML → plain text for job descriptions.
+
+Greenhouse `content` is *escaped* HTML ("&lt;p&gt;..."), Lever's
+`description` is raw HTML. html_to_text() handles both: it unescapes one
+level when the markup itself is escaped, drops <script>/<style>, turns block
+elements into line breaks, collapses whitespace and decodes entities.
+
+Parsing runs through lxml's C parser when lxml is installed and through
+the stdlib html.parser otherwise; both drive the same _TextBuilder target.
+Results are memoized by a digest of the raw content, so the same posting
+body (or a boilerplate shared across a board) is only converted once.
+"""
+from __future__ import annotations
+import hashlib
+import html
+import os
+import re
+import threading
+from collections import OrderedDict
+from html.parser import HTMLParser
+from typing import Dict, List, Optional
+
+try:  # optional C parser
+    from lxml import etree
+except ImportError:
+    etree = None
+
+MEMO_SIZE = int(os.getenv("JME_HTML_MEMO", "10000"))
+
+BLOCK_TAGS = frozenset("""
+    address article aside blockquote br dd div dl dt fieldset figcaption figure footer
+    form h1 h2 h3 h4 h5 h6 header hr li main nav ol p pre section table tbody td tfoot
+    th thead tr ul
+""".split())
+SKIP_TAGS = frozenset(("script", "style", "noscript", "template", "head"))
+
+_WS = re.compile(r"[ \t\r\f\v\u00a0]+")
+_ESCAPED = re.compile(r"&lt;/?[a-zA-Z]")
+
+
+class _TextBuilder:
+    """Parser target (lxml `target=` protocol); html.parser feeds it the same calls."""
+
+    def __init__(self, keep_newlines: bool = False):
+        self.parts: List[str] = []
+        self.skip = 0
+        self.keep_newlines = keep_newlines  # plain text: "\n" is a line break, in HTML it's a space
+
+    def start(self, tag: str, attrib=None) -> None:
+        tag = tag.lower()
+        if tag in SKIP_TAGS:
+            self.skip += 1
+        elif tag in BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def end(self, tag: str) -> None:
+        tag = tag.lower()
+        if tag in SKIP_TAGS:
+            self.skip = max(0, self.skip - 1)
+        elif tag in BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def data(self, data: str) -> None:
+        if not self.skip:
+            self.parts.append(data if self.keep_newlines else data.replace("\n", " "))
+
+    def comment(self, text: str) -> None:
+        pass
+
+    def close(self) -> str:
+        lines = (_WS.sub(" ", line).strip() for line in "".join(self.parts).split("\n"))
+        return "\n".join(line for line in lines if line)
+
+
+class _StdlibParser(HTMLParser):
+    def __init__(self, target: _TextBuilder):
+        super().__init__(convert_charrefs=True)
+        self.target = target
+
+    def handle_starttag(self, tag, attrs):
+        self.target.start(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.target.start(tag)
+        self.target.end(tag)
+
+    def handle_endtag(self, tag):
+        self.target.end(tag)
+
+    def handle_data(self, data):
+        self.target.data(data)
+
+
+def _convert(raw: str) -> str:
+    if _ESCAPED.search(raw) and "<" not in raw:
+        raw = html.unescape(raw)  # escaped markup: one level back to real tags
+    if "<" not in raw:  # no markup: plain text, maybe with entities
+        b = _TextBuilder(keep_newlines=True)
+        b.data(html.unescape(raw) if "&" in raw else raw)
+        return b.close()
+    if etree is not None:
+        try:
+            return etree.fromstring(raw, etree.HTMLParser(target=_TextBuilder(), no_network=True)) or ""
+        except etree.LxmlError:
+            pass  # e.g. nothing but whitespace/comments; html.parser copes
+    p = _StdlibParser(_TextBuilder())
+    p.feed(raw)
+    p.close()
+    return p.target.close()
+
+
+_MEMO: "OrderedDict[bytes, str]" = OrderedDict()
+_LOCK = threading.Lock()
+_STATS = {"hits": 0, "misses": 0}
+
+
+def content_hash(raw: str) -> bytes:
+    return hashlib.blake2b(raw.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+
+def html_to_text(raw: Optional[str]) -> str:
+    if not raw:
+        return ""
+    key = content_hash(raw)
+    with _LOCK:
+        text = _MEMO.get(key)
+        if text is not None:
+            _MEMO.move_to_end(key)
+            _STATS["hits"] += 1
+            return text
+    text = _convert(raw)
+    with _LOCK:
+        _STATS["misses"] += 1
+        _MEMO[key] = text
+        if len(_MEMO) > MEMO_SIZE:
+            _MEMO.popitem(last=False)
+    return text
+
+
+def memo_stats() -> Dict[str, int]:
+    with _LOCK:
+        return {**_STATS, "size": len(_MEMO)}
+
+
+def normalize_description(it: dict, limit: int = 200000) -> dict:
+    """Turn an item's raw `description_html` (if any) into `description_text`, in place."""
+    raw = it.pop("description_html", None)
+    if raw is not None:
+        it["description_text"] = html_to_text(raw)[:limit]
+    return it
@@ -0,0 +1,110 @@
+# ingest/http_cache.py
+"""
+On-disk validator cache for conditional GETs.
+
+For every URL (query string included) that answered with an ETag and/or
+Last-Modified we keep those validators plus the body. The next request sends
+If-None-Match / If-Modified-Since; a 304 then means "same payload as last
+time". JSON board fetches treat that as "nothing to ingest" (NotModified),
+while plain page fetches get the cached body back.
+
+Entries are two files per URL under JME_HTTP_CACHE_DIR: `<sha>.json` for the
+validators and `<sha>.body` for the payload. Set JME_HTTP_CACHE=0 to disable.
+"""
+from __future__ import annotations
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, Optional
+
+HTTP_CACHE_DIR = Path(os.getenv("JME_HTTP_CACHE_DIR", ".cache/http"))
+HTTP_CACHE_ENABLED = os.getenv("JME_HTTP_CACHE", "1") == "1"
+
+
+class NotModified(Exception):
+    """The server answered 304: the cached copy of `url` is still current."""
+
+    def __init__(self, url: str):
+        super().__init__(url)
+        self.url = url
+
+
+class HttpCache:
+    def __init__(self, directory: Path = HTTP_CACHE_DIR, enabled: bool = HTTP_CACHE_ENABLED):
+        self.directory = Path(directory)
+        self.enabled = enabled
+        self.hits = 0      # 304s served from the cache
+        self.misses = 0    # full downloads (no entry, or validators didn't match)
+
+    def _paths(self, url: str):
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.directory / f"{key}.json", self.directory / f"{key}.body"
+
+    def _meta(self, url: str) -> Optional[Dict[str, str]]:
+        meta_path, _ = self._paths(url)
+        try:
+            meta = json.loads(meta_path.read_text("utf-8"))
+        except (OSError, ValueError):
+            return None
+        return meta if meta.get("url") == url else None
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        if not self.enabled:
+            return {}
+        meta = self._meta(url) or {}
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    def body(self, url: str) -> Optional[bytes]:
+        _, body_path = self._paths(url)
+        try:
+            return body_path.read_bytes()
+        except OSError:
+            return None
+
+    def store(self, url: str, headers, content: Optional[bytes]) -> None:
+        """
+        Remember validators + body of a 200; responses without validators are
+        skipped. content=None keeps validators only (streamed board payloads,
+        where a 304 means "skip the board" and the body is never replayed).
+        """
+        if not self.enabled:
+            return
+        etag, last_modified = headers.get("ETag"), headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+        meta_path, body_path = self._paths(url)
+        meta = {"url": url, "etag": etag, "last_modified": last_modified}
+        writes = [(meta_path, json.dumps(meta).encode("utf-8"))]
+        if content is not None:
+            # body first, then meta: a torn write leaves no validators to trust
+            writes.insert(0, (body_path, content))
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            if content is None:
+                body_path.unlink(missing_ok=True)
+            for path, data in writes:
+                tmp = path.with_suffix(path.suffix + ".tmp")
+                tmp.write_bytes(data)
+                tmp.replace(path)
+        except OSError:
+            pass  # a read-only or full disk only costs us the next 304
+
+    def forget(self, url: str) -> None:
+        """Drop an entry so the next fetch downloads in full (e.g. after a failed write)."""
+        for path in self._paths(url):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
+
+
+HTTP_CACHE = HttpCache()
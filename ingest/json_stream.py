@@ -0,0 +1,140 @@
+# ingest/json_stream.py
+"""
+Incremental parsing of one JSON array out of a byte stream.
+
+iter_array(chunks, key) yields the elements of the array stored under the
+top-level `key` (or of the top-level array when key is None) as soon as
+each element has fully arrived, so only one element plus one network chunk
+are held in memory instead of the whole response.
+
+Uses `ijson` when it is installed and falls back to a small pure-Python
+scanner built on json.JSONDecoder.raw_decode otherwise.
+"""
+from __future__ import annotations
+import codecs
+import json
+from typing import Any, AsyncIterable, AsyncIterator, Optional
+
+try:  # optional C-backed parser: pip install ijson
+    import ijson
+except ImportError:
+    ijson = None
+
+_WS = " \t\n\r"
+_DELIMS = _WS + ",:]}"
+_DECODER = json.JSONDecoder()
+
+
+class _Reader:
+    """Async file-like view of a chunk iterator, as ijson.items_async expects."""
+
+    def __init__(self, chunks: AsyncIterable[bytes]):
+        self._it = chunks.__aiter__()
+
+    async def read(self, n: int = -1) -> bytes:
+        if n == 0:  # ijson probes with read(0) to tell bytes from str
+            return b""
+        try:
+            chunk = b""
+            while not chunk:  # b"" would read as end of stream
+                chunk = await self._it.__anext__()
+            return chunk
+        except StopAsyncIteration:
+            return b""
+
+
+class _Scanner:
+    def __init__(self, chunks: AsyncIterable[bytes]):
+        self._it = chunks.__aiter__()
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    async def more(self) -> None:
+        if self.eof:
+            raise ValueError("truncated JSON document")
+        try:
+            chunk = await self._it.__anext__()
+        except StopAsyncIteration:
+            chunk, self.eof = b"", True
+        # drop what was consumed so the buffer never grows past one element
+        self.buf = self.buf[self.pos:] + self._utf8.decode(chunk, final=self.eof)
+        self.pos = 0
+
+    async def peek(self) -> str:
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WS:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            await self.more()
+
+    async def expect(self, ch: str) -> None:
+        got = await self.peek()
+        if got != ch:
+            raise ValueError(f"expected {ch!r}, got {got!r}")
+        self.pos += 1
+
+    async def value(self) -> Any:
+        await self.peek()
+        while True:
+            try:
+                obj, end = _DECODER.raw_decode(self.buf, self.pos)
+                # a number is only complete once a delimiter follows: "2" of a
+                # cut-off "2.5" or "1e3" decodes fine on its own
+                if self.eof or (end < len(self.buf) and self.buf[end] in _DELIMS):
+                    self.pos = end
+                    return obj
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            await self.more()
+
+
+async def _elements(s: _Scanner) -> AsyncIterator[Any]:
+    await s.expect("[")
+    if await s.peek() == "]":
+        return
+    while True:
+        yield await s.value()
+        await s.peek()
+        sep = s.buf[s.pos]
+        s.pos += 1
+        if sep == "]":
+            return
+        if sep != ",":
+            raise ValueError(f"expected ',' or ']', got {sep!r}")
+
+
+async def iter_array(chunks: AsyncIterable[bytes], key: Optional[str] = None) -> AsyncIterator[Any]:
+    if ijson is not None:
+        prefix = f"{key}.item" if key else "item"
+        async for obj in ijson.items_async(_Reader(chunks), prefix, use_float=True):
+            yield obj
+        return
+
+    s = _Scanner(chunks)
+    if key is None:
+        async for obj in _elements(s):
+            yield obj
+        return
+
+    await s.expect("{")
+    if await s.peek() == "}":
+        return
+    while True:
+        name = await s.value()
+        await s.expect(":")
+        if name == key:
+            async for obj in _elements(s):
+                yield obj
+            return  # the rest of the document (e.g. "meta") is not needed
+        await s.value()
+        await s.peek()
+        sep = s.buf[s.pos]
+        s.pos += 1
+        if sep == "}":
+            return
+        if sep != ",":
+            raise ValueError(f"expected ',' or '}}', got {sep!r}")
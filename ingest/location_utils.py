@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import re
 from typing import Optional, Tuple
 
 
@@ -44,3 +45,77 @@ def normalize_location(
         return parts[0], parts[1], None
     # 3+ -> "City, Region, Country"
     return parts[0], parts[1], parts[-1]
+
+
+# --- normalized city / work mode (jobs.city_norm, jobs.mode_norm) --------------
+
+_REMOTE_KW = re.compile(r"\b(remote|distributed|home\s*based)\b", re.I)
+_HYBRID_KW = re.compile(r"\bhybrid\b", re.I)
+_MODE_SUFFIX = re.compile(r"\s*\((remote|hybrid|in-?office|distributed|home\s*based)\)\s*$", re.I)
+_MODE_PREFIX = re.compile(r"^\s*(remote|hybrid|in-?office|office|distributed|home\s*based)\b\s*([-—–:,/]|to|and)?\s*", re.I)
+_FIRST_TOKEN = re.compile(r"^[^,;/|]+")
+_NOT_A_CITY = re.compile(
+    r"^(us|usa|united\s*states|uk|gb|de|germany|in|india|ca|canada|au|australia|nz|new\s*zealand"
+    r"|eu|europe|emea|apac|na|latam|global|worldwide|anywhere|remote)$", re.I)
+_US_STATE = re.compile(r"^[A-Z]{2}$")
+_WORD = re.compile(r"[^\W_]+")
+_BLANK = {"", "n/a", "na", "none", "-"}
+
+MODES = ("Remote", "Hybrid", "On-site")
+
+
+def _clean(value: Optional[str]) -> str:
+    value = (value or "").strip()
+    return "" if value.lower() in _BLANK else value
+
+
+def _initcap(s: str) -> str:
+    # Postgres INITCAP: first letter of every alphanumeric run upper, the rest lower
+    return _WORD.sub(lambda m: m.group(0)[0].upper() + m.group(0)[1:], s.lower())
+
+
+def normalize_city(city: Optional[str], region: Optional[str] = None,
+                   country: Optional[str] = None) -> Optional[str]:
+    """
+    Display/filter city for a job, e.g. "San Francisco, CA", "London, UK",
+    "Remote, US". Mode words ("Remote - Austin", "Berlin (Hybrid)") are
+    stripped; US cities get their state, others the country code (GB → UK);
+    a remote-only location becomes "Remote[, CC]"; without a city, the
+    region and/or country are used. None when there is nothing usable.
+    """
+    city_l = _clean(city).lower()
+    region_u = _clean(region).upper()
+    country_u = _clean(country).upper()
+    if country_u == "GB":
+        country_u = "UK"
+
+    s = _MODE_PREFIX.sub("", _MODE_SUFFIX.sub("", city_l), count=1)
+    m = _FIRST_TOKEN.match(s)
+    token = m.group(0).strip() if m else ""
+    is_city = bool(token) and not _NOT_A_CITY.match(token)
+
+    if is_city and country_u == "US" and _US_STATE.match(region_u):
+        out = f"{_initcap(token)}, {region_u}"
+    elif is_city and country_u:
+        out = f"{_initcap(token)}, {country_u}"
+    elif is_city:
+        out = _initcap(token)
+    elif _REMOTE_KW.search(city_l):
+        out = f"Remote, {country_u}" if country_u else "Remote"
+    elif region_u and country_u:
+        out = f"{_initcap(region_u)}, {country_u}"
+    elif region_u:
+        out = _initcap(region_u)
+    else:
+        out = country_u
+    return out if len(out) >= 2 and out.lower() not in _BLANK else None
+
+
+def normalize_mode(city: Optional[str], remote_flag: bool = False) -> str:
+    """"Remote", "Hybrid" or "On-site" from the flag and the mode words in the city text."""
+    city_l = (city or "").lower()
+    if remote_flag or _REMOTE_KW.search(city_l):
+        return "Remote"
+    if _HYBRID_KW.search(city_l):
+        return "Hybrid"
+    return "On-site"
@@ -0,0 +1,206 @@
+# ingest/metrics.py
+"""
+Ingest run ledger and Prometheus export.
+
+Every IngestStream run of one source fills a RunStats: busy time per stage
+(fetch, parse, extract, dedupe, write), bytes downloaded, items seen /
+skipped / added and error counts. The run is stored as one `ingest_runs`
+row plus one `ingest_stage_stats` row per stage.
+
+Stage times are time spent *in* that stage, summed over chunks; stages of
+one run overlap, so they can add up to more than the run's wall time.
+"fetch" is waiting for the next posting (network + JSON decoding), "parse"
+is HTML → text.
+
+The HTTP helpers reach the run of the source they are fetching for through
+the CURRENT_RUN context variable, so adapters need no extra arguments.
+
+export_textfile() renders the latest run of every source in the Prometheus
+text format, for node_exporter's textfile collector (or POST it to a
+Pushgateway as-is):
+
+    python -m ingest.metrics --out /var/lib/node_exporter/textfile/jme_ingest.prom
+"""
+from __future__ import annotations
+import argparse
+import contextvars
+import os
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import AsyncIterable, AsyncIterator, Dict, Iterator, List, Optional
+
+from sqlalchemy import bindparam, text as sql
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+from sqlalchemy.orm import Session
+
+from db.models import IngestRun, IngestStageStat
+
+METRICS_TEXTFILE = os.getenv("JME_METRICS_TEXTFILE")  # unset: no export
+
+
+class RunStats:
+    """Counters and stage timers of one source's ingest run."""
+
+    def __init__(self, source: str):
+        self.run_id = uuid.uuid4()
+        self.source = source
+        self.started_at = datetime.now(timezone.utc)
+        self.finished_at: Optional[datetime] = None
+        self.status = "running"
+        self.error: Optional[str] = None
+        self.stage_seconds: Dict[str, float] = {}
+        self.stage_calls: Dict[str, int] = {}
+        self.bytes_downloaded = 0
+        self.items_seen = 0
+        self.items_skipped = 0
+        self.items_added = 0
+        self.errors = 0
+        self.deferred: List = []  # ingest.retry_queue units to (re)queue
+        self.settled: List = []  # (source, url) units that succeeded
+        self._t0 = time.perf_counter()
+        self.seconds = 0.0
+
+    def add_time(self, stage: str, seconds: float) -> None:
+        self.stage_seconds[stage] = self.stage_seconds.get(stage, 0.0) + seconds
+        self.stage_calls[stage] = self.stage_calls.get(stage, 0) + 1
+
+    @contextmanager
+    def timer(self, stage: str) -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(stage, time.perf_counter() - t0)
+
+    async def timed(self, stage: str, items: AsyncIterable) -> AsyncIterator:
+        """Re-yield `items`, charging the wait for each one to `stage`."""
+        it = items.__aiter__()
+        while True:
+            t0 = time.perf_counter()
+            try:
+                item = await it.__anext__()
+            except StopAsyncIteration:
+                self.add_time(stage, time.perf_counter() - t0)
+                return
+            self.add_time(stage, time.perf_counter() - t0)
+            yield item
+
+    def finish(self, status: str, error: Optional[BaseException] = None) -> None:
+        self.status = status
+        if error is not None:
+            self.errors += 1
+            self.error = repr(error)[:1000]
+        self.finished_at = datetime.now(timezone.utc)
+        self.seconds = time.perf_counter() - self._t0
+
+
+CURRENT_RUN: contextvars.ContextVar[Optional[RunStats]] = contextvars.ContextVar("jme_ingest_run", default=None)
+
+
+def note_bytes(n: int) -> None:
+    run = CURRENT_RUN.get()
+    if run is not None:
+        run.bytes_downloaded += n
+
+
+def note_error() -> None:
+    """A recovered failure (retried request, skipped page) of the current run."""
+    run = CURRENT_RUN.get()
+    if run is not None:
+        run.errors += 1
+
+
+def record_run(db: Session, run: RunStats) -> None:
+    """Add the run and its stage rows to the session (no commit)."""
+    db.add(IngestRun(
+        run_id=run.run_id, source=run.source, status=run.status, error=run.error,
+        started_at=run.started_at, finished_at=run.finished_at, seconds=run.seconds,
+        bytes_downloaded=run.bytes_downloaded, items_seen=run.items_seen,
+        items_skipped=run.items_skipped, items_added=run.items_added, errors=run.errors,
+    ))
+    db.add_all(
+        IngestStageStat(run_id=run.run_id, stage=stage, seconds=secs, calls=run.stage_calls[stage])
+        for stage, secs in run.stage_seconds.items()
+    )
+    db.flush()
+
+
+LATEST_RUNS_SQL = sql("""
+SELECT DISTINCT ON (r.source)
+       r.run_id, r.source, r.status, r.finished_at, r.seconds, r.bytes_downloaded,
+       r.items_seen, r.items_skipped, r.items_added, r.errors
+FROM ingest_runs r
+ORDER BY r.source, r.started_at DESC
+""")
+
+STAGES_SQL = sql("SELECT run_id, stage, seconds FROM ingest_stage_stats WHERE run_id = ANY(:ids)").bindparams(
+    bindparam("ids", type_=ARRAY(UUID(as_uuid=True)))
+)
+
+_GAUGES = (
+    ("jme_ingest_last_run_timestamp_seconds", "Unix time the latest run of the source finished."),
+    ("jme_ingest_run_seconds", "Wall time of the latest run."),
+    ("jme_ingest_run_ok", "1 if the latest run succeeded (or the board was unchanged), else 0."),
+    ("jme_ingest_bytes_downloaded", "Bytes downloaded by the latest run."),
+    ("jme_ingest_items", "Items of the latest run by outcome (seen, skipped, added)."),
+    ("jme_ingest_items_per_second", "Items seen per second of wall time in the latest run."),
+    ("jme_ingest_errors", "Errors in the latest run, retried requests included."),
+    ("jme_ingest_stage_seconds", "Busy time per stage in the latest run."),
+)
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def render_textfile(db: Session) -> str:
+    runs = db.execute(LATEST_RUNS_SQL).mappings().all()
+    stages: Dict[uuid.UUID, List] = {}
+    if runs:
+        for run_id, stage, secs in db.execute(STAGES_SQL, {"ids": [r["run_id"] for r in runs]}):
+            stages.setdefault(run_id, []).append((stage, secs))
+
+    samples: Dict[str, List[str]] = {name: [] for name, _ in _GAUGES}
+    for r in runs:
+        src = f'source="{_label(r["source"])}"'
+        if r["finished_at"] is not None:
+            samples["jme_ingest_last_run_timestamp_seconds"].append(f'{{{src}}} {r["finished_at"].timestamp():.3f}')
+        samples["jme_ingest_run_seconds"].append(f'{{{src}}} {r["seconds"]:.3f}')
+        samples["jme_ingest_run_ok"].append(f'{{{src}}} {int(r["status"] in ("ok", "not_modified"))}')
+        samples["jme_ingest_bytes_downloaded"].append(f'{{{src}}} {r["bytes_downloaded"]}')
+        for kind in ("seen", "skipped", "added"):
+            samples["jme_ingest_items"].append(f'{{{src},outcome="{kind}"}} {r[f"items_{kind}"]}')
+        rate = r["items_seen"] / r["seconds"] if r["seconds"] else 0.0
+        samples["jme_ingest_items_per_second"].append(f'{{{src}}} {rate:.3f}')
+        samples["jme_ingest_errors"].append(f'{{{src}}} {r["errors"]}')
+        for stage, secs in sorted(stages.get(r["run_id"], [])):
+            samples["jme_ingest_stage_seconds"].append(f'{{{src},stage="{_label(stage)}"}} {secs:.6f}')
+
+    lines = []
+    for name, help_text in _GAUGES:
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+        lines += [name + s for s in samples[name]]
+    return "\n".join(lines) + "\n"
+
+
+def export_textfile(db: Session, path: Path | str) -> None:
+    """Write render_textfile() atomically, as the textfile collector expects."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(render_textfile(db), encoding="utf-8")
+    tmp.replace(path)
+
+
+if __name__ == "__main__":
+    from db.session import SessionLocal
+
+    ap = argparse.ArgumentParser(description="Export the latest ingest run per source as Prometheus metrics")
+    ap.add_argument("--out", default=METRICS_TEXTFILE or "jme_ingest.prom")
+    args = ap.parse_args()
+    with SessionLocal() as db:
+        export_textfile(db, args.out)
+    print(f"Wrote {args.out}")
@@ -1,66 +1,165 @@
 # ingest/pipeline.py  (PATCHED)
 import asyncio
+import multiprocessing
+import importlib.util
 import re
-from datetime import datetime, timedelta
-from typing import Iterable, List, Dict, Any, Optional
+import uuid
+from datetime import datetime
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import nullcontext
+from itertools import islice
+from typing import AsyncIterator, Iterable, Iterator, List, Dict, Any, Optional, Tuple
 import os
 import httpx
 from bs4 import BeautifulSoup
 
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy import delete, select, update, any_, bindparam, text as sql, BigInteger, SmallInteger
 
 from db.session import SessionLocal
-from db.models import Job, Skill, JobSkill
+from db.models import Job, JobMinhashBand, JobSkill
 from core.hashing import text_hash
-from ingest.skills_extract import build_matcher, extract
-
-from ingest.dedupe import canonicalize_url, normalize_text, sha256_bytes
+from ingest.skills_extract import build_matcher, extract_ids_many
+from ingest.ratelimit import LIMITER, HostLimiter
+from ingest.http_cache import HTTP_CACHE, NotModified
+from ingest.json_stream import iter_array
+from ingest.html_text import normalize_description
+from ingest.metrics import RunStats, note_bytes, note_error
+from ingest.retry_queue import defer, is_transient, settle
+
+from ingest.dedupe import (
+    NEAR_DUP_THRESHOLD, band_hashes, canonicalize_url, jaccard, minhash, normalize_text,
+    sha256_bytes, sig_from_bytes, sig_to_bytes,
+)
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.dialects.postgresql import insert, ARRAY, UUID as PG_UUID
 from utils.seniority import infer_seniority
 from utils.salary import normalize_salary
-from ingest.location_utils import normalize_location
+from ingest.location_utils import normalize_city, normalize_location, normalize_mode
 
 HEADERS = {"User-Agent": "JobMarketExplorer/0.1 (academic/portfolio use)"}
 CONCURRENCY = 8
 REQUEST_TIMEOUT = 20.0
 MAX_RETRIES = 3
 RETRY_BACKOFF = 0.75  # seconds
-RATE_LIMIT_SECONDS = 1.0  # be gentle when hitting public endpoints
+MAX_CONNECTIONS = 20  # shared pool across all sources of a run
+HTTP2 = importlib.util.find_spec("h2") is not None
+STREAM_JSON = os.getenv("JME_STREAM_JSON", "1") == "1"  # parse board payloads incrementally
+BATCH_SIZE = 500  # items deduped/written per round of lookups
+EXTRACT_PROCESSES = int(os.getenv("JME_EXTRACT_PROCS", "1"))  # -1 = all cores
+NEAR_DUP = os.getenv("JME_NEAR_DUP", "1") == "1"  # MinHash/LSH repost detection on write
+HTML_PROCESSES = int(os.getenv("JME_HTML_PROCS", "-1"))  # BeautifulSoup workers; -1 = all cores, 0 = a thread
 
 # --- NEW: helpers ------------------------------------------------------------
 
-def _rate_limit():
-    return asyncio.sleep(RATE_LIMIT_SECONDS)
-
-async def _get_json(client: httpx.AsyncClient, url: str, params: Optional[Dict[str, Any]] = None) -> Any:
+async def _get(client: httpx.AsyncClient, url: str, params: Optional[Dict[str, Any]] = None,
+               limiter: HostLimiter = LIMITER) -> httpx.Response:
+    """
+    GET with retries, per-host pacing (`limiter`) and conditional-request
+    validators. Raises NotModified when the server confirms our cached copy (304).
+    """
+    key = str(httpx.URL(url).copy_merge_params(params or {}))
+    cond = HTTP_CACHE.conditional_headers(key)
     for attempt in range(1, MAX_RETRIES + 1):
+        await limiter.acquire(url)  # per-host token bucket; also waits out Retry-After
         try:
-            r = await client.get(url, headers=HEADERS, params=params or {}, timeout=REQUEST_TIMEOUT)
+            r = await client.get(url, headers={**HEADERS, **cond}, params=params or {}, timeout=REQUEST_TIMEOUT)
+            limiter.observe(url, r.status_code, r.headers)
+            note_bytes(r.num_bytes_downloaded)
+            if r.status_code == 304 and cond:
+                HTTP_CACHE.hits += 1
+                raise NotModified(key)
             r.raise_for_status()
-            return r.json()
+            if HTTP_CACHE.enabled:
+                HTTP_CACHE.misses += 1
+                HTTP_CACHE.store(key, r.headers, r.content)
+            return r
         except (httpx.ReadTimeout, httpx.ConnectTimeout, httpx.HTTPStatusError, httpx.TransportError):
             if attempt == MAX_RETRIES:
                 raise
+            note_error()
             await asyncio.sleep(RETRY_BACKOFF * attempt)
 
+async def _get_json(client: httpx.AsyncClient, url: str, params: Optional[Dict[str, Any]] = None,
+                    limiter: HostLimiter = LIMITER) -> Any:
+    # a 304 propagates as NotModified: the caller has nothing new to ingest
+    return (await _get(client, url, params, limiter)).json()
+
 async def fetch(client: httpx.AsyncClient, url: str) -> str:
+    try:
+        return (await _get(client, url)).text
+    except NotModified:
+        body = HTTP_CACHE.body(url)
+        if body is None:  # validators without a body: start over
+            HTTP_CACHE.forget(url)
+            return (await _get(client, url)).text
+        return body.decode("utf-8", errors="replace")
+
+async def _iter_json(client: httpx.AsyncClient, url: str, key: Optional[str] = None,
+                     limiter: HostLimiter = LIMITER) -> AsyncIterator[Any]:
+    """
+    Like _get_json(), but parses the array under `key` (or the top-level
+    array) from the response stream and yields its elements one at a time.
+    Retries only happen before the first element has been handed out.
+    """
+    cond = HTTP_CACHE.conditional_headers(url)
     for attempt in range(1, MAX_RETRIES + 1):
+        yielded = False
+        await limiter.acquire(url)
         try:
-            r = await client.get(url, headers=HEADERS, timeout=REQUEST_TIMEOUT)
-            r.raise_for_status()
-            return r.text
+            async with client.stream("GET", url, headers={**HEADERS, **cond}, timeout=REQUEST_TIMEOUT) as r:
+                limiter.observe(url, r.status_code, r.headers)
+                if r.status_code == 304 and cond:
+                    HTTP_CACHE.hits += 1
+                    raise NotModified(url)
+                r.raise_for_status()
+                seen = 0
+                async for obj in iter_array(r.aiter_bytes(), key):
+                    note_bytes(r.num_bytes_downloaded - seen)
+                    seen = r.num_bytes_downloaded
+                    yielded = True
+                    yield obj
+                note_bytes(r.num_bytes_downloaded - seen)
+                if HTTP_CACHE.enabled:
+                    HTTP_CACHE.misses += 1
+                    HTTP_CACHE.store(url, r.headers, None)  # only once the whole body parsed
+            return
         except (httpx.ReadTimeout, httpx.ConnectTimeout, httpx.HTTPStatusError, httpx.TransportError):
-            if attempt == MAX_RETRIES:
+            if yielded or attempt == MAX_RETRIES:
                 raise
+            note_error()
             await asyncio.sleep(RETRY_BACKOFF * attempt)
 
+def board_url(source: str) -> Optional[str]:
+    """API URL (and HTTP cache key) of a <provider>:<board> source; None for seed/html."""
+    from ingest.sources import REGISTRY  # adapters build on this module
+
+    provider, _, board = source.partition(":")
+    adapter = REGISTRY.get(provider)
+    return adapter().board_url(board) if adapter else None
+
 # --- EXISTING: HTML crawl (fallback/explicit only) ---------------------------
 
-async def crawl_source_html_list(client: httpx.AsyncClient, list_url: str) -> List[Dict[str, str]]:
-    # Only use this for sources you’ve confirmed are allowed to fetch.
-    html = await fetch(client, list_url)
+_HTML_POOL: Optional[Executor] = None
+
+def html_pool() -> Optional[Executor]:
+    """
+    Shared process pool for BeautifulSoup parsing, created on first use.
+    None (JME_HTML_PROCS=0) means the default thread pool: off the event
+    loop, but still one parse at a time under the GIL.
+    """
+    global _HTML_POOL
+    if _HTML_POOL is None and HTML_PROCESSES != 0:
+        n = (os.cpu_count() or 1) if HTML_PROCESSES == -1 else HTML_PROCESSES
+        _HTML_POOL = ProcessPoolExecutor(max_workers=n, mp_context=multiprocessing.get_context())
+    return _HTML_POOL
+
+async def _parse_html(fn, html: str, *args):
+    # the worker gets the raw page and sends back only the extracted fields
+    return await asyncio.get_running_loop().run_in_executor(html_pool(), fn, html, *args)
+
+def parse_job_list(html: str) -> List[Dict[str, str]]:
+    """Job stubs (title, url) linked from a board's list page."""
     soup = BeautifulSoup(html, "html.parser")
     jobs: List[Dict[str, str]] = []
     for a in soup.select("a[href*='/jobs/']"):
@@ -85,15 +184,14 @@ def _parse_posted_at(soup: BeautifulSoup) -> Optional[datetime]:
             pass
     return None
 
-async def enrich_job_html(client: httpx.AsyncClient, job_stub: Dict[str, Any]) -> Dict[str, Any]:
-    html = await fetch(client, job_stub["url"])
+def parse_job_page(html: str) -> Dict[str, Any]:
+    """Description, location and posting date of one job page."""
     soup = BeautifulSoup(html, "html.parser")
     desc = soup.get_text(separator="\n", strip=True)
     loc_el = soup.select_one(".location, .job-location, [data-qa='job-location']")
     loc_text = loc_el.get_text(strip=True) if loc_el else None
     city, region, country = normalize_location(loc_text)
     return {
-        **job_stub,
         "description_text": desc[:200000],
         "city": city,
         "region": region,
@@ -102,120 +200,585 @@ async def enrich_job_html(client: httpx.AsyncClient, job_stub: Dict[str, Any]) -
         "posted_at": _parse_posted_at(soup),
     }
 
-# --- NEW: Greenhouse JSON adapter (per-company) ------------------------------
-
-async def greenhouse_company_jobs(client: httpx.AsyncClient, company_slug: str, days: int) -> List[Dict[str, Any]]:
-    # https://boards-api.greenhouse.io/v1/boards/{slug}/jobs
-    url = f"https://boards-api.greenhouse.io/v1/boards/{company_slug}/jobs"
-    data = await _get_json(client, url, params={"content": "true"})
-    cutoff = datetime.utcnow() - timedelta(days=days)
-    out: List[Dict[str, Any]] = []
-    for j in data.get("jobs", []):
-        posted = j.get("updated_at") or j.get("created_at")
-        posted_dt = None
-        if posted:
-            # "2024-09-01T12:34:56Z"
-            try:
-                posted_dt = datetime.fromisoformat(posted.replace("Z", "+00:00")).replace(tzinfo=None)
-            except Exception:
-                posted_dt = None
-        if posted_dt and posted_dt < cutoff:
-            continue
-
-        loc = (j.get("location") or {}).get("name") or ""
-        city, region, country = normalize_location(loc)
-
-        out.append({
-            "title": j.get("title", "").strip(),
-            "company": (j.get("offices") or [{}])[0].get("name")
-                       or (j.get("departments") or [{}])[0].get("name")
-                       or "Unknown",
-            "description_text": (j.get("content") or "")[:200000],
-            "url": j.get("absolute_url"),
-            "city": city or "N/A",
-            "region": region,
-            "country": country,
-            "location": loc,
-            "posted_at": posted_dt,
-            "source": f"greenhouse:{company_slug}",
-        })
-        await _rate_limit()
-    return out
+async def crawl_source_html_list(client: httpx.AsyncClient, list_url: str) -> List[Dict[str, str]]:
+    # Only use this for sources you’ve confirmed are allowed to fetch.
+    html = await fetch(client, list_url)
+    return await _parse_html(parse_job_list, html)
 
-# --- NEW: Lever JSON adapter (per-company) -----------------------------------
-
-async def lever_company_jobs(client: httpx.AsyncClient, company_slug: str, days: int) -> List[Dict[str, Any]]:
-    # https://api.lever.co/v0/postings/{slug}?mode=json
-    url = f"https://api.lever.co/v0/postings/{company_slug}"
-    data = await _get_json(client, url, params={"mode": "json"})
-    cutoff = datetime.utcnow() - timedelta(days=days)
-    out: List[Dict[str, Any]] = []
-    for j in data:
-        posted_ms = j.get("createdAt")
-        posted_dt = datetime.utcfromtimestamp(posted_ms / 1000) if posted_ms else None
-        if posted_dt and posted_dt < cutoff:
-            continue
-        loc = (j.get("categories") or {}).get("location") or ""
-        city, region, country = normalize_location(loc)
-        out.append({
-            "title": j.get("text", "").strip(),
-            "company": (j.get("categories") or {}).get("team") or "Unknown",
-            "description_text": (j.get("descriptionPlain") or j.get("description") or "")[:200000],
-            "url": j.get("hostedUrl"),
-            "city": city or "N/A",
-            "region": region,
-            "country": country,
-            "location": loc,
-            "posted_at": posted_dt,
-            "source": f"lever:{company_slug}",
-        })
-        await _rate_limit()
-    return out
+async def enrich_job_html(client: httpx.AsyncClient, job_stub: Dict[str, Any]) -> Dict[str, Any]:
+    html = await fetch(client, job_stub["url"])
+    return {**job_stub, **await _parse_html(parse_job_page, html)}
 
 # --- EXISTING: orchestrate ---------------------------------------------------
 
-async def run_once(source: str = "seed", days: int = 7):
-    async with httpx.AsyncClient(follow_redirects=True, headers=HEADERS, timeout=REQUEST_TIMEOUT) as client:
-
-        items: List[Dict[str, Any]] = []
-
-        if source == "seed":
-            # You already have your seed helper; keep it.
-            from ingest.seed_jobs import iter_seed_jobs
-            items = list(iter_seed_jobs(days=days))
+def make_client() -> httpx.AsyncClient:
+    """
+    One pooled keep-alive client to share across sources. HTTP/2 is used when
+    the optional `h2` package is installed (pip install "httpx[http2]").
+    """
+    return httpx.AsyncClient(
+        follow_redirects=True,
+        headers=HEADERS,
+        timeout=REQUEST_TIMEOUT,
+        http2=HTTP2,
+        limits=httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_CONNECTIONS),
+    )
+
+async def iter_source(client: httpx.AsyncClient, source: str, days: int) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Items of one source as they become available. `<provider>:<board>`
+    sources go through the provider's adapter in ingest.sources.REGISTRY;
+    boards are yielded whole (the watermark needs every live id) and a 304
+    surfaces as NotModified before the first item.
+    """
+    from ingest.sources import REGISTRY
+
+    provider, _, board = source.partition(":")
+    if source == "seed":
+        # You already have your seed helper; keep it.
+        from ingest.seed_jobs import iter_seed_jobs
+        for it in iter_seed_jobs(days=days):
+            yield it
+
+    elif provider in REGISTRY:
+        async for it in REGISTRY[provider](client).iter_items(board):
+            yield it
+
+    elif provider == "html":
+        # explicit HTML crawl only when allowed
+        list_url = source.split(":", 1)[1]
+        stubs = await crawl_source_html_list(client, list_url)
+        async for d in enrich_stubs(client, source, stubs):
+            yield d
+
+    else:
+        raise SystemExit(f"Unknown source {source}")
+
+async def enrich_stubs(client: httpx.AsyncClient, source: str,
+                       stubs: List[Dict[str, Any]]) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Fetch the job page of every stub with CONCURRENCY workers, yielding items
+    as they complete. Workers hand pages over through a queue of CONCURRENCY
+    slots, so they stop fetching while the consumer is behind: pages in
+    memory stay bounded no matter how large the board is. A page that fails
+    transiently goes to the retry queue (ingest.retry_queue) instead of being
+    lost; the crawl carries on.
+    """
+    pending = iter(stubs)
+    done: asyncio.Queue = asyncio.Queue(CONCURRENCY)
+    finished = object()
+
+    async def enrich_one(stub):
+        try:
+            d = await enrich_job_html(client, stub)
+        except Exception as e:
+            print(f"[warn] enrich failed for {stub.get('url')}: {e}")
+            if is_transient(e):
+                defer("posting", source, stub["url"], e, payload=stub)
+            else:
+                note_error()
+            return None
+        settle(source, stub["url"])
+        return d
+
+    async def worker():
+        for stub in pending:  # shared iterator: each stub goes to one worker
+            await done.put(await enrich_one(stub))
+        await done.put(finished)
+
+    workers = [asyncio.create_task(worker()) for _ in range(min(CONCURRENCY, len(stubs)))]
+    try:
+        running = len(workers)
+        while running:
+            d = await done.get()
+            if d is finished:
+                running -= 1
+            elif d:
+                yield d
+    finally:
+        for w in workers:
+            w.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+async def run_once(source: str = "seed", days: int = 7, bulk: bool = False,
+                   client: Optional[httpx.AsyncClient] = None) -> Optional[int]:
+    """Stream one source through fetch → extract → write (see ingest.stream)."""
+    from ingest.stream import IngestStream  # stream builds on this module
+
+    async with IngestStream(bulk=bulk) as stream:
+        if client is None:
+            async with make_client() as client:
+                return await stream.ingest(client, source, days)
+        return await stream.ingest(client, source, days)
+
+def forget_source(source: str) -> None:
+    """Drop a board's cached validators so the next run re-downloads what we failed to store."""
+    url = board_url(source)
+    if url:
+        HTTP_CACHE.forget(url)
+
+def _chunks(items: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    it = iter(items)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+def _any(column, values):
+    """`column = ANY(:arr)` with the array typed after the column."""
+    return column == any_(bindparam(None, list(values), type_=ARRAY(column.type)))
+
+def dedupe_batch(db: Session, chunk: List[Dict[str, Any]],
+                 lock: bool = False) -> List[Tuple[Dict[str, Any], Optional[bytes], bytes]]:
+    """
+    Split a chunk of normalized items into new vs. already-stored postings.
+
+    Hashes are computed for the whole chunk up front and resolved with one
+    `= ANY(:arr)` query per key type (url_hash, url, desc_hash). Duplicates
+    inside the chunk are caught in memory. Existing rows matched by URL get
+    their missing hashes backfilled, exactly like the old per-item lookups.
+    Survivors then go through drop_near_duplicates() (reposts with edits).
+
+    Two kinds of stored match are flagged on the item instead of just dropped:
+
+    * `edit_of`: the posting's URL is stored but its title or text changed;
+      write_chunk() updates that row (update_edits()).
+    * `duplicate_of`: a board posting with a new external_id whose text is
+      a stored row of the same source; the Watermark decides at finish()
+      whether the row moves to the new id (Watermark.repost()).
+
+    With `lock`, the chunk's hashes are locked first (lock_rows()).
+
+    Returns `(item, url_hash, desc_hash)` for every item that should be inserted.
+    """
+    keyed = []
+    for it in chunk:
+        canon_url = canonicalize_url(it.get("url", ""))
+        url_hash = sha256_bytes(canon_url) if canon_url else None
+        desc_bin = sha256_bytes(normalize_text(it.get("description_text", "")))
+        keyed.append((it, canon_url, url_hash, desc_bin))
+
+    url_hashes = {k[2] for k in keyed if k[2]}
+    urls = {u for k in keyed for u in (k[1], k[0].get("url")) if u}
+    desc_hashes = {k[3] for k in keyed}
+    if lock:
+        lock_rows(db, url_hashes | desc_hashes)
+
+    by_url_hash: Dict[bytes, Any] = {}
+    if url_hashes:
+        q = select(Job.url_hash, Job.job_id, Job.title, Job.desc_hash).where(_any(Job.url_hash, url_hashes))
+        by_url_hash = {r.url_hash: r for r in db.execute(q)}
+    seen_url_hash = set(by_url_hash)
+    by_url: Dict[str, Job] = {}
+    if urls:
+        for job in db.scalars(select(Job).where(_any(Job.url, urls))):
+            by_url[job.url] = job
+    by_desc_hash: Dict[bytes, List[Any]] = {}
+    q = select(Job.desc_hash, Job.job_id, Job.source, Job.external_id).where(_any(Job.desc_hash, desc_hashes))
+    for r in db.execute(q):
+        by_desc_hash.setdefault(r.desc_hash, []).append(r)
+    seen_desc_hash = set(by_desc_hash)
+
+    out = []
+    for it, canon_url, url_hash, desc_bin in keyed:
+        # 1) prefer url_hash if present
+        if url_hash and url_hash in seen_url_hash:
+            stored = by_url_hash.pop(url_hash, None)  # first sighting in the chunk only
+            if stored is not None:
+                _flag_edit(it, stored, desc_bin)
+            continue
+        # 2) transition safety: also check by URL (existing rows may have url_hash=NULL)
+        existing = by_url.get(canon_url) or by_url.get(it.get("url"))
+        if existing and url_hash and not existing.url_hash:
+            # backfill missing hashes on the existing row
+            existing.url_hash = url_hash
+            seen_url_hash.add(url_hash)
+
+        # 3) description hash dedupe
+        if existing:
+            if not existing.desc_hash:
+                existing.desc_hash = desc_bin
+                seen_desc_hash.add(desc_bin)
+            else:
+                _flag_edit(it, existing, desc_bin)
+            continue
+        if desc_bin in seen_desc_hash:
+            _flag_repost(it, by_desc_hash.get(desc_bin, ()), url_hash)
+            continue
 
-        elif source.startswith("greenhouse:"):
-            slug = source.split(":", 1)[1]
-            items = await greenhouse_company_jobs(client, slug, days)
+        if url_hash:
+            seen_url_hash.add(url_hash)
+        seen_desc_hash.add(desc_bin)
+        out.append((it, url_hash, desc_bin))
+    return drop_near_duplicates(db, out)
+
+def _flag_edit(it: Dict[str, Any], stored: Any, desc_bin: bytes) -> None:
+    if stored.desc_hash != desc_bin or stored.title != it.get("title"):
+        it["edit_of"] = stored.job_id
+
+def _flag_repost(it: Dict[str, Any], stored: Iterable[Any], url_hash: Optional[bytes]) -> None:
+    """Point a new board posting at a stored row of its source under another id."""
+    ext_id, source = it.get("external_id"), it.get("source")
+    if not ext_id:
+        return
+    for r in stored:
+        if r.source == source and r.external_id != ext_id:
+            it["duplicate_of"] = {"job_id": r.job_id, "external_id": r.external_id, "url_hash": url_hash}
+            return
+
+# --- near-duplicates: LSH probe of job_minhash_bands ---------------------------
+
+BAND_LOOKUP_SQL = sql("""
+SELECT b.band, b.band_hash, b.job_id
+FROM unnest(:bands, :hashes) AS q(band, band_hash)
+JOIN job_minhash_bands b ON b.band = q.band AND b.band_hash = q.band_hash
+""").bindparams(bindparam("bands", type_=ARRAY(SmallInteger())), bindparam("hashes", type_=ARRAY(BigInteger())))
+
+# rows of a bulk merge that lost a race never reach `jobs`: the join drops their bands
+BAND_INSERT_SQL = sql("""
+INSERT INTO job_minhash_bands (band, band_hash, job_id)
+SELECT v.band, v.band_hash, v.job_id
+FROM unnest(:bands, :hashes, :job_ids) AS v(band, band_hash, job_id)
+JOIN jobs j ON j.job_id = v.job_id
+ON CONFLICT DO NOTHING
+""").bindparams(
+    bindparam("bands", type_=ARRAY(SmallInteger())),
+    bindparam("hashes", type_=ARRAY(BigInteger())),
+    bindparam("job_ids", type_=ARRAY(PG_UUID(as_uuid=True))),
+)
+
+def drop_near_duplicates(db: Session, rows: List[Tuple[Dict[str, Any], Optional[bytes], bytes]],
+                         threshold: float = NEAR_DUP_THRESHOLD) -> List[Tuple[Dict[str, Any], Optional[bytes], bytes]]:
+    """
+    Attach a MinHash signature (`it["minhash"]`) to every row and drop rows
+    that repost a live stored job or an earlier row of the chunk: a shared
+    LSH band makes a candidate, an estimated Jaccard >= `threshold` on the
+    description plus the same company, title and location (posting_key())
+    make a repost. Postings that share boilerplate but differ in title or
+    region are separate jobs and are kept. A board posting that reposts a
+    row of its source under another id is flagged `duplicate_of`, as in
+    dedupe_batch(). One band lookup and one signature fetch per chunk.
+    With JME_NEAR_DUP=0 only signatures are set.
+    """
+    keys = []
+    for it, _, _ in rows:
+        if it.get("minhash") is None:
+            it["minhash"] = minhash(it.get("description_text") or "")
+        keys.append(band_hashes(it["minhash"]) if it["minhash"] is not None else None)
+    if not NEAR_DUP:
+        return rows
+
+    probe = sorted({(b, h) for k in keys if k for b, h in enumerate(k)})
+    stored_by_band: Dict[Tuple[int, int], List[uuid.UUID]] = {}
+    if probe:
+        found = db.execute(BAND_LOOKUP_SQL, {"bands": [b for b, _ in probe], "hashes": [h for _, h in probe]})
+        for band, band_hash, job_id in found:
+            stored_by_band.setdefault((band, band_hash), []).append(job_id)
+    stored: Dict[uuid.UUID, Any] = {}
+    stored_rows: Dict[uuid.UUID, Any] = {}
+    job_ids = {j for ids in stored_by_band.values() for j in ids}
+    if job_ids:
+        q = select(Job.job_id, Job.minhash, Job.source, Job.external_id,
+                   Job.company, Job.title, Job.city, Job.region, Job.country).where(
+            _any(Job.job_id, job_ids), Job.active, Job.minhash.is_not(None))
+        for r in db.execute(q):
+            stored[r.job_id] = sig_from_bytes(r.minhash)
+            stored_rows[r.job_id] = r
+
+    out = []
+    local_by_band: Dict[Tuple[int, int], List[int]] = {}  # band key -> indexes into `out`
+    for row, k in zip(rows, keys):
+        if k is None:
+            out.append(row)
+            continue
+        sig = row[0]["minhash"]
+        ident = posting_key(row[0])
+        bands = list(enumerate(k))
+        hits = [stored_rows[j] for key in bands for j in stored_by_band.get(key, ())
+                if j in stored and _stored_key(stored_rows[j]) == ident and jaccard(sig, stored[j]) >= threshold]
+        if hits:
+            _flag_repost(row[0], hits, row[1])  # an edited repost takes over like an exact one
+            continue
+        if any(posting_key(out[i][0]) == ident and jaccard(sig, out[i][0]["minhash"]) >= threshold
+               for key in bands for i in local_by_band.get(key, ())):
+            continue
+        for key in bands:
+            local_by_band.setdefault(key, []).append(len(out))
+        out.append(row)
+    return out
 
-        elif source.startswith("lever:"):
-            slug = source.split(":", 1)[1]
-            items = await lever_company_jobs(client, slug, days)
+def posting_key(it: Dict[str, Any]) -> Tuple[str, ...]:
+    """Company, title and location of an item as _job_fields() would store them."""
+    city, region, country = normalize_location(it.get("location"), it.get("city"), it.get("region"), it.get("country"))
+    return (normalize_text(it.get("company")), normalize_text(it.get("title")),
+            city or "N/A", region or "N/A", country or "N/A")
 
-        elif source.startswith("html:"):
-            # explicit HTML crawl only when allowed
-            list_url = source.split(":", 1)[1]
-            stubs = await crawl_source_html_list(client, list_url)
-            sem = asyncio.Semaphore(CONCURRENCY)
+def _stored_key(r: Any) -> Tuple[str, ...]:
+    return (normalize_text(r.company), normalize_text(r.title), r.city, r.region, r.country)
 
-            async def bound_enrich(stub):
-                async with sem:
-                    try:
-                        return await enrich_job_html(client, stub)
-                    except Exception as e:
-                        print(f"[warn] enrich failed for {stub.get('url')}: {e}")
-                        return None
+def index_minhash(db: Session, jobs: List[Tuple[uuid.UUID, Any]]) -> None:
+    """Store the LSH band rows for `(job_id, signature)` pairs of freshly written jobs."""
+    bands, hashes, job_ids = [], [], []
+    for job_id, sig in jobs:
+        if sig is None:
+            continue
+        for b, h in enumerate(band_hashes(sig)):
+            bands.append(b)
+            hashes.append(h)
+            job_ids.append(job_id)
+    if job_ids:
+        db.execute(BAND_INSERT_SQL, {"bands": bands, "hashes": hashes, "job_ids": job_ids})
+
+def _job_fields(it: Dict[str, Any], url_hash: Optional[bytes], desc_bin: bytes) -> Dict[str, Any]:
+    """Column values for a new `jobs` row built from a normalized item."""
+    norm_city, norm_region, norm_country = normalize_location(
+        it.get("location"), it.get("city"), it.get("region"), it.get("country")
+    )
+    return dict(
+        title=it["title"],
+        company=it["company"],
+        city=norm_city or "N/A",
+        region=norm_region or "N/A",
+        country=norm_country or "N/A",
+        city_norm=normalize_city(norm_city, norm_region, norm_country),
+        mode_norm=normalize_mode(norm_city),
+        posted_at=it.get("posted_at"),
+        source=it.get("source", "crawl"),
+        url=it.get("url"),
+        external_id=it.get("external_id"),
+        url_hash=url_hash,
+        description_text=it.get("description_text", ""),
+        desc_hash=desc_bin,
+        minhash=sig_to_bytes(it["minhash"]) if it.get("minhash") is not None else None,
+        seniority=infer_seniority(it.get("title")),
+        salary_usd_annual=normalize_salary(
+            it.get("salary_min"),
+            it.get("salary_max"),
+            it.get("salary_currency"),
+            it.get("salary_period"),
+            ),
+    )
+
+# --- bulk write path: COPY into staging, merge set-based -----------------------
+
+STAGE_COLUMNS = (
+    "batch_id", "job_id", "title", "company", "city", "region", "country", "city_norm", "mode_norm",
+    "posted_at", "source", "url", "external_id", "url_hash", "description_text", "desc_hash", "minhash",
+    "seniority", "salary_usd_annual",
+)
+
+MERGE_SQL = sql("""
+WITH ins AS (
+  INSERT INTO jobs (job_id, title, company, city, region, country, city_norm, mode_norm, posted_at,
+                    source, url, external_id, url_hash, description_text, desc_hash, minhash,
+                    seniority, salary_usd_annual)
+  SELECT job_id, title, company, city, region, country, city_norm, mode_norm, posted_at,
+         source, url, external_id, url_hash, description_text, desc_hash, minhash,
+         seniority, salary_usd_annual
+  FROM jobs_stage
+  WHERE batch_id = :batch_id
+  ON CONFLICT DO NOTHING
+  RETURNING job_id
+),
+links AS (
+  INSERT INTO job_skills (job_id, skill_id, confidence, source)
+  SELECT s.job_id, s.skill_id, s.confidence, 'dict_v1'
+  FROM job_skills_stage s
+  JOIN ins ON ins.job_id = s.job_id
+  WHERE s.batch_id = :batch_id
+  ON CONFLICT (job_id, skill_id) DO UPDATE
+    SET confidence = EXCLUDED.confidence, source = EXCLUDED.source
+  RETURNING 1
+)
+SELECT (SELECT COUNT(*) FROM ins)::int AS jobs, (SELECT COUNT(*) FROM links)::int AS links
+""")
+
+def bulk_write(db: Session, rows: List[Tuple[Dict[str, Any], Optional[bytes], bytes]]) -> int:
+    """
+    Write deduped `(item, url_hash, desc_hash)` rows with COPY + one merge.
+
+    Jobs and their skill links are streamed into the unlogged `jobs_stage` /
+    `job_skills_stage` tables, then moved into `jobs` and `job_skills` by a
+    single INSERT ... SELECT ... ON CONFLICT. Rows that lost a race on
+    url/url_hash are dropped by the merge. Returns the number of jobs inserted.
+    """
+    if not rows:
+        return 0
+
+    batch_id = uuid.uuid4()
+    fields = [_job_fields(it, url_hash, desc_bin) for it, url_hash, desc_bin in rows]
+    found = _skill_hits(rows, fields)
+
+    job_rows = []
+    skill_rows = []
+    sigs = []
+    for (it, _, _), f, hits in zip(rows, fields, found):
+        job_id = uuid.uuid4()
+        job_rows.append((batch_id, job_id, *(f[c] for c in STAGE_COLUMNS[2:])))
+        skill_rows.extend((batch_id, job_id, skill_id, conf) for skill_id, conf in hits)
+        sigs.append((job_id, it.get("minhash")))
+
+    with db.connection().connection.driver_connection.cursor() as cur:
+        with cur.copy(f"COPY jobs_stage ({', '.join(STAGE_COLUMNS)}) FROM STDIN") as cp:
+            for r in job_rows:
+                cp.write_row(r)
+        if skill_rows:
+            with cur.copy("COPY job_skills_stage (batch_id, job_id, skill_id, confidence) FROM STDIN") as cp:
+                for r in skill_rows:
+                    cp.write_row(r)
+
+    inserted = db.execute(MERGE_SQL, {"batch_id": batch_id}).mappings().one()["jobs"]
+    index_minhash(db, sigs)
+    db.execute(sql("DELETE FROM job_skills_stage WHERE batch_id = :b"), {"b": batch_id})
+    db.execute(sql("DELETE FROM jobs_stage WHERE batch_id = :b"), {"b": batch_id})
+    return inserted
+
+def upsert_job_skills(db: Session, links: List[Dict[str, Any]]) -> None:
+    """One multi-row upsert for every job_skills link of a chunk."""
+    if not links:
+        return
+    stmt = insert(JobSkill).values(links)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[JobSkill.job_id, JobSkill.skill_id],
+        set_={"confidence": stmt.excluded.confidence, "source": stmt.excluded.source},
+    )
+    db.execute(stmt)
+
+def _skill_hits(rows: List[Tuple[Dict[str, Any], Optional[bytes], bytes]],
+                fields: List[Dict[str, Any]]) -> List[List[Tuple[int, float]]]:
+    """Skill ids per row: precomputed `skill_hits` (streaming path) or extracted now."""
+    found = [it.get("skill_hits") for it, _, _ in rows]
+    todo = [i for i, hits in enumerate(found) if hits is None]
+    if todo:
+        extracted = extract_ids_many([fields[i]["description_text"] or "" for i in todo], n_process=EXTRACT_PROCESSES)
+        for i, hits in zip(todo, extracted):
+            found[i] = hits
+    return found
+
+EDIT_COLUMNS = (
+    "title", "company", "city", "region", "country", "city_norm", "mode_norm", "posted_at",
+    "description_text", "desc_hash", "minhash", "seniority", "salary_usd_annual",
+)
+
+def update_edits(db: Session, items: List[Dict[str, Any]]) -> None:
+    """
+    Rewrite the rows that items flagged `edit_of` (dedupe_batch()) point at:
+    columns, skill links and LSH bands follow the new text.
+    """
+    if not items:
+        return
+    rows = []
+    for it in items:
+        if it.get("minhash") is None:
+            it["minhash"] = minhash(it.get("description_text") or "")
+        rows.append((it, None, sha256_bytes(normalize_text(it.get("description_text", "")))))
+    fields = [_job_fields(it, url_hash, desc_bin) for it, url_hash, desc_bin in rows]
+    found = _skill_hits(rows, fields)
+    job_ids = [it["edit_of"] for it in items]
+
+    db.execute(update(Job), [
+        {"job_id": job_id, **{c: f[c] for c in EDIT_COLUMNS if c != "posted_at" or f[c] is not None}}
+        for job_id, f in zip(job_ids, fields)
+    ])
+    db.execute(delete(JobSkill).where(_any(JobSkill.job_id, job_ids)))
+    upsert_job_skills(db, [
+        {"job_id": job_id, "skill_id": skill_id, "confidence": conf, "source": "dict_v1"}
+        for job_id, hits in zip(job_ids, found) for skill_id, conf in hits
+    ])
+    db.execute(delete(JobMinhashBand).where(_any(JobMinhashBand.job_id, job_ids)))
+    index_minhash(db, [(job_id, it["minhash"]) for job_id, it in zip(job_ids, items)])
+
+# one advisory lock per hash, taken in key order: chunks are committed one at
+# a time, so two workers never wait on each other in a cycle
+ROW_LOCK_SQL = sql("""
+SELECT pg_advisory_xact_lock(k) FROM (SELECT DISTINCT k FROM unnest(:keys) AS k ORDER BY k) AS s
+""").bindparams(bindparam("keys", type_=ARRAY(BigInteger())))
+
+def lock_rows(db: Session, hashes: Iterable[bytes]) -> None:
+    """
+    Hold a cross-process lock per url_hash / desc_hash until the current
+    transaction ends. dedupe_batch() checks for existing rows before
+    inserting; with several ingest processes, this keeps two of them from
+    both inserting one posting, while chunks without shared postings don't
+    wait on each other.
+    """
+    keys = sorted({int.from_bytes(h[:8], "big", signed=True) for h in hashes if h})
+    if keys:
+        db.execute(ROW_LOCK_SQL, {"keys": keys})
+
+def write_chunk(db: Session, chunk: List[Dict[str, Any]], bulk: bool = False,
+                stats: Optional[RunStats] = None, exclusive: bool = False) -> int:
+    """
+    Dedupe and write one chunk of items in the current transaction (no commit).
+    Items may carry precomputed `skill_hits`; the rest are extracted here.
+    Edited postings update their stored row (update_edits()). Expects
+    build_matcher(db) to have run. Returns the number of jobs added.
+    `stats` gets the dedupe and write timings; `exclusive` locks the chunk's
+    postings first (lock_rows(); sharded workers).
+    """
+    for it in chunk:
+        normalize_description(it)  # no-op when the stream already did it
+        if not it.get("company"):
+            it["company"] = it.get("source", "crawl").replace("_", " ").title()
+
+    with stats.timer("dedupe") if stats else nullcontext():
+        new_rows = dedupe_batch(db, chunk, lock=exclusive)
+    with stats.timer("write") if stats else nullcontext():
+        update_edits(db, [it for it in chunk if it.get("edit_of")])
+        return _write_rows(db, new_rows, bulk)
+
+def _write_rows(db: Session, new_rows: List[Tuple[Dict[str, Any], Optional[bytes], bytes]], bulk: bool) -> int:
+    if bulk:
+        db.flush()  # hash backfills on existing rows go out before the merge
+        return bulk_write(db, new_rows)
+
+    fields = [_job_fields(it, url_hash, desc_bin) for it, url_hash, desc_bin in new_rows]
+    found = _skill_hits(new_rows, fields)
+
+    added = 0
+    links: List[Dict[str, Any]] = []
+    sigs = []
+    for (it, _, _), f, hits in zip(new_rows, fields, found):
+        job = Job(**f)
+        try:
+            # savepoint per row: a conflict only discards this job, not the
+            # earlier rows of the chunk whose skill links are still pending
+            with db.begin_nested():
+                db.add(job)
+        except IntegrityError:
+            # Race or leftover duplicates on url — recover by updating existing row
+            ex = db.query(Job).filter(
+                Job.url == f["url"]
+            ).first()
+            if ex:
+                if f["url_hash"] and not ex.url_hash:
+                    ex.url_hash = f["url_hash"]
+                if not ex.desc_hash:
+                    ex.desc_hash = f["desc_hash"]
+                db.flush()
+                continue
+            else:
+                raise
 
-            details = await asyncio.gather(*(bound_enrich(s) for s in stubs))
-            items = [d for d in details if d]
+        links.extend(
+            {"job_id": job.job_id, "skill_id": skill_id, "confidence": conf, "source": "dict_v1"}
+            for skill_id, conf in hits
+        )
+        sigs.append((job.job_id, it.get("minhash")))
+        added += 1
 
-        else:
-            raise SystemExit(f"Unknown source {source}")
+    upsert_job_skills(db, links)
+    index_minhash(db, sigs)
+    return added
 
-        save_to_db(items)
+def save_to_db(items, db: Optional[Session] = None, bulk: bool = False) -> int:
+    """
+    Persist items. If `db` is None, manage our own SessionLocal().
 
-def save_to_db(items, db: Optional[Session] = None) -> int:
-    """Persist items. If `db` is None, manage our own SessionLocal()."""
+    `bulk=True` writes each deduped chunk through `bulk_write` (COPY + merge)
+    instead of one flush and one skill upsert per row.
+    """
     own_session = False
     if db is None:
         db = SessionLocal()
@@ -225,108 +788,8 @@ def save_to_db(items, db: Optional[Session] = None) -> int:
         build_matcher(db)
 
         added = 0
-        for it in items:
-            if not it.get("company"):
-                it["company"] = it.get("source", "crawl").replace("_", " ").title()
-
-            # URL dedupe
-            canon_url = canonicalize_url(it.get("url", ""))
-            url_hash = sha256_bytes(canon_url) if canon_url else None
-            # 1) prefer url_hash if present
-            if url_hash and db.query(Job).filter_by(url_hash=url_hash).first():
-                continue
-            # 2) transition safety: also check by URL (existing rows may have url_hash=NULL)
-            raw_url = it.get("url")
-            existing = None
-            if canon_url or raw_url:
-                existing = db.query(Job).filter( or_(Job.url == canon_url, Job.url == raw_url)).first()
-                if existing:
-                    # backfill missing hashes on the existing row, then skip
-                    if url_hash and not existing.url_hash:
-                        existing.url_hash = url_hash
-                    pass
-
-
-            if url_hash and db.query(Job).filter_by(url_hash=url_hash).first():
-                continue
-
-            # hash dedupe
-            desc_bin = sha256_bytes(normalize_text(it.get("description_text", "")))
-
-
-            if db.query(Job).filter_by(desc_hash=desc_bin).first():
-                continue
-
-            if existing:
-                if not existing.desc_hash:
-                    existing.desc_hash = desc_bin
-                continue
-
-            norm_city, norm_region, norm_country = normalize_location(
-                it.get("location"), it.get("city"), it.get("region"), it.get("country")
-            )
-
-            job = Job(
-                title=it["title"],
-                company=it["company"],
-                city=norm_city or "N/A",
-                region=norm_region or "N/A",
-                country=norm_country or "N/A",
-                posted_at=it.get("posted_at"),
-                source=it.get("source", "crawl"),
-                url=it.get("url"),
-                url_hash=url_hash,
-                description_text=it.get("description_text", ""),
-                desc_hash=desc_bin,
-                seniority=infer_seniority(it.get("title")),
-                salary_usd_annual=normalize_salary(
-                    it.get("salary_min"),
-                    it.get("salary_max"),
-                    it.get("salary_currency"),
-                    it.get("salary_period"),
-                    ),
-            )
-            db.add(job)
-            #db.flush()
-
-            try:
-                db.flush()
-            except IntegrityError:
-                # Race or leftover duplicates on url — recover by updating existing row
-                db.rollback()
-                ex = db.query(Job).filter(
-                    Job.url == it.get("url")
-                ).first()
-                if ex:
-                    if url_hash and not ex.url_hash:
-                        ex.url_hash = url_hash
-                    if not ex.desc_hash:
-                        ex.desc_hash = desc_bin
-                    db.flush()
-                    continue
-                else:
-                    raise
-
-            for name, conf in extract(job.description_text or ""):
-                skill = db.query(Skill).filter_by(name_canonical=name).first()
-                if not skill:
-                    # dictionary not seeded / mismatch — skip or log
-                    # logger.warning(f"Unknown skill {name} on job {job.job_id}")
-                    continue
-
-
-                stmt = insert(JobSkill).values(
-                    job_id=job.job_id,
-                    skill_id=skill.skill_id,
-                    confidence=conf,
-                    source="dict_v1",
-                ).on_conflict_do_update(
-                    index_elements=[JobSkill.job_id, JobSkill.skill_id],
-                    set_={"confidence": conf, "source": "dict_v1"}
-                )
-                db.execute(stmt)
-
-            added += 1
+        for chunk in _chunks(items, BATCH_SIZE):
+            added += write_chunk(db, chunk, bulk)
 
         db.commit()
         print(f"Ingested {added} jobs")
@@ -341,7 +804,8 @@ if __name__ == "__main__":
     import argparse
     ap = argparse.ArgumentParser()
     ap.add_argument("--source", default=os.getenv("JME_SOURCE", "seed"),
-                    help="seed | greenhouse:<slug> | lever:<slug> | html:<list_url>")
+                    help="seed | <provider>:<board> (see ingest.sources.REGISTRY) | html:<list_url>")
     ap.add_argument("--days", type=int, default=int(os.getenv("JME_DAYS", "7")))
+    ap.add_argument("--bulk", action="store_true", help="write through COPY + set-based merge")
     args = ap.parse_args()
-    asyncio.run(run_once(source=args.source, days=args.days))
+    asyncio.run(run_once(source=args.source, days=args.days, bulk=args.bulk))
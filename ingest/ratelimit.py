@@ -0,0 +1,160 @@
+# ingest/ratelimit.py
+"""
+Per-host token-bucket rate limiting shared by every outbound request.
+
+One HostLimiter (LIMITER) holds a bucket per hostname. Callers take a token
+before each request (`await LIMITER.acquire(url)`) and report the response
+status with `LIMITER.observe(...)`:
+
+* 429/503 halve the host's rate (down to `min_rate`) and pause the host for
+  `Retry-After` seconds, or one refill interval when the header is missing;
+* successes grow the rate back towards its configured value.
+
+Per-provider limits come from optional `rate_per_sec` / `burst` fields on
+entries in data/sources.json (see configure_from_sources).
+"""
+from __future__ import annotations
+import asyncio
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Iterable, Mapping, Optional
+from urllib.parse import urlsplit
+
+DEFAULT_RATE = float(os.getenv("JME_HOST_RATE", "4"))    # requests/sec per host
+DEFAULT_BURST = int(os.getenv("JME_HOST_BURST", "4"))
+MAX_RETRY_AFTER = 120.0  # never park a host longer than this on one response
+THROTTLE_STATUSES = (429, 503)
+
+# provider name in sources.json → API host its adapters talk to
+PROVIDER_HOSTS = {
+    "greenhouse": "boards-api.greenhouse.io",
+    "lever": "api.lever.co",
+}
+
+
+def parse_retry_after(value: Optional[str], now: Optional[datetime] = None) -> Optional[float]:
+    """`Retry-After` as seconds; accepts delta-seconds or an HTTP-date."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    now = now or datetime.now(timezone.utc)
+    return max(0.0, (when - now).total_seconds())
+
+
+class TokenBucket:
+    """
+    Classic token bucket. A token is reserved under the lock and the caller
+    sleeps outside it, so async and threaded callers can share one bucket.
+    """
+
+    def __init__(self, rate: float, burst: int = 1, min_rate: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.base_rate = float(rate)
+        self.rate = float(rate)
+        self.min_rate = min_rate if min_rate is not None else self.base_rate / 16
+        self.burst = max(1, int(burst))
+        self.tokens = float(self.burst)
+        self.paused_until = 0.0
+        self._clock = clock
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take one token; return how long the caller must wait before using it."""
+        with self._lock:
+            now = self._clock()
+            self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self.tokens -= 1
+            wait = 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+            return max(wait, self.paused_until - now)
+
+    def throttle(self, retry_after: Optional[float] = None) -> None:
+        """Server pushed back: halve the rate and pause until Retry-After."""
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            delay = retry_after if retry_after is not None else 1 / self.rate
+            until = self._clock() + min(delay, MAX_RETRY_AFTER)
+            self.paused_until = max(self.paused_until, until)
+            self.tokens = min(self.tokens, 0.0)
+
+    def relax(self) -> None:
+        """A successful response: recover 10% of the configured rate."""
+        with self._lock:
+            if self.rate < self.base_rate:
+                self.rate = min(self.base_rate, self.rate + self.base_rate / 10)
+
+
+class HostLimiter:
+    def __init__(self, rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST,
+                 clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._limits: Dict[str, tuple] = {}
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def host(url: str) -> str:
+        return (urlsplit(url).hostname or url).lower()
+
+    def configure(self, host: str, rate: float, burst: Optional[int] = None) -> None:
+        """Set the limit for one host; replaces any bucket already in use."""
+        with self._lock:
+            self._limits[host] = (float(rate), int(burst or self.burst))
+            self._buckets.pop(host, None)
+
+    def bucket(self, url_or_host: str) -> TokenBucket:
+        host = self.host(url_or_host) if "/" in url_or_host else url_or_host.lower()
+        with self._lock:
+            b = self._buckets.get(host)
+            if b is None:
+                rate, burst = self._limits.get(host, (self.rate, self.burst))
+                b = self._buckets[host] = TokenBucket(rate, burst, clock=self._clock)
+            return b
+
+    async def acquire(self, url: str) -> None:
+        wait = self.bucket(url).reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def observe(self, url: str, status: int, headers: Optional[Mapping[str, str]] = None) -> None:
+        b = self.bucket(url)
+        if status in THROTTLE_STATUSES:
+            b.throttle(parse_retry_after((headers or {}).get("Retry-After")))
+        elif status < 400:
+            b.relax()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+
+LIMITER = HostLimiter()
+
+
+def configure_from_sources(sources: Iterable[Mapping[str, Any]], limiter: HostLimiter = LIMITER) -> None:
+    """
+    Apply per-provider limits from sources.json entries, e.g.
+    {"provider": "lever", "slug": "acme", "rate_per_sec": 2, "burst": 2}.
+    The last entry of a provider that sets `rate_per_sec` wins.
+    """
+    for src in sources:
+        rate = src.get("rate_per_sec")
+        host = PROVIDER_HOSTS.get(src.get("provider", ""))
+        if rate and host:
+            limiter.configure(host, float(rate), src.get("burst"))
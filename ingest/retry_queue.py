@@ -0,0 +1,139 @@
+# ingest/retry_queue.py
+"""
+Durable retry queue for failed fetches.
+
+A unit is either a whole board ("board": its API or list-page URL) or one
+posting page of an HTML crawl ("posting": the stub to re-enrich). When a
+unit fails with a transient error (timeouts, connection errors, 408/429/5xx
+after the in-request retries), it is written to `ingest_retries` with an
+attempt count and a next-attempt time that doubles with every failure:
+RETRY_BASE, 2x, 4x ... capped at RETRY_MAX_DELAY. After RETRY_MAX_ATTEMPTS
+the row stays for inspection but is no longer retried. Permanent failures
+(404, 410, ...) are never queued, and a unit that later succeeds is removed.
+
+IngestStream collects units on the current RunStats while a source runs and
+writes them with the run's ledger rows. IngestStream.retry_due() drains the
+due units; the nightly job calls it before the regular crawl. To drain in
+between nightly runs:
+
+    python -m ingest.retry_queue
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import os
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import httpx
+from sqlalchemy import bindparam, text as sql
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import Session
+from sqlalchemy.types import Text
+
+from ingest.metrics import CURRENT_RUN, note_error
+
+RETRY_BASE = timedelta(minutes=int(os.getenv("JME_RETRY_BASE_MINUTES", "30")))
+RETRY_MAX_DELAY = timedelta(hours=int(os.getenv("JME_RETRY_MAX_HOURS", "48")))
+RETRY_MAX_ATTEMPTS = int(os.getenv("JME_RETRY_MAX_ATTEMPTS", "8"))
+TRANSIENT_STATUS = frozenset((408, 425, 429, 500, 502, 503, 504))
+
+
+@dataclass
+class RetryUnit:
+    kind: str  # board | posting
+    source: str
+    url: str
+    payload: Optional[Dict[str, Any]] = None
+    error: str = ""
+    attempts: int = 0
+
+
+def is_transient(e: BaseException) -> bool:
+    """Worth another try later? Network trouble and throttling/5xx are; 404s are not."""
+    if isinstance(e, httpx.HTTPStatusError):
+        return e.response.status_code in TRANSIENT_STATUS
+    return isinstance(e, httpx.TransportError)
+
+
+def defer(kind: str, source: str, url: str, error: BaseException,
+          payload: Optional[Dict[str, Any]] = None) -> None:
+    """Queue a failed unit with the current run (written when the run is recorded)."""
+    note_error()
+    run = CURRENT_RUN.get()
+    if run is not None:
+        run.deferred.append(RetryUnit(kind, source, url, payload, repr(error)[:1000]))
+
+
+def settle(source: str, url: str) -> None:
+    """A unit of the current run succeeded: drop it from the queue if it was there."""
+    run = CURRENT_RUN.get()
+    if run is not None:
+        run.settled.append((source, url))
+
+
+ENQUEUE_SQL = sql("""
+INSERT INTO ingest_retries AS r (source, url, kind, payload, attempts, last_error, next_attempt_at)
+VALUES (:source, :url, :kind, CAST(:payload AS jsonb), 1, :error, now() + make_interval(secs => :base))
+ON CONFLICT (source, url) DO UPDATE SET
+  kind            = EXCLUDED.kind,
+  payload         = coalesce(EXCLUDED.payload, r.payload),
+  attempts        = r.attempts + 1,
+  last_error      = EXCLUDED.last_error,
+  next_attempt_at = now() + make_interval(secs => least(:base * power(2, r.attempts), :cap)),
+  updated_at      = now()
+""")
+
+RESOLVE_SQL = sql("""
+DELETE FROM ingest_retries r
+USING unnest(:sources, :urls) AS s(source, url)
+WHERE r.source = s.source AND r.url = s.url
+""").bindparams(bindparam("sources", type_=ARRAY(Text())), bindparam("urls", type_=ARRAY(Text())))
+
+DUE_SQL = sql("""
+SELECT kind, source, url, payload, attempts
+FROM ingest_retries
+WHERE next_attempt_at <= now() AND attempts < :max_attempts
+ORDER BY next_attempt_at
+LIMIT :limit
+""")
+
+
+def enqueue(db: Session, units: Iterable[RetryUnit]) -> None:
+    """Add units, or bump the attempt count and push back the next try of known ones (no commit)."""
+    params = [
+        {"source": u.source, "url": u.url, "kind": u.kind, "error": u.error,
+         "payload": json.dumps(u.payload, default=str) if u.payload is not None else None,
+         "base": RETRY_BASE.total_seconds(), "cap": RETRY_MAX_DELAY.total_seconds()}
+        for u in units
+    ]
+    if params:
+        db.execute(ENQUEUE_SQL, params)
+
+
+def resolve(db: Session, units: Iterable[Tuple[str, str]]) -> None:
+    """Remove (source, url) units from the queue (no commit)."""
+    pairs = list(dict.fromkeys(units))
+    if pairs:
+        db.execute(RESOLVE_SQL, {"sources": [s for s, _ in pairs], "urls": [u for _, u in pairs]})
+
+
+def due(db: Session, limit: int = 1000) -> List[RetryUnit]:
+    rows = db.execute(DUE_SQL, {"max_attempts": RETRY_MAX_ATTEMPTS, "limit": limit}).mappings()
+    return [RetryUnit(r["kind"], r["source"], r["url"], r["payload"], attempts=r["attempts"]) for r in rows]
+
+
+async def _main(days: int) -> None:
+    from ingest.pipeline import make_client
+    from ingest.stream import IngestStream
+
+    async with make_client() as client, IngestStream() as stream:
+        await stream.retry_due(client, days)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Retry the failed fetches that are due")
+    ap.add_argument("--days", type=int, default=14, help="posting age cutoff for retried boards")
+    asyncio.run(_main(ap.parse_args().days))
@@ -7,6 +7,7 @@ from sqlalchemy.orm import Session
 from db.session import SessionLocal
 from db.models import Job
 from core.hashing import text_hash
+from ingest.location_utils import normalize_city, normalize_mode
 
 
 def _ensure_bytes(x) -> bytes:
@@ -63,6 +64,8 @@ def run():
                 city=it.get("city"),
                 region=it.get("region"),
                 country=it.get("country"),
+                city_norm=normalize_city(it.get("city"), it.get("region"), it.get("country")),
+                mode_norm=normalize_mode(it.get("city")),
                 posted_at=posted_at,
                 source=it.get("source", "seed"),
                 url=url,
@@ -1,15 +1,35 @@
 # ingest/skills_extract.py
+import os
 import re
+import multiprocessing
 import json
-from typing import Iterable, List, Tuple
-import spacy
-from spacy.matcher import PhraseMatcher
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import text
 from sqlalchemy.orm import Session
 from db.models import Skill
+from ingest.aho_corasick import Automaton
+from ingest.en_tokens import token_spans
+
+MATCHER_CACHE_DIR = Path(os.getenv("JME_MATCHER_CACHE_DIR", ".cache/skills_matcher"))
+# "spacy": PhraseMatcher over en_core_web_sm tokens (default)
+# "aho":   Aho-Corasick over the same token boundaries -- never imports spaCy
+BACKEND = os.getenv("JME_SKILLS_BACKEND", "spacy")
 
 _NLP = None
-_MATCHER = None
+_MATCHER = None  # PhraseMatcher or Automaton, depending on _BACKEND
+_BACKEND: Optional[str] = None
 _ALIAS2CANON = {}
+_CANON2ID: Dict[str, int] = {}
+_VERSION: Optional[str] = None
+
+_VERSION_SQL = text("""
+    SELECT md5(COALESCE(string_agg(
+             skill_id::text || chr(31) || name_canonical || chr(31) || COALESCE(aliases_json, ''),
+             chr(30) ORDER BY skill_id), ''))
+    FROM skills
+""")
 
 def _norm(s: str) -> str:
     """Lowercase, trim, collapse spaces, and normalize hyphen spacing."""
@@ -21,15 +41,17 @@ def _norm(s: str) -> str:
 def _ensure_nlp():
     global _NLP
     if _NLP is None:
+        import spacy
         _NLP = spacy.load("en_core_web_sm", disable=["ner", "tagger", "parser", "lemmatizer"])
         _NLP.max_length = 2_000_000
     return _NLP
 
-def _skills_from_db(db: Session) -> List[Tuple[str, str]]:
-    out: List[Tuple[str, str]] = []
+def _skills_from_db(db: Session) -> List[Tuple[str, str, int]]:
+    """(alias, canonical, skill_id) for every canonical name and alias."""
+    out: List[Tuple[str, str, int]] = []
     for s in db.query(Skill).all():
         canon = _norm(s.name_canonical)
-        out.append((canon, canon))
+        out.append((canon, canon, s.skill_id))
         try:
             aliases = json.loads(s.aliases_json or "[]")
         except Exception:
@@ -37,37 +59,211 @@ def _skills_from_db(db: Session) -> List[Tuple[str, str]]:
         for a in aliases:
             a = _norm(a)
             if a and a != canon:
-                out.append((a, canon))
+                out.append((a, canon, s.skill_id))
     return out
 
+def dictionary_version(db: Session) -> str:
+    """
+    Checksum of every `skills` row. Any insert/update/delete of a skill or its
+    aliases (e.g. scripts/seed_skills.py) yields a new version, which is what
+    invalidates the cached matcher.
+    """
+    return db.execute(_VERSION_SQL).scalar_one()
+
+def _cache_paths(version: str, nlp=None) -> Tuple[Path, Path]:
+    # the alias maps are backend-neutral; serialized docs depend on the tokenizer
+    model = f"{nlp.meta.get('name', 'nlp')}-{nlp.meta.get('version', '0')}" if nlp else "none"
+    return MATCHER_CACHE_DIR / f"{version}.json", MATCHER_CACHE_DIR / f"{version}-{model}.spacy"
+
+def _load_cache(version: str, nlp=None):
+    maps_path, docs_path = _cache_paths(version, nlp)
+    try:
+        maps = json.loads(maps_path.read_text(encoding="utf-8"))
+        docs = None
+        if nlp is not None:
+            from spacy.tokens import DocBin
+            docs = list(DocBin().from_bytes(docs_path.read_bytes()).get_docs(nlp.vocab))
+    except (OSError, ValueError):
+        return None
+    return maps["alias2canon"], maps["canon2id"], docs
+
+def _save_cache(version: str, alias2canon: Dict[str, str], canon2id: Dict[str, int], nlp=None, docs=None) -> None:
+    maps_path, docs_path = _cache_paths(version, nlp)
+    payloads = [(maps_path, json.dumps({"alias2canon": alias2canon, "canon2id": canon2id}).encode("utf-8"))]
+    if nlp is not None:
+        from spacy.tokens import DocBin
+        payloads.insert(0, (docs_path, DocBin(attrs=["ORTH"], docs=docs).to_bytes()))
+    try:
+        MATCHER_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        for path, payload in payloads:
+            tmp = path.with_suffix(path.suffix + ".tmp")
+            tmp.write_bytes(payload)
+            os.replace(tmp, path)
+    except OSError:
+        pass  # read-only FS etc. -- the in-process cache still works
+
 def build_matcher(db: Session) -> None:
-    global _MATCHER, _ALIAS2CANON
-    nlp = _ensure_nlp()
-    m = PhraseMatcher(nlp.vocab, attr="LOWER")
-
-    _ALIAS2CANON = {}
-    seen = set()
-    docs = []
-    for alias, canon in _skills_from_db(db):
-        if alias in seen:
-            continue
-        seen.add(alias)
-        _ALIAS2CANON[alias] = canon
-        docs.append(nlp.make_doc(alias))
-
-    if docs:
-        m.add("SKILL", docs)
-    _MATCHER = m
+    """
+    Build (or reuse) the skills matcher for the configured BACKEND.
 
-def extract(text: str) -> List[Tuple[str, float]]:
-    if not text or _MATCHER is None:
-        return []
-    nlp = _ensure_nlp()
-    doc = nlp(text)
+    The matcher is keyed by `dictionary_version(db)`: an unchanged dictionary
+    reuses the in-process matcher, and a cold process loads the alias maps
+    (plus pre-tokenized aliases for spaCy) from MATCHER_CACHE_DIR instead of
+    reading and tokenizing every skill again.
+    """
+    version = dictionary_version(db)
+    if _MATCHER is not None and version == _VERSION and BACKEND == _BACKEND:
+        return
+
+    nlp = _ensure_nlp() if BACKEND == "spacy" else None
+    cached = _load_cache(version, nlp)
+    if cached:
+        alias2canon, canon2id, docs = cached
+    else:
+        alias2canon, canon2id = {}, {}
+        for alias, canon, skill_id in _skills_from_db(db):
+            canon2id.setdefault(canon, skill_id)
+            alias2canon.setdefault(alias, canon)
+        docs = [nlp.make_doc(a) for a in alias2canon] if nlp else None
+        _save_cache(version, alias2canon, canon2id, nlp, docs)
+
+    _install(BACKEND, version, alias2canon, canon2id, docs)
+
+def _install(backend: str, version: str, alias2canon: Dict[str, str], canon2id: Dict[str, int], docs=None) -> None:
+    global _MATCHER, _ALIAS2CANON, _CANON2ID, _VERSION, _BACKEND
+    if backend == "aho":
+        m = Automaton(_token_key(a) for a in alias2canon)
+    elif backend == "spacy":
+        from spacy.matcher import PhraseMatcher
+        nlp = _ensure_nlp()
+        if docs is None:
+            docs = [nlp.make_doc(a) for a in alias2canon]
+        m = PhraseMatcher(nlp.vocab, attr="LOWER")
+        if docs:
+            m.add("SKILL", docs)
+    else:
+        raise ValueError(f"Unknown skills backend {backend!r} (expected 'spacy' or 'aho')")
+    _MATCHER, _ALIAS2CANON, _CANON2ID, _VERSION, _BACKEND = m, alias2canon, canon2id, version, backend
+
+def _collect(phrases: Iterable[str]) -> List[Tuple[str, float]]:
     found: dict[str, float] = {}
-    for _, start, end in _MATCHER(doc):
-        phrase = _norm(doc[start:end].text)
+    for phrase in phrases:
         canon = _ALIAS2CANON.get(phrase)
         if canon:
             found[canon] = max(found.get(canon, 0.0), 0.9)
     return sorted(found.items(), key=lambda x: (-x[1], x[0]))
+
+def _matches(doc) -> List[Tuple[str, float]]:
+    return _collect(_norm(doc[start:end].text) for _, start, end in _MATCHER(doc))
+
+def _token_key(alias: str) -> str:
+    """An alias as the PhraseMatcher sees it: its tokens joined by single spaces."""
+    return " ".join(alias[a:b] for a, b in token_spans(alias))
+
+def _matches_aho(text: str) -> List[Tuple[str, float]]:
+    # lowercased tokens joined by " " where the text has no gap or exactly
+    # one space between them; any other gap becomes a whitespace token in
+    # spaCy, which no phrase spans, so it is "\n" here. Matches must start
+    # and end on a token boundary; the matched text is looked up like
+    # _matches() does.
+    spans = token_spans(text)
+    parts: List[str] = []
+    starts: Dict[int, int] = {}
+    ends: Dict[int, int] = {}
+    pos = 0
+    for i, (a, b) in enumerate(spans):
+        if i:
+            parts.append(" " if text[spans[i - 1][1]:a] in ("", " ") else "\n")
+            pos += 1
+        tok = text[a:b].lower()
+        starts[pos] = i
+        pos += len(tok)
+        ends[pos] = i
+        parts.append(tok)
+    return _collect(
+        _norm(text[spans[starts[start]][0]:spans[ends[end]][1]])
+        for start, end, _ in _MATCHER.iter("".join(parts))
+        if start in starts and end in ends
+    )
+
+def extract(text: str) -> List[Tuple[str, float]]:
+    if not text or _MATCHER is None:
+        return []
+    if _BACKEND == "aho":
+        return _matches_aho(text)
+    # PhraseMatcher(attr="LOWER") only needs tokens: skip the rest of the pipeline
+    return _matches(_ensure_nlp().make_doc(text))
+
+def _init_worker(backend: str, version: str, alias2canon: Dict[str, str], canon2id: Dict[str, int]) -> None:
+    # forked workers inherit the matcher; spawned ones rebuild it from the maps
+    if _MATCHER is not None and _VERSION == version and _BACKEND == backend:
+        return
+    _install(backend, version, alias2canon, canon2id)
+
+def _extract_batch(texts: List[str]) -> List[List[Tuple[str, float]]]:
+    if _BACKEND == "aho":
+        return [_matches_aho(text) if text else [] for text in texts]
+    nlp = _ensure_nlp()
+    return [_matches(doc) if text else [] for text, doc in zip(texts, nlp.tokenizer.pipe(texts))]
+
+def extract_many(texts: Iterable[str], n_process: int = 1, batch_size: int = 64) -> List[List[Tuple[str, float]]]:
+    """
+    Batched extract(): one result list per input text, in input order.
+
+    The spaCy backend runs the tokenizer only (no tok2vec/attribute_ruler). With n_process > 1
+    (or -1 for every core) batches of `batch_size` texts are matched in a
+    process pool.
+    """
+    texts = [t or "" for t in texts]
+    if _MATCHER is None:
+        return [[] for _ in texts]
+    if n_process == -1:
+        n_process = os.cpu_count() or 1
+    batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+    if n_process <= 1 or len(batches) <= 1:
+        return [hits for batch in batches for hits in _extract_batch(batch)]
+
+    with multiprocessing.get_context().Pool(
+        min(n_process, len(batches)),
+        initializer=_init_worker,
+        initargs=(_BACKEND, _VERSION, _ALIAS2CANON, _CANON2ID),
+    ) as pool:
+        return [hits for res in pool.imap(_extract_batch, batches) for hits in res]
+
+def extraction_pool(n_process: int) -> ProcessPoolExecutor:
+    """
+    Long-lived worker pool primed with the matcher from the last build_matcher(),
+    for streaming callers that submit extract_ids_batch() chunk after chunk.
+    """
+    if n_process == -1:
+        n_process = os.cpu_count() or 1
+    return ProcessPoolExecutor(
+        max_workers=n_process,
+        mp_context=multiprocessing.get_context(),
+        initializer=_init_worker,
+        initargs=(_BACKEND, _VERSION, _ALIAS2CANON, _CANON2ID),
+    )
+
+def extract_ids_batch(texts: List[str]) -> List[List[Tuple[int, float]]]:
+    """One worker-sized batch of extract_ids(); picklable for extraction_pool()."""
+    if _MATCHER is None:
+        return [[] for _ in texts]
+    return [
+        [(_CANON2ID[name], conf) for name, conf in hits if name in _CANON2ID]
+        for hits in _extract_batch([t or "" for t in texts])
+    ]
+
+def skill_id_map() -> Dict[str, int]:
+    """Canonical name -> skills.skill_id, as loaded by the last build_matcher()."""
+    return _CANON2ID
+
+def extract_ids(text: str) -> List[Tuple[int, float]]:
+    """Like extract(), but resolved to skill ids without touching the DB."""
+    return [(_CANON2ID[name], conf) for name, conf in extract(text) if name in _CANON2ID]
+
+def extract_ids_many(texts: Iterable[str], n_process: int = 1, batch_size: int = 64) -> List[List[Tuple[int, float]]]:
+    """extract_many() resolved to skill ids."""
+    return [
+        [(_CANON2ID[name], conf) for name, conf in hits if name in _CANON2ID]
+        for hits in extract_many(texts, n_process=n_process, batch_size=batch_size)
+    ]
@@ -1,7 +1,27 @@
 from __future__ import annotations
+import asyncio
+import os
+import re
+from contextlib import contextmanager
 from dataclasses import dataclass
 from abc import ABC, abstractmethod
-from typing import Iterable, Dict, Any, Optional
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional
+
+import httpx
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from db.models import BoardProbe
+from db.session import SessionLocal
+from ingest import pipeline
+from ingest.ratelimit import LIMITER, HostLimiter
+
+PROBE_CONCURRENCY = int(os.getenv("JME_PROBE_CONCURRENCY", "8"))  # slugs probed at once per resolve
+PROBE_HIT_TTL = timedelta(days=int(os.getenv("JME_PROBE_HIT_TTL_DAYS", "30")))
+PROBE_MISS_TTL = timedelta(days=int(os.getenv("JME_PROBE_MISS_TTL_DAYS", "7")))
+COMPANY_SUFFIXES = {"inc", "llc", "ltd", "corp", "corporation", "co", "gmbh", "plc", "the"}
 
 @dataclass
 class JobDoc:
@@ -15,20 +35,157 @@ class JobDoc:
     updated_at: str = ""
     content_html: str | None = None
 
+def slug_candidates(company: str) -> List[str]:
+    """Likely board slugs for a company name: "The Home Depot" → homedepot, home-depot, thehomedepot, home."""
+    words = re.findall(r"[a-z0-9]+", company.lower())
+    core = [w for w in words if w not in COMPANY_SUFFIXES] or words
+    return list(dict.fromkeys(c for c in ("".join(core), "-".join(core), "".join(words), core[0] if core else "") if c))
+
 class SourceAdapter(ABC):
+    """
+    One job-board provider. Requests go through a shared, pooled
+    httpx.AsyncClient (pass one in, or use `async with Adapter() as a` to
+    own one) and the per-host limiter. Board payloads are fetched with the
+    pipeline's retry/conditional-GET helpers, so a new provider only says
+    where its boards live and how a posting maps to an item.
+    """
     name: str
+    API_BASE: str
+    JSON_KEY: Optional[str] = None  # key of the postings array in a board payload; None = top level
+
+    def __init__(self, client: Optional[httpx.AsyncClient] = None, *,
+                 request_delay: float | None = None, limiter: Optional[HostLimiter] = None):
+        # request pacing lives in the shared per-host limiter; an explicit
+        # request_delay gives this adapter a limiter of its own at that pace,
+        # leaving everyone else's pacing of the host alone
+        if limiter is None:
+            limiter = HostLimiter(1 / request_delay, 1) if request_delay else LIMITER
+        self.limiter = limiter
+        self._client = client
+        self._own_client = client is None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = pipeline.make_client()
+        return self._client
 
-    def __init__(self, *, request_delay: float = 0.25):
-        self.request_delay = request_delay
+    async def __aenter__(self) -> "SourceAdapter":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        if self._own_client and self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _get(self, url: str, **kwargs) -> httpx.Response:
+        await self.limiter.acquire(url)
+        r = await self.client.get(url, **kwargs)
+        self.limiter.observe(url, r.status_code, r.headers)
+        return r
+
+    # --- board lookup ---------------------------------------------------------
 
     @abstractmethod
-    def resolve_board(self, company: str, candidates: Iterable[str]) -> Optional[str]:
-        ...
+    def probe_url(self, slug: str) -> str:
+        """Cheapest URL that answers 200 for an existing board and 404 otherwise."""
+
+    async def probe(self, slug: str) -> Optional[bool]:
+        """Does board `slug` exist? None when the provider gave no definite answer."""
+        try:
+            r = await self._get(self.probe_url(slug), timeout=20)
+        except httpx.HTTPError:
+            return None
+        if r.status_code == 200:
+            return True
+        if r.status_code in (404, 410):
+            return False
+        return None  # 429/5xx: ask again next time
+
+    async def resolve_board(self, company: str, candidates: Iterable[str],
+                            db: Optional[Session] = None) -> Optional[str]:
+        """
+        First of `candidates` that is a live board. Slugs without a fresh
+        answer in `board_probes` are probed concurrently (PROBE_CONCURRENCY
+        at a time); definite answers are cached, hits for PROBE_HIT_TTL and
+        misses for PROBE_MISS_TTL.
+        """
+        slugs = list(dict.fromkeys(c for c in candidates if c))
+        if not slugs:
+            return None
+        cached = await asyncio.to_thread(_load_probes, db, self.name, slugs)
+        todo = [s for s in slugs if s not in cached]
+        sem = asyncio.Semaphore(PROBE_CONCURRENCY)
+
+        async def one(slug: str) -> Optional[bool]:
+            async with sem:
+                return await self.probe(slug)
+
+        results = await asyncio.gather(*(one(s) for s in todo))
+        fresh = {s: found for s, found in zip(todo, results) if found is not None}
+        if fresh:
+            await asyncio.to_thread(_store_probes, db, self.name, fresh)
+        known = {**cached, **fresh}
+        board = next((s for s in slugs if known.get(s)), None)
+        print(f"[resolve] {self.name} {company!r}: {board or 'no board'} "
+              f"({len(todo)} probed, {len(cached)} cached)")
+        return board
+
+    # --- postings -------------------------------------------------------------
 
     @abstractmethod
-    def fetch_jobs(self, board_id: str) -> Iterable[Dict[str, Any]]:
-        ...
+    def board_url(self, board_id: str) -> str:
+        """API URL of a board's full listing (also its HTTP cache key)."""
 
     @abstractmethod
-    def normalize(self, board_id: str, raw: Dict[str, Any]) -> JobDoc:
-        ...
+    def item(self, board_id: str, raw: Dict[str, Any]) -> Dict[str, Any]:
+        """One raw posting as a pipeline item."""
+
+    async def iter_jobs(self, board_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """Raw postings of a board; parsed off the response stream unless JME_STREAM_JSON=0."""
+        url = self.board_url(board_id)
+        if pipeline.STREAM_JSON:
+            async for j in pipeline._iter_json(self.client, url, self.JSON_KEY, self.limiter):
+                yield j
+            return
+        data = await pipeline._get_json(self.client, url, limiter=self.limiter)
+        for j in (data.get(self.JSON_KEY, []) if self.JSON_KEY else data):
+            yield j
+
+    async def fetch_jobs(self, board_id: str) -> List[Dict[str, Any]]:
+        return [j async for j in self.iter_jobs(board_id)]
+
+    async def iter_items(self, board_id: str) -> AsyncIterator[Dict[str, Any]]:
+        async for j in self.iter_jobs(board_id):
+            yield self.item(board_id, j)
+
+
+def _load_probes(db: Optional[Session], provider: str, slugs: List[str]) -> Dict[str, bool]:
+    now = datetime.now(timezone.utc)
+    with _session(db) as s:
+        rows = s.execute(select(BoardProbe).where(BoardProbe.provider == provider, BoardProbe.slug.in_(slugs)))
+        return {
+            p.slug: p.found for (p,) in rows
+            if p.checked_at >= now - (PROBE_HIT_TTL if p.found else PROBE_MISS_TTL)
+        }
+
+def _store_probes(db: Optional[Session], provider: str, found: Dict[str, bool]) -> None:
+    stmt = insert(BoardProbe).values([
+        {"provider": provider, "slug": slug, "found": ok, "checked_at": datetime.now(timezone.utc)}
+        for slug, ok in found.items()
+    ])
+    with _session(db) as s:
+        s.execute(stmt.on_conflict_do_update(
+            index_elements=[BoardProbe.provider, BoardProbe.slug],
+            set_={"found": stmt.excluded.found, "checked_at": stmt.excluded.checked_at},
+        ))
+        s.commit()
+
+@contextmanager
+def _session(db: Optional[Session]) -> Iterator[Session]:
+    """The caller's session as-is, or a short-lived SessionLocal()."""
+    if db is not None:
+        yield db
+        return
+    with SessionLocal() as s:
+        yield s
@@ -1,39 +1,47 @@
 from __future__ import annotations
-import time, requests
-from typing import Iterable, Dict, Any, Optional
-from .base import SourceAdapter, JobDoc
+from datetime import datetime
+from typing import Dict, Any
+from ingest.location_utils import normalize_location
+from .base import SourceAdapter
 
 class Greenhouse(SourceAdapter):
     name = "greenhouse"
     API_BASE = "https://boards-api.greenhouse.io/v1/boards"
+    JSON_KEY = "jobs"
 
-    def _valid(self, slug: str) -> bool:
-        try:
-            r = requests.get(f"{self.API_BASE}/{slug}/jobs", timeout=20)
-            return r.status_code == 200
-        except requests.RequestException:
-            return False
+    def probe_url(self, slug: str) -> str:
+        return f"{self.API_BASE}/{slug}"  # board metadata only, no postings
 
-    def resolve_board(self, company: str, candidates: Iterable[str]) -> Optional[str]:
-        for c in candidates:
-            if self._valid(c):
-                return c
-            time.sleep(self.request_delay)
-        return None
+    def board_url(self, board_id: str) -> str:
+        return f"{self.API_BASE}/{board_id}/jobs?content=true"
 
-    def fetch_jobs(self, board_id: str):
-        r = requests.get(f"{self.API_BASE}/{board_id}/jobs", timeout=30)
-        r.raise_for_status()
-        return r.json().get("jobs", [])
+    def item(self, board_id: str, j: Dict[str, Any]) -> Dict[str, Any]:
+        """One Greenhouse posting (board API, content=true) as a pipeline item."""
+        posted = j.get("updated_at") or j.get("created_at")
+        posted_dt = None
+        if posted:
+            # "2024-09-01T12:34:56Z"
+            try:
+                posted_dt = datetime.fromisoformat(posted.replace("Z", "+00:00")).replace(tzinfo=None)
+            except Exception:
+                posted_dt = None
 
-    def normalize(self, board_id: str, j: Dict[str, Any]) -> JobDoc:
-        return JobDoc(
-            board_id=board_id,
-            job_id=str(j["id"]),
-            title=j.get("title",""),
-            location=(j.get("location") or {}).get("name",""),
-            absolute_url=j.get("absolute_url",""),
-            departments="; ".join(d["name"] for d in j.get("departments",[])),
-            offices="; ".join(o["name"] for o in j.get("offices",[])),
-            updated_at=j.get("updated_at",""),
-        )
+        loc = (j.get("location") or {}).get("name") or ""
+        city, region, country = normalize_location(loc)
+
+        return {
+            "title": j.get("title", "").strip(),
+            "company": (j.get("offices") or [{}])[0].get("name")
+                       or (j.get("departments") or [{}])[0].get("name")
+                       or "Unknown",
+            "description_html": j.get("content") or "",  # escaped HTML → normalize_description()
+            "url": j.get("absolute_url"),
+            "city": city or "N/A",
+            "region": region,
+            "country": country,
+            "location": loc,
+            "posted_at": posted_dt,
+            "updated_at": posted_dt if j.get("updated_at") else None,
+            "source": f"greenhouse:{board_id}",
+            "external_id": str(j["id"]) if j.get("id") is not None else None,
+        }
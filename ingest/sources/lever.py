@@ -1,31 +1,40 @@
 from __future__ import annotations
-import requests
-from typing import Iterable, Dict, Any, Optional
-from .base import SourceAdapter, JobDoc
+from datetime import datetime
+from typing import Dict, Any
+from ingest.location_utils import normalize_location
+from .base import SourceAdapter
 
 class Lever(SourceAdapter):
     name = "lever"
     API_BASE = "https://api.lever.co/v0/postings"
 
-    def resolve_board(self, company: str, candidates: Iterable[str]) -> Optional[str]:
-        # Lever uses a single handle: careers.lever.co/<handle>
-        return next(iter(candidates), None)
+    def probe_url(self, handle: str) -> str:
+        # Lever uses a single handle: careers.lever.co/<handle>; unknown ones 404
+        return f"{self.API_BASE}/{handle}?mode=json&limit=1"
 
-    def fetch_jobs(self, handle: str):
-        r = requests.get(f"{self.API_BASE}/{handle}?mode=json", timeout=30)
-        r.raise_for_status()
-        return r.json()
+    def board_url(self, handle: str) -> str:
+        return f"{self.API_BASE}/{handle}?mode=json"
 
-    def normalize(self, handle: str, j: Dict[str, Any]) -> JobDoc:
-        loc = j.get("categories",{}).get("location","")
-        url = j.get("hostedUrl") or j.get("applyUrl") or ""
-        return JobDoc(
-            board_id=handle,
-            job_id=str(j.get("id") or j.get("lever_id") or j.get("internalJobId") or j.get("text","")),
-            title=j.get("text",""),
-            location=loc,
-            absolute_url=url,
-            departments=j.get("categories",{}).get("team",""),
-            offices=j.get("categories",{}).get("commitment",""),
-            updated_at=j.get("createdAt",""),
-        )
+    def item(self, handle: str, j: Dict[str, Any]) -> Dict[str, Any]:
+        """One Lever posting (postings API, mode=json) as a pipeline item."""
+        posted_ms = j.get("createdAt")
+        posted_dt = datetime.utcfromtimestamp(posted_ms / 1000) if posted_ms else None
+        updated_ms = j.get("updatedAt")
+        loc = (j.get("categories") or {}).get("location") or ""
+        city, region, country = normalize_location(loc)
+        desc = {"description_text": j["descriptionPlain"][:200000]} if j.get("descriptionPlain") \
+            else {"description_html": j.get("description") or ""}
+        return {
+            "title": j.get("text", "").strip(),
+            "company": (j.get("categories") or {}).get("team") or "Unknown",
+            **desc,
+            "url": j.get("hostedUrl"),
+            "city": city or "N/A",
+            "region": region,
+            "country": country,
+            "location": loc,
+            "posted_at": posted_dt,
+            "updated_at": datetime.utcfromtimestamp(updated_ms / 1000) if updated_ms else None,
+            "source": f"lever:{handle}",
+            "external_id": j.get("id"),
+        }
@@ -0,0 +1,266 @@
+# ingest/stream.py
+"""
+Streaming ingest: fetch → normalize → extract → write as bounded asyncio stages.
+
+    iter_source()  ──chunks──▶  extract (process pool)  ──chunks──▶  write (DB thread)
+         │  watermark filter,         skill_hits + MinHash per item     dedupe + insert + commit
+         │  HTML → text
+
+Each source gets its own pair of queues holding at most QUEUE_DEPTH chunks
+of BATCH_SIZE items, so a slow stage stalls the ones before it instead of
+letting items pile up in memory. Network waits, extraction and DB writes of
+different chunks (and of different sources sharing one IngestStream) overlap.
+
+All session work runs on one dedicated thread: the Session is never touched
+concurrently, and writes from several sources are naturally serialized.
+Extraction happens before dedupe; by then the watermark has already dropped
+postings we stored on earlier runs, so little CPU is spent on duplicates.
+
+Every run lands in the ingest ledger (ingest.metrics): stage timings,
+bytes, items seen/skipped/added and errors, whether it succeeded or not.
+Boards and posting pages that fail transiently go to the retry queue
+(ingest.retry_queue), which retry_due() drains.
+"""
+from __future__ import annotations
+import asyncio
+import contextvars
+import os
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, AsyncIterable, Callable, Dict, List, Optional
+
+import httpx
+from sqlalchemy.orm import Session
+
+from db.session import SessionLocal
+from ingest.dedupe import minhash_many
+from ingest.html_text import normalize_description
+from ingest.http_cache import NotModified
+from ingest.metrics import CURRENT_RUN, RunStats, record_run
+from ingest.pipeline import (
+    BATCH_SIZE, EXTRACT_PROCESSES, board_url, enrich_stubs, forget_source, iter_source, write_chunk,
+)
+from ingest.retry_queue import RetryUnit, due, enqueue, is_transient, resolve
+from ingest.skills_extract import build_matcher, extract_ids_batch, extraction_pool
+from ingest.watermarks import Watermark
+
+QUEUE_DEPTH = int(os.getenv("JME_QUEUE_DEPTH", "2"))  # chunks buffered between two stages
+EXTRACT_BATCH = 64  # texts per task handed to one extraction worker
+
+
+class IngestStream:
+    """
+    Shared stages for one ingest run; use as `async with IngestStream() as s`,
+    then `await s.ingest(client, source, days)` for one or many sources.
+    """
+
+    def __init__(self, db: Optional[Session] = None, bulk: bool = False,
+                 n_process: int = EXTRACT_PROCESSES, exclusive_writes: bool = False):
+        self.db = db
+        self.bulk = bulk
+        self.exclusive_writes = exclusive_writes  # other processes write too (ingest.work_queue)
+        self.n_process = (os.cpu_count() or 1) if n_process == -1 else n_process
+        self._own_db = db is None
+        self._db_thread: Optional[ThreadPoolExecutor] = None
+        self._pool: Optional[Executor] = None
+
+    async def __aenter__(self) -> "IngestStream":
+        self._db_thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix="jme-db")
+        if self._own_db:
+            self.db = await self._on_db(SessionLocal)
+        await self._on_db(build_matcher, self.db)
+        if self.n_process > 1:
+            self._pool = extraction_pool(self.n_process)  # primed with the matcher just built
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+        if self._own_db:
+            await self._on_db(self.db.close)
+        self._db_thread.shutdown()
+
+    def _on_db(self, fn: Callable, *args) -> "asyncio.Future":
+        # carry the caller's context along, so DB work sees CURRENT_RUN
+        ctx = contextvars.copy_context()
+        return asyncio.get_running_loop().run_in_executor(self._db_thread, ctx.run, fn, *args)
+
+    async def _extract(self, chunk: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # without a process pool, extraction runs in the default thread pool: it
+        # still overlaps with network and DB waits, just not with itself
+        # (one call per chunk there, since the tokenizer isn't meant to be shared)
+        loop = asyncio.get_running_loop()
+        texts = [it.get("description_text") or "" for it in chunk]
+        if self._pool is None:
+            parts = [await loop.run_in_executor(None, extract_ids_batch, texts)]
+            sigs = [await loop.run_in_executor(None, minhash_many, texts)]
+        else:
+            parts, sigs = await asyncio.gather(*(
+                asyncio.gather(*(
+                    loop.run_in_executor(self._pool, fn, texts[i:i + EXTRACT_BATCH])
+                    for i in range(0, len(texts), EXTRACT_BATCH)
+                ))
+                for fn in (extract_ids_batch, minhash_many)
+            ))
+        for it, hits, sig in zip(chunk, (h for part in parts for h in part), (m for part in sigs for m in part)):
+            it["skill_hits"] = hits
+            it["minhash"] = sig
+        return chunk
+
+    def _write(self, chunk: List[Dict[str, Any]]) -> int:
+        try:
+            added = write_chunk(self.db, chunk, self.bulk, CURRENT_RUN.get(), self.exclusive_writes)
+            self.db.commit()
+            return added
+        except Exception:
+            self.db.rollback()
+            raise
+
+    def _record(self, run: RunStats) -> None:
+        # the ledger and the retry queue are best effort: never fail an ingest over them
+        try:
+            record_run(self.db, run)
+            enqueue(self.db, run.deferred)
+            resolve(self.db, run.settled)
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            print(f"[warn] could not record ingest run of {run.source}: {e!r}")
+
+    def _finish(self, wm: Watermark) -> None:
+        try:
+            wm.finish()
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+    async def ingest(self, client: httpx.AsyncClient, source: str, days: int) -> Optional[int]:
+        """
+        Stream one source into the DB. Chunks are committed as they land; the
+        source's watermark only advances once every chunk is in, so a failed
+        run is simply redone (and deduped) next time. None on 304 Not Modified.
+        """
+        url = board_url(source)
+        wm = await self._on_db(Watermark, self.db, source, days) if url else None
+        if source.startswith("html:"):
+            url = source.split(":", 1)[1]  # the list page
+        return await self._run(source, iter_source(client, source, days), wm, retry_url=url)
+
+    async def ingest_items(self, source: str, items: AsyncIterable[Dict[str, Any]]) -> int:
+        """
+        Stream items that come from somewhere other than a board fetch (e.g. a
+        file export) through the same stages; no watermark is involved.
+        """
+        return await self._run(source, items, None)
+
+    async def retry_due(self, client: httpx.AsyncClient, days: int) -> List[str]:
+        """
+        Drain the retry queue: boards whose next attempt is due are ingested
+        again, due posting pages are re-fetched and streamed in per source.
+        Units that fail again go back with a longer delay. Returns the board
+        sources retried, which a crawl right after can skip.
+        """
+        units = await self._on_db(due, self.db)
+        if not units:
+            return []
+        boards = list(dict.fromkeys(u.source for u in units if u.kind == "board"))
+        stubs: Dict[str, List[Dict[str, Any]]] = {}
+        for u in units:
+            if u.kind == "posting" and u.source not in boards:  # a board retry re-crawls its pages
+                stubs.setdefault(u.source, []).append(u.payload)
+        print(f"[retry] {len(boards)} boards, {sum(map(len, stubs.values()))} postings due")
+
+        for source in boards:
+            try:
+                await self.ingest(client, source, days)
+            except Exception as e:
+                print(f"[retry] {source} failed again: {e!r}")
+        for source, pending in stubs.items():
+            try:
+                await self.ingest_items(source, enrich_stubs(client, source, pending))
+            except Exception as e:
+                print(f"[retry] postings of {source} failed: {e!r}")
+        return boards
+
+    async def _run(self, source: str, items: AsyncIterable[Dict[str, Any]],
+                   wm: Optional[Watermark], retry_url: Optional[str] = None) -> Optional[int]:
+        chunks: asyncio.Queue = asyncio.Queue(QUEUE_DEPTH)
+        extracted: asyncio.Queue = asyncio.Queue(QUEUE_DEPTH)
+        not_modified = False
+        added = 0
+        run = RunStats(source)
+
+        async def produce():
+            nonlocal not_modified
+            chunk: List[Dict[str, Any]] = []
+            try:
+                async for it in run.timed("fetch", items):
+                    run.items_seen += 1
+                    if wm is not None and not wm.wants(it):
+                        run.items_skipped += 1
+                        continue  # unchanged postings are never even stripped
+                    with run.timer("parse"):
+                        chunk.append(normalize_description(it))
+                    if len(chunk) >= BATCH_SIZE:
+                        await chunks.put(chunk)
+                        chunk = []
+                if chunk:
+                    await chunks.put(chunk)
+            except NotModified:
+                not_modified = True
+            await chunks.put(None)
+
+        async def extract():
+            while (chunk := await chunks.get()) is not None:
+                with run.timer("extract"):
+                    chunk = await self._extract(chunk)
+                await extracted.put(chunk)
+            await extracted.put(None)
+
+        async def write():
+            nonlocal added
+            while (chunk := await extracted.get()) is not None:
+                n = await self._on_db(self._write, chunk)
+                if wm is not None:
+                    for it in chunk:
+                        wm.repost(it)
+                added += n
+                run.items_added += n
+                run.items_skipped += len(chunk) - n  # duplicates
+
+        token = CURRENT_RUN.set(run)  # the stage tasks below inherit it
+        try:
+            async with asyncio.TaskGroup() as tg:
+                tg.create_task(produce())
+                tg.create_task(extract())
+                tg.create_task(write())
+            if wm is not None and not not_modified:
+                await self._on_db(self._finish, wm)
+        except BaseException as e:
+            # DB stages roll back their own failures; source_state is untouched
+            # until _finish(), so the next run starts from the old watermark
+            forget_source(source)
+            err = e.exceptions[0] if isinstance(e, BaseExceptionGroup) and len(e.exceptions) == 1 else e
+            run.finish("error", err)
+            if retry_url is not None and isinstance(err, Exception):
+                if is_transient(err):
+                    run.deferred.append(RetryUnit("board", source, retry_url, error=run.error))
+                else:
+                    run.settled.append((source, retry_url))  # permanent: retrying won't help
+            if isinstance(err, Exception):
+                await self._on_db(self._record, run)
+            if err is not e:
+                raise err from None
+            raise
+        finally:
+            CURRENT_RUN.reset(token)
+
+        run.finish("not_modified" if not_modified else "ok")
+        if retry_url is not None:
+            run.settled.append((source, retry_url))
+        await self._on_db(self._record, run)
+        if not_modified:
+            print(f"[cache] {source} not modified")
+            return None
+        print(f"Ingested {added} jobs from {source}")
+        return added
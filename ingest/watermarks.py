@@ -0,0 +1,170 @@
+# ingest/watermarks.py
+"""
+Per-source ingest watermarks and closed-posting detection.
+
+`source_state` remembers, per source ("greenhouse:cloudflare"), the newest
+provider update timestamp seen (an item's `updated_at`, else its
+`posted_at`) and the provider job ids present on the last run.
+Fed a fresh full snapshot of a board as it streams in, a Watermark:
+
+* marks jobs whose ids disappeared from the board inactive (and revives ids
+  that came back),
+* moves a stored row to the new id of a repost (same text under a new id,
+  the old id gone from the board), so the live posting keeps its row,
+* lets through only postings that are new or changed since the watermark,
+* advances the watermark and stores the current id set.
+
+Everything runs in the caller's session, so the state only moves forward
+when the caller commits the rows it was handed.
+"""
+from __future__ import annotations
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Optional
+
+from sqlalchemy import bindparam, text as sql
+from sqlalchemy.dialects.postgresql import ARRAY, UUID, insert
+from sqlalchemy.orm import Session
+from sqlalchemy.types import LargeBinary, Text
+
+from db.models import SourceState
+
+CLOSE_SQL = sql("""
+UPDATE jobs SET active = false, closed_at = now()
+WHERE source = :source AND external_id = ANY(:ids) AND active
+""").bindparams(bindparam("ids", type_=ARRAY(Text())))
+
+REOPEN_SQL = sql("""
+UPDATE jobs SET active = true, closed_at = NULL
+WHERE source = :source AND external_id = ANY(:ids) AND NOT active
+""").bindparams(bindparam("ids", type_=ARRAY(Text())))
+
+# a repost takes over the stored row of its text: new id and URL, live again
+TAKEOVER_SQL = sql("""
+UPDATE jobs j
+SET external_id = v.external_id, url = COALESCE(v.url, j.url), url_hash = COALESCE(v.url_hash, j.url_hash),
+    active = true, closed_at = NULL
+FROM unnest(:job_ids, :ids, :urls, :url_hashes) AS v(job_id, external_id, url, url_hash)
+WHERE j.job_id = v.job_id AND j.source = :source
+""").bindparams(
+    bindparam("job_ids", type_=ARRAY(UUID(as_uuid=True))),
+    bindparam("ids", type_=ARRAY(Text())),
+    bindparam("urls", type_=ARRAY(Text())),
+    bindparam("url_hashes", type_=ARRAY(LargeBinary())),
+)
+
+# rows stored before external_id existed: attach ids by URL the first time we see them
+BACKFILL_SQL = sql("""
+UPDATE jobs j SET external_id = v.external_id
+FROM unnest(:urls, :ids) AS v(url, external_id)
+WHERE j.url = v.url AND j.source = :source AND j.external_id IS NULL
+""").bindparams(bindparam("urls", type_=ARRAY(Text())), bindparam("ids", type_=ARRAY(Text())))
+
+
+def _utc(ts: Optional[datetime]) -> Optional[datetime]:
+    # adapters emit naive UTC datetimes; source_state stores timestamptz
+    if ts is None or ts.tzinfo is not None:
+        return ts
+    return ts.replace(tzinfo=timezone.utc)
+
+
+def close_postings(db: Session, source: str, ids: Iterable[str]) -> int:
+    ids = sorted(ids)
+    if not ids:
+        return 0
+    return db.execute(CLOSE_SQL, {"source": source, "ids": ids}).rowcount
+
+
+class Watermark:
+    """
+    One source's watermark over a run: construct it, feed every posting of
+    the board through wants(), then finish(). wants() is pure Python, so
+    postings can be filtered while they stream in.
+
+    A source must have one writer at a time: the state read here is written
+    back whole by finish(), and no lock is held in between (the session is
+    shared with other sources and commits per chunk). Sharded runs get this
+    from ingest.work_queue, which hands each source to exactly one worker.
+    """
+
+    def __init__(self, db: Session, source: str, days: Optional[int] = None):
+        self.db = db
+        self.source = source
+        state = db.get(SourceState, source)
+        self.prev_ids = set(state.job_ids) if state else set()
+        self.mark = state.last_updated_at if state else None
+        self.newest = self.mark
+        self.cutoff = _utc(datetime.utcnow() - timedelta(days=days)) if days else None
+        self.ids: set = set()
+        self.new_urls: Dict[str, str] = {}
+        self.reposts: Dict[Any, tuple] = {}  # stored job_id -> (its old id, new id, url, url_hash)
+        self.wanted = 0
+
+    def wants(self, it: Dict[str, Any]) -> bool:
+        """Record a live posting; True if it is new or changed (and inside the cutoff)."""
+        ext_id = it.get("external_id")
+        if not ext_id:
+            self.wanted += 1
+            return True  # nothing to track it by
+        self.ids.add(ext_id)
+        is_new = ext_id not in self.prev_ids
+        if is_new and it.get("url"):
+            self.new_urls[ext_id] = it["url"]
+        # Lever's posted_at is its createdAt, which an edit never moves
+        ts = _utc(it.get("updated_at") or it.get("posted_at"))
+        if ts and (self.newest is None or ts > self.newest):
+            self.newest = ts
+        if self.cutoff and ts and ts < self.cutoff:
+            return False
+        if is_new or (ts and self.mark and ts > self.mark):
+            self.wanted += 1
+            return True
+        return False
+
+    def repost(self, it: Dict[str, Any]) -> None:
+        """
+        A written item was dropped as the duplicate of a stored row of this
+        source under another id (pipeline.dedupe_batch sets `duplicate_of`).
+        Whether that is a repost is only known once the whole board is seen.
+        """
+        dup = it.get("duplicate_of")
+        if dup and it.get("external_id") and dup["job_id"] not in self.reposts:
+            self.reposts[dup["job_id"]] = (dup["external_id"], it["external_id"], it.get("url"), dup.get("url_hash"))
+
+    def finish(self) -> int:
+        """
+        Move reposted rows to their new ids, close vanished ids, revive
+        returning ones, store the new state. Returns #closed.
+        """
+        db, source = self.db, self.source
+        # the old id still on the board: a plain duplicate, nothing moves
+        moves = {job_id: r for job_id, r in self.reposts.items() if r[0] not in self.ids}
+        if moves:
+            job_ids = list(moves)
+            db.execute(TAKEOVER_SQL, {
+                "source": source, "job_ids": job_ids,
+                "ids": [moves[j][1] for j in job_ids],
+                "urls": [moves[j][2] for j in job_ids],
+                "url_hashes": [moves[j][3] for j in job_ids],
+            })
+        moved = {r[0] for r in moves.values()}
+        closed = close_postings(db, source, self.prev_ids - self.ids - moved)
+        if self.ids:
+            db.execute(REOPEN_SQL, {"source": source, "ids": sorted(self.ids)})
+        if self.new_urls:
+            bids = sorted(self.new_urls)
+            db.execute(BACKFILL_SQL, {"source": source, "urls": [self.new_urls[i] for i in bids], "ids": bids})
+
+        stmt = insert(SourceState).values(
+            source=source, last_updated_at=self.newest, job_ids=sorted(self.ids),
+            updated_at=datetime.now(timezone.utc),
+        )
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[SourceState.source],
+            set_={"last_updated_at": stmt.excluded.last_updated_at,
+                  "job_ids": stmt.excluded.job_ids,
+                  "updated_at": stmt.excluded.updated_at},
+        ))
+        print(f"[state] {source}: {len(self.ids)} live, {self.wanted} new/changed, "
+              f"{len(moves)} reposted, {closed} closed")
+        return closed
+
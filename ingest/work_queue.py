@@ -0,0 +1,143 @@
+# ingest/work_queue.py
+"""
+Work table for sharded ingest: N worker processes split one batch of sources.
+
+A batch (by default today's UTC date, or JME_WORK_BATCH) is one
+`ingest_work` row per source. Every worker seeds it, which is idempotent,
+then claims sources one at a time: one UPDATE picks the next queued row
+with FOR UPDATE SKIP LOCKED, marks it 'claimed' by the worker with a
+heartbeat timestamp, and commits. No transaction stays open while the
+source is ingested, so:
+
+- a claimed source is skipped by every other worker, and nobody ingests it twice;
+- the worker heartbeats while it ingests (WorkClaim.keep_alive); a worker
+  that dies stops heartbeating, and once its claim is JME_WORK_STALE_SECONDS
+  old the source is claimed by the next worker that asks (no lost work);
+- a finished source is marked done (or failed, with the error) and is not
+  claimed again within the batch. A claim that was taken over finishes as
+  a no-op: every update is guarded by the claim's worker and claimed_at.
+
+Rows are written by each worker's own IngestStream with exclusive_writes,
+so two workers never both insert one posting (pipeline.lock_rows).
+"""
+from __future__ import annotations
+import asyncio
+import os
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy import bindparam, text as sql
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.types import Text
+
+from db.session import SessionLocal
+
+WORK_BATCH = os.getenv("JME_WORK_BATCH")  # unset: one batch per UTC day
+WORK_STALE = float(os.getenv("JME_WORK_STALE_SECONDS", "300"))  # claim without a heartbeat: abandoned
+HEARTBEAT_EVERY = WORK_STALE / 5
+
+SEED_SQL = sql("""
+INSERT INTO ingest_work (batch, source)
+SELECT :batch, s FROM unnest(:sources) AS s
+ON CONFLICT (batch, source) DO NOTHING
+""").bindparams(bindparam("sources", type_=ARRAY(Text())))
+
+CLAIM_SQL = sql("""
+UPDATE ingest_work
+SET status = 'claimed', worker = :worker, claimed_at = now(), heartbeat_at = now()
+WHERE (batch, source) IN (
+  SELECT batch, source FROM ingest_work
+  WHERE batch = :batch
+    AND (status = 'queued'
+         OR (status = 'claimed' AND heartbeat_at < now() - make_interval(secs => :stale)))
+  ORDER BY created_at, source
+  LIMIT 1
+  FOR UPDATE SKIP LOCKED
+)
+RETURNING source, claimed_at
+""")
+
+# every update of a claim only touches the row while it is still this claim
+CLAIM_GUARD = "batch = :batch AND source = :source AND status = 'claimed' AND worker = :worker AND claimed_at = :claimed_at"
+
+HEARTBEAT_SQL = sql(f"UPDATE ingest_work SET heartbeat_at = now() WHERE {CLAIM_GUARD}")
+
+FINISH_SQL = sql(f"""
+UPDATE ingest_work
+SET status = :status, added = :added, error = :error, finished_at = now()
+WHERE {CLAIM_GUARD}
+""")
+
+RELEASE_SQL = sql(f"""
+UPDATE ingest_work
+SET status = 'queued', worker = NULL, claimed_at = NULL, heartbeat_at = NULL
+WHERE {CLAIM_GUARD}
+""")
+
+PROGRESS_SQL = sql("SELECT status, count(*) FROM ingest_work WHERE batch = :batch GROUP BY status")
+
+
+def default_batch() -> str:
+    return WORK_BATCH or datetime.now(timezone.utc).date().isoformat()
+
+
+class WorkClaim:
+    """A claimed source; it stays claimed while heartbeat() keeps it fresh, until finish() or release()."""
+
+    def __init__(self, batch: str, source: str, worker: str, claimed_at: datetime):
+        self.batch = batch
+        self.source = source
+        self.worker = worker
+        self.claimed_at = claimed_at
+
+    def _update(self, stmt, **params) -> bool:
+        with SessionLocal() as s:
+            n = s.execute(stmt, {"batch": self.batch, "source": self.source, "worker": self.worker,
+                                 "claimed_at": self.claimed_at, **params}).rowcount
+            s.commit()
+        return n > 0
+
+    def heartbeat(self) -> bool:
+        """Keep the claim alive; False once another worker took it over."""
+        return self._update(HEARTBEAT_SQL)
+
+    async def keep_alive(self, every: float = HEARTBEAT_EVERY) -> None:
+        """Heartbeat until cancelled; run it alongside the ingest of the source."""
+        while True:
+            await asyncio.sleep(every)
+            await asyncio.to_thread(self.heartbeat)
+
+    def finish(self, added: Optional[int], error: Optional[BaseException] = None) -> None:
+        self._update(
+            FINISH_SQL, status="failed" if error is not None else "done", added=added,
+            error=repr(error)[:1000] if error is not None else None,
+        )
+
+    def release(self) -> None:
+        """Give the source back to the batch (e.g. on shutdown)."""
+        self._update(RELEASE_SQL)
+
+
+def seed(batch: str, sources: List[str]) -> None:
+    """Add the sources to the batch; sources seeded earlier are claimed first."""
+    with SessionLocal() as s:
+        s.execute(SEED_SQL, {"batch": batch, "sources": sources})
+        s.commit()
+
+
+def claim(batch: str, worker: str, stale: float = WORK_STALE) -> Optional[WorkClaim]:
+    """
+    Next unclaimed source of the batch (or one whose claim went `stale`
+    seconds without a heartbeat), or None when every source is taken or done.
+    """
+    with SessionLocal() as s:
+        row = s.execute(CLAIM_SQL, {"batch": batch, "worker": worker, "stale": stale}).first()
+        s.commit()
+    if row is None:
+        return None
+    return WorkClaim(batch, row.source, worker, row.claimed_at)
+
+
+def progress(batch: str) -> Dict[str, int]:
+    with SessionLocal() as s:
+        return dict(s.execute(PROGRESS_SQL, {"batch": batch}).all())
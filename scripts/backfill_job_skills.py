@@ -0,0 +1,47 @@
+# scripts/backfill_job_skills.py
+from __future__ import annotations
+import argparse, os
+from sqlalchemy import text as sql
+from db.session import SessionLocal
+from ingest.pipeline import upsert_job_skills
+from ingest.skills_extract import build_matcher, extract_ids_many
+
+def main(batch=1000, n_process=int(os.getenv("JME_EXTRACT_PROCS", "1")), all_jobs=False):
+    """
+    (Re-)extract job_skills for jobs with no skill links (or every job with
+    --all, e.g. after the dictionary changed), `batch` jobs per round trip.
+    """
+    only_missing = "" if all_jobs else """
+          AND NOT EXISTS (SELECT 1 FROM job_skills js WHERE js.job_id = j.job_id)"""
+    done = 0
+    with SessionLocal() as db:
+        build_matcher(db)
+        last_id = None
+        while True:
+            rows = db.execute(sql(f"""
+                SELECT j.job_id, j.description_text
+                FROM jobs j
+                WHERE (CAST(:last_id AS uuid) IS NULL OR j.job_id > :last_id){only_missing}
+                ORDER BY j.job_id
+                LIMIT :batch
+            """), {"last_id": last_id, "batch": batch}).all()
+            if not rows:
+                break
+            found = extract_ids_many([r.description_text or "" for r in rows], n_process=n_process)
+            upsert_job_skills(db, [
+                {"job_id": r.job_id, "skill_id": skill_id, "confidence": conf, "source": "dict_v1"}
+                for r, hits in zip(rows, found)
+                for skill_id, conf in hits
+            ])
+            db.commit()
+            done += len(rows)
+            last_id = rows[-1].job_id
+    print(f"Extracted skills for {done} jobs")
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--batch", type=int, default=1000)
+    ap.add_argument("--procs", type=int, default=int(os.getenv("JME_EXTRACT_PROCS", "1")))
+    ap.add_argument("--all", action="store_true", help="re-extract every job, not just unlinked ones")
+    args = ap.parse_args()
+    main(batch=args.batch, n_process=args.procs, all_jobs=args.all)
@@ -0,0 +1,46 @@
+# scripts/backfill_location_norm.py
+from __future__ import annotations
+import argparse
+from sqlalchemy import text as sql
+from db.session import SessionLocal
+from ingest.location_utils import normalize_city, normalize_mode
+
+def main(batch=5000):
+    """
+    Fill jobs.city_norm / jobs.mode_norm from city, region, country and
+    remote_flag, walking the table by job_id. Only rows whose values change
+    are written, so it is cheap to re-run after a normalize_city() change.
+    """
+    seen = changed = 0
+    with SessionLocal() as db:
+        last_id = None
+        while True:
+            rows = db.execute(sql("""
+                SELECT job_id, city, region, country, remote_flag, city_norm, mode_norm
+                FROM jobs
+                WHERE CAST(:last_id AS uuid) IS NULL OR job_id > :last_id
+                ORDER BY job_id
+                LIMIT :batch
+            """), {"last_id": last_id, "batch": batch}).all()
+            if not rows:
+                break
+            last_id = rows[-1].job_id
+            updates = []
+            for r in rows:
+                city_norm = normalize_city(r.city, r.region, r.country)
+                mode_norm = normalize_mode(r.city, r.remote_flag)
+                if (city_norm, mode_norm) != (r.city_norm, r.mode_norm):
+                    updates.append({"job_id": r.job_id, "city_norm": city_norm, "mode_norm": mode_norm})
+            if updates:
+                db.execute(sql("UPDATE jobs SET city_norm = :city_norm, mode_norm = :mode_norm WHERE job_id = :job_id"),
+                           updates)
+            db.commit()
+            seen += len(rows)
+            changed += len(updates)
+    print(f"Normalized {changed} of {seen} jobs")
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--batch", type=int, default=5000)
+    args = ap.parse_args()
+    main(batch=args.batch)
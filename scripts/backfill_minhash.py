@@ -0,0 +1,51 @@
+# scripts/backfill_minhash.py
+from __future__ import annotations
+import argparse
+from sqlalchemy import text as sql
+from db.session import SessionLocal
+from ingest.dedupe import BANDS, ROWS, minhash, sig_from_bytes, sig_to_bytes
+from ingest.pipeline import index_minhash
+
+def main(batch=1000, rebuild=False):
+    """
+    Compute MinHash signatures and LSH band rows for jobs stored without them.
+    --rebuild re-bands every job from its stored signature: needed after a
+    JME_NEAR_DUP_THRESHOLD change, since the threshold picks bands x rows.
+    """
+    done = 0
+    with SessionLocal() as db:
+        if rebuild:
+            db.execute(sql("TRUNCATE job_minhash_bands"))
+            db.commit()
+        last_id = None
+        while True:
+            rows = db.execute(sql("""
+                SELECT job_id, minhash, CASE WHEN minhash IS NULL THEN description_text END AS description_text
+                FROM jobs
+                WHERE (CAST(:last_id AS uuid) IS NULL OR job_id > :last_id)
+                  AND (:rebuild OR minhash IS NULL)
+                ORDER BY job_id
+                LIMIT :batch
+            """), {"last_id": last_id, "rebuild": rebuild, "batch": batch}).all()
+            if not rows:
+                break
+            last_id = rows[-1].job_id
+            sigs = [
+                (r.job_id, sig_from_bytes(r.minhash) if r.minhash is not None else minhash(r.description_text or ""))
+                for r in rows
+            ]
+            fresh = [{"job_id": j, "minhash": sig_to_bytes(s)} for (j, s), r in zip(sigs, rows)
+                     if r.minhash is None and s is not None]
+            if fresh:
+                db.execute(sql("UPDATE jobs SET minhash = :minhash WHERE job_id = :job_id"), fresh)
+            index_minhash(db, sigs)
+            db.commit()
+            done += len(rows)
+    print(f"Indexed {done} jobs  ({BANDS} bands x {ROWS} rows)")
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--batch", type=int, default=1000)
+    ap.add_argument("--rebuild", action="store_true", help="drop and recompute all band rows")
+    args = ap.parse_args()
+    main(batch=args.batch, rebuild=args.rebuild)
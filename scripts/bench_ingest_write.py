@@ -0,0 +1,74 @@
+# scripts/bench_ingest_write.py
+"""
+Throughput of save_to_db: row-at-a-time vs. COPY + merge (bulk=True).
+
+Loads the tanium_jobs.csv sample, replicates it `--repeat` times with unique
+URLs/descriptions so nothing is deduped away, and times both write paths.
+Each run happens inside a transaction that is rolled back, so the target DB
+is left untouched.
+
+    python -m scripts.bench_ingest_write --repeat 20
+"""
+from __future__ import annotations
+import argparse, csv, sys, time
+from typing import Any, Dict, List
+
+from sqlalchemy.orm import Session
+
+from db.session import engine
+from ingest.html_text import html_to_text
+from ingest import pipeline
+from ingest.pipeline import save_to_db
+
+
+def load_sample(path: str, repeat: int) -> List[Dict[str, Any]]:
+    csv.field_size_limit(sys.maxsize)
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        rows = list(csv.DictReader(f))
+    items = []
+    for i in range(repeat):
+        for r in rows:
+            items.append({
+                "title": r["title"],
+                "company": "Tanium",
+                "location": r["location"],
+                "url": f"{r['absolute_url']}&copy={i}",
+                "description_text": html_to_text(r["content_html"]) + f"\n#{i}",
+                "source": "greenhouse:tanium",
+            })
+    return items
+
+
+def run(items: List[Dict[str, Any]], bulk: bool) -> float:
+    # save_to_db commits; bind the session to an outer transaction so that
+    # commit only releases a savepoint and the final rollback discards it all.
+    with engine.connect() as conn:
+        trans = conn.begin()
+        db = Session(bind=conn, join_transaction_mode="create_savepoint")
+        try:
+            t0 = time.perf_counter()
+            save_to_db([dict(it) for it in items], db=db, bulk=bulk)
+            return time.perf_counter() - t0
+        finally:
+            db.close()
+            trans.rollback()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--csv", default="tanium_jobs.csv")
+    ap.add_argument("--repeat", type=int, default=10, help="copies of the sample to write")
+    args = ap.parse_args()
+    pipeline.NEAR_DUP = False  # the copies differ by one line: near-duplicates by construction
+
+    items = load_sample(args.csv, args.repeat)
+    print(f"{len(items)} postings from {args.csv} (x{args.repeat})")
+    run(items[:50], bulk=True)  # warm up matcher + connection pool
+
+    for label, bulk in (("row-at-a-time", False), ("copy+merge", True)):
+        secs = run(items, bulk)
+        print(f"{label:>14}: {secs:7.2f}s  {len(items) / secs:8.1f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# scripts/bench_json_stream.py
+"""
+Peak RSS of parsing a large Greenhouse `content=true` payload: the whole
+response through r.json() vs. the incremental `jobs` parser.
+
+Builds a synthetic board (`--postings` jobs with ~`--html-kb` KB of HTML
+each), serves it from a local HTTP server, and runs each mode in a fresh
+subprocess so ru_maxrss measures that mode alone.
+
+    python -m scripts.bench_json_stream --postings 10000
+"""
+from __future__ import annotations
+import argparse, asyncio, json, resource, subprocess, sys, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def synthetic_board(n: int, html_kb: int) -> bytes:
+    para = "<p>We build data pipelines with Python, SQL, Airflow &amp; Kubernetes.</p>\n"
+    body = para * max(1, html_kb * 1024 // len(para))
+    jobs = [{
+        "id": 4000000 + i,
+        "title": f"Data Engineer {i}",
+        "absolute_url": f"https://boards.greenhouse.io/bench/jobs/{4000000 + i}",
+        "updated_at": "2025-10-01T12:00:00-04:00",
+        "location": {"name": "Austin, TX"},
+        "departments": [{"id": 1, "name": "Engineering"}],
+        "offices": [{"id": 2, "name": "Austin"}],
+        "content": body,
+    } for i in range(n)]
+    return json.dumps({"jobs": jobs, "meta": {"total": n}}).encode("utf-8")
+
+
+def serve(payload: bytes) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            for i in range(0, len(payload), 1 << 16):
+                self.wfile.write(payload[i:i + (1 << 16)])
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def child(mode: str, base: str) -> None:
+    import httpx
+    import ingest.pipeline as p
+    from ingest.http_cache import HttpCache
+    from ingest.sources import Greenhouse
+
+    Greenhouse.API_BASE = base
+    p.STREAM_JSON = mode == "stream"
+    p.HTTP_CACHE = HttpCache(enabled=False)
+    p.LIMITER.configure("127.0.0.1", 1000, 1000)
+
+    async def run() -> int:
+        n = 0
+        async with httpx.AsyncClient(timeout=120) as client:
+            async for _ in Greenhouse(client).iter_items("bench"):
+                n += 1  # consumed and dropped, like the streaming stages do
+        return n
+
+    base_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    t0 = time.perf_counter()
+    n = asyncio.run(run())
+    secs = time.perf_counter() - t0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # KiB on Linux
+    print(json.dumps({"postings": n, "secs": secs, "peak_mb": peak / 1024, "delta_mb": (peak - base_rss) / 1024}))
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--postings", type=int, default=10000)
+    ap.add_argument("--html-kb", type=int, default=4)
+    ap.add_argument("--child", choices=["full", "stream"], help=argparse.SUPPRESS)
+    ap.add_argument("--base", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    if args.child:
+        return child(args.child, args.base)
+
+    payload = synthetic_board(args.postings, args.html_kb)
+    server = serve(payload)
+    base = f"http://127.0.0.1:{server.server_port}/v1/boards"
+    print(f"payload: {args.postings} postings, {len(payload) / 1e6:.1f} MB")
+    from ingest.json_stream import ijson
+    print(f"incremental parser: {'ijson (' + ijson.backend + ')' if ijson else 'pure Python'}")
+    try:
+        for mode in ("full", "stream"):
+            out = subprocess.run(
+                [sys.executable, "-m", "scripts.bench_json_stream", "--child", mode, "--base", base],
+                check=True, capture_output=True, text=True,
+            ).stdout.strip().splitlines()[-1]
+            r = json.loads(out)
+            print(f"{mode:>6}: {r['postings']} postings in {r['secs']:6.2f}s  "
+                  f"peak RSS {r['peak_mb']:7.1f} MB  (+{r['delta_mb']:.1f} MB over baseline)")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
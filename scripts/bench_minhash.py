@@ -0,0 +1,139 @@
+# scripts/bench_minhash.py
+"""
+Near-duplicate lookup cost at scale: LSH band probe vs. brute-force compare.
+
+Builds an LSH band index for `--jobs` postings (1M by default) in an
+UNLOGGED table created inside a transaction that is rolled back, so the
+target DB is left untouched. Background postings are unrelated to each
+other, which for MinHash means independent random band hashes; they are
+generated server-side. `--planted` real postings (synthetic text) are
+indexed with their true signatures, and a batch of incoming postings made
+of edited reposts of them plus fresh postings is then deduped against the
+index with the same query the pipeline runs.
+
+Reports signature throughput, probe latency per incoming chunk, recall on
+the reposts, false candidates per probe, and the brute-force alternative
+(one signature against every stored one) extrapolated from a sample.
+
+    python -m scripts.bench_minhash --jobs 1000000
+"""
+from __future__ import annotations
+import argparse, random, time
+from typing import List
+
+import numpy as np
+from sqlalchemy import bindparam, text as sql
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.types import BigInteger, SmallInteger
+
+from db.session import engine
+from ingest.dedupe import BANDS, NEAR_DUP_THRESHOLD, NUM_PERM, ROWS, band_hashes, jaccard, minhash
+
+LOOKUP_SQL = sql("""
+SELECT b.band, b.band_hash, b.job_id
+FROM unnest(:bands, :hashes) AS q(band, band_hash)
+JOIN bench_minhash_bands b ON b.band = q.band AND b.band_hash = q.band_hash
+""").bindparams(bindparam("bands", type_=ARRAY(SmallInteger())), bindparam("hashes", type_=ARRAY(BigInteger())))
+
+WORDS = ("data pipeline python sql spark kafka airflow team customers build ship own scale "
+         "reliable warehouse model analytics platform cloud aws gcp design review mentor "
+         "engineers product metrics latency batch streaming quality testing deploy services").split()
+
+
+def posting(rng: random.Random, n_words: int = 350) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(n_words))
+
+
+def repost(rng: random.Random, text: str) -> str:
+    # what a board repost looks like: new date line, a tweaked sentence, an extra footer
+    words = text.split()
+    i = rng.randrange(len(words) - 10)
+    words[i:i + 3] = ["updated", "requirements", "here"]
+    return f"Posted {rng.randint(1, 30)} days ago. " + " ".join(words) + " Apply by Friday."
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--jobs", type=int, default=1_000_000, help="postings in the band index")
+    ap.add_argument("--planted", type=int, default=2000, help="real postings that get reposted")
+    ap.add_argument("--chunk", type=int, default=500, help="incoming postings per probe (BATCH_SIZE)")
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+    rng = random.Random(args.seed)
+    print(f"{NUM_PERM} permutations, {BANDS} bands x {ROWS} rows, threshold {NEAR_DUP_THRESHOLD}")
+
+    planted = [posting(rng) for _ in range(args.planted)]
+    t0 = time.perf_counter()
+    sigs = [minhash(t) for t in planted]
+    secs = time.perf_counter() - t0
+    print(f"signatures: {len(planted) / secs:8.0f} postings/s  ({secs / len(planted) * 1e3:.2f} ms each)")
+
+    n_reposts = args.chunk // 2
+    incoming = [repost(rng, planted[i]) for i in range(n_reposts)]
+    incoming += [posting(rng) for _ in range(args.chunk - n_reposts)]
+    in_sigs = [minhash(t) for t in incoming]
+
+    with engine.connect() as conn:
+        trans = conn.begin()
+        try:
+            conn.execute(sql("""
+                CREATE UNLOGGED TABLE bench_minhash_bands (
+                  band smallint NOT NULL, band_hash bigint NOT NULL, job_id uuid NOT NULL)
+            """))
+            t0 = time.perf_counter()
+            background = args.jobs - args.planted
+            conn.execute(sql("""
+                INSERT INTO bench_minhash_bands
+                SELECT b, (random() * 9.2e18 - 4.6e18)::bigint, md5(g::text)::uuid
+                FROM generate_series(1, :n) g, generate_series(0, :bands - 1) b
+            """), {"n": background, "bands": BANDS})
+            rows = [{"band": b, "band_hash": h, "job_id": f"00000000-0000-0000-0000-{i:012d}"}
+                    for i, s in enumerate(sigs) for b, h in enumerate(band_hashes(s))]
+            conn.execute(sql("INSERT INTO bench_minhash_bands VALUES (:band, :band_hash, CAST(:job_id AS uuid))"), rows)
+            load = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            conn.execute(sql("ALTER TABLE bench_minhash_bands ADD PRIMARY KEY (band, band_hash, job_id)"))
+            conn.execute(sql("ANALYZE bench_minhash_bands"))
+            build = time.perf_counter() - t0
+            size = conn.execute(sql("SELECT pg_size_pretty(pg_total_relation_size('bench_minhash_bands'))")).scalar()
+            print(f"index: {args.jobs:,} jobs, {args.jobs * BANDS:,} band rows, {size}  "
+                  f"(load {load:.1f}s, pk {build:.1f}s)")
+
+            keys = [band_hashes(s) for s in in_sigs]
+            probe = sorted({(b, h) for k in keys for b, h in enumerate(k)})
+            params = {"bands": [b for b, _ in probe], "hashes": [h for _, h in probe]}
+            conn.execute(LOOKUP_SQL, params).all()  # warm cache
+            timings: List[float] = []
+            for _ in range(5):
+                t0 = time.perf_counter()
+                found = conn.execute(LOOKUP_SQL, params).all()
+                timings.append(time.perf_counter() - t0)
+        finally:
+            trans.rollback()
+
+    by_key = {}
+    for band, band_hash, job_id in found:
+        by_key.setdefault((band, band_hash), set()).add(job_id)
+    planted_ids = {f"00000000-0000-0000-0000-{i:012d}": i for i in range(args.planted)}
+    hit = false_cands = 0
+    for n, (sig, k) in enumerate(zip(in_sigs, keys)):
+        cands = {str(j) for key in enumerate(k) for j in by_key.get(key, ())}
+        dup = any(jaccard(sig, sigs[planted_ids[c]]) >= NEAR_DUP_THRESHOLD for c in cands if c in planted_ids)
+        hit += n < n_reposts and dup
+        false_cands += sum(1 for c in cands if planted_ids.get(c) != n)
+    ms = sorted(timings)[len(timings) // 2] * 1e3
+    print(f"probe: {ms:7.1f} ms per {args.chunk} incoming ({ms / args.chunk:.3f} ms/posting), "
+          f"{len(probe):,} band keys")
+    print(f"recall on reposts: {hit}/{n_reposts}   non-matching candidates: {false_cands}")
+
+    # brute force: every incoming signature against every stored one
+    sample = np.stack([s for s in sigs] * max(1, 100_000 // len(sigs)))
+    t0 = time.perf_counter()
+    (sample == in_sigs[0]).mean(axis=1)
+    per_sig = (time.perf_counter() - t0) * args.jobs / len(sample)
+    print(f"brute force: ~{per_sig * 1e3:7.1f} ms per posting, ~{per_sig * args.chunk:.1f}s per chunk "
+          f"(+{args.jobs * NUM_PERM * 4 / 2**20:.0f} MB of signatures in memory)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+# scripts/bench_skills_extract.py
+"""
+Speed + agreement of the skills backends ("spacy" PhraseMatcher vs "aho").
+
+Times cold start (model load + matcher build) and extraction over the
+tanium_jobs.csv descriptions (replicated `--repeat` times), then reports
+documents where the two backends disagree. data/eval_samples.jsonl must
+agree exactly.
+
+    python -m scripts.bench_skills_extract --repeat 5
+"""
+from __future__ import annotations
+import argparse, csv, html, json, sys, time
+from pathlib import Path
+
+from db.session import SessionLocal
+import ingest.skills_extract as se
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--csv", default="tanium_jobs.csv")
+    ap.add_argument("--eval", default="data/eval_samples.jsonl")
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    csv.field_size_limit(sys.maxsize)
+    with open(args.csv, "r", encoding="utf-8", newline="") as f:
+        docs = [html.unescape(r["content_html"] or "") for r in csv.DictReader(f)] * args.repeat
+    evals = [json.loads(l)["text"] for l in Path(args.eval).read_text(encoding="utf-8").splitlines()]
+    mb = sum(len(d) for d in docs) / 1e6
+    print(f"{len(docs)} documents, {mb:.1f}M chars")
+
+    results = {}
+    for backend in ("spacy", "aho"):
+        se.BACKEND = backend
+        t0 = time.perf_counter()
+        with SessionLocal() as db:
+            se.build_matcher(db)
+        build = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        results[backend] = (se.extract_many(evals), se.extract_many(docs))
+        secs = time.perf_counter() - t0
+        accel = " (C accelerated)" if backend == "aho" and se._MATCHER.accelerated else ""
+        print(f"{backend:>6}{accel}: build {build:6.2f}s  extract {secs:6.2f}s  {len(docs) / secs:8.1f} docs/s")
+
+    (sp_eval, sp_docs), (ac_eval, ac_docs) = results["spacy"], results["aho"]
+    print(f"eval_samples identical: {sp_eval == ac_eval}")
+    print(f"documents with different skill sets: {sum(a != b for a, b in zip(sp_docs, ac_docs))}/{len(docs)}")
+
+
+if __name__ == "__main__":
+    main()
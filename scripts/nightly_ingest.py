@@ -1,25 +1,163 @@
 # scripts/nightly_ingest.py
 from __future__ import annotations
-import json, os, asyncio, time
-from typing import Dict, Any, List
-from ingest.pipeline import run_once
+import json, os, asyncio, socket
+from typing import Dict, Any, List, Optional
+import httpx
+from sqlalchemy.orm import Session
+from ingest.pipeline import make_client
+from ingest.stream import IngestStream
+from db.session import SessionLocal
+from ingest.http_cache import HTTP_CACHE
+from ingest.metrics import METRICS_TEXTFILE, export_textfile
+from ingest.ratelimit import configure_from_sources
+from ingest.sources import REGISTRY
+from ingest.sources.base import slug_candidates
+from ingest import work_queue
 
-REQUEST_DELAY = float(os.getenv("REQUEST_DELAY", "0.25"))
 SOURCES_JSON  = os.getenv("SOURCES_JSON", "data/sources.json")
 DEFAULT_DAYS  = int(os.getenv("JME_DAYS", "14"))
+SOURCE_CONCURRENCY = int(os.getenv("JME_SOURCE_CONCURRENCY", "4"))
+BULK_WRITE = os.getenv("JME_BULK_WRITE", "0") == "1"
+WORKER_MODE = os.getenv("JME_INGEST_WORKER", "0") == "1"  # claim sources from a shared batch
+RETRY_UNIT = "retry-queue"  # work item standing for IngestStream.retry_due()
 
-def main(path=SOURCES_JSON, days=DEFAULT_DAYS):
-    with open(path, "r", encoding="utf-8") as f:
-        sources: List[Dict[str, Any]] = json.load(f)
+async def resolve_sources(sources: List[Dict[str, Any]], client: httpx.AsyncClient,
+                          db: Optional[Session] = None) -> None:
+    """
+    Fill in `slug` for entries that only name a company, e.g.
+    {"provider": "greenhouse", "company": "Acme Corp", "candidates": ["acme"]}
+    (candidates default to slug_candidates(company)). Each lookup probes its
+    candidates concurrently and caches the answers in board_probes.
+    """
+    for src in sources:
+        if src.get("slug"):
+            continue
+        adapter = REGISTRY[src["provider"]](client)
+        candidates = src.get("candidates") or slug_candidates(src["company"])
+        src["slug"] = await adapter.resolve_board(src["company"], candidates, db)
+
+async def ingest_all(
+    sources: List[Dict[str, Any]],
+    days: int = DEFAULT_DAYS,
+    bulk: bool = BULK_WRITE,
+    client: Optional[httpx.AsyncClient] = None,
+    db: Optional[Session] = None,
+) -> Dict[str, int]:
+    """
+    Stream up to SOURCE_CONCURRENCY sources at a time over one shared client.
+    All sources share one IngestStream, so extraction runs in one process pool
+    and DB writes stay sequential while other boards keep downloading. A
+    failing source does not stop the others; the first error is re-raised
+    once everything is written. Request pacing is per host (ingest.ratelimit),
+    configured from `sources`. Due units of the retry queue are drained
+    first; boards retried there are not crawled a second time.
+    """
+    configure_from_sources(sources)
+    sem = asyncio.Semaphore(SOURCE_CONCURRENCY)
+    added: Dict[str, int] = {}
 
-    async def go():
-        for src in sources:
-            tag = f"{src['provider']}:{src['slug']}"
+    async def fetch(stream: IngestStream, client: httpx.AsyncClient, tag: str):
+        async with sem:
             print(f"=== {tag} ===")
-            await run_once(source=tag, days=days)  # fetch → normalize → save_to_db()
-            time.sleep(REQUEST_DELAY)
+            # fetch → normalize → extract → write, chunk by chunk; None on 304
+            added[tag] = await stream.ingest(client, tag, days) or 0
+
+    async def run(client: httpx.AsyncClient):
+        await resolve_sources(sources, client, db)
+        tags = [f"{src['provider']}:{src['slug']}" for src in sources if src.get("slug")]
+        async with IngestStream(db=db, bulk=bulk) as stream:
+            retried = set(await stream.retry_due(client, days))  # earlier failures first
+            tags = [t for t in tags if t not in retried]
+            results = await asyncio.gather(*(fetch(stream, client, t) for t in tags), return_exceptions=True)
+        print(f"[cache] {HTTP_CACHE.stats()}")
+        errors = [(tag, res) for tag, res in zip(tags, results) if isinstance(res, BaseException)]
+        for tag, e in errors:
+            print(f"[error] {tag}: {e!r}")
+        if errors:
+            raise errors[0][1]
+
+    if client is None:
+        async with make_client() as client:
+            await run(client)
+    else:
+        await run(client)
+    return added
+
+async def ingest_worker(
+    sources: List[Dict[str, Any]],
+    days: int = DEFAULT_DAYS,
+    bulk: bool = BULK_WRITE,
+    batch: Optional[str] = None,
+    worker: Optional[str] = None,
+    client: Optional[httpx.AsyncClient] = None,
+    db: Optional[Session] = None,
+) -> Dict[str, int]:
+    """
+    One of N processes sharing the nightly ingest (JME_INGEST_WORKER=1).
+    Every worker seeds the same ingest_work batch from `sources`, then
+    SOURCE_CONCURRENCY slots claim and ingest one source at a time until
+    the batch is drained (ingest.work_queue), heartbeating their claim. The retry queue is one more
+    work item, seeded first, so exactly one worker drains it. Returns the
+    jobs added per source by this worker; like ingest_all(), re-raises the
+    first error once its slots are done.
+    """
+    configure_from_sources(sources)
+    batch = batch or work_queue.default_batch()
+    worker = worker or f"{socket.gethostname()}:{os.getpid()}"
+    added: Dict[str, int] = {}
+    errors: List[tuple] = []
+
+    async def slot(stream: IngestStream, client: httpx.AsyncClient):
+        while (c := await asyncio.to_thread(work_queue.claim, batch, worker)) is not None:
+            print(f"=== {c.source} [{worker}] ===")
+            beat = asyncio.create_task(c.keep_alive())
+            try:
+                if c.source == RETRY_UNIT:
+                    n = len(await stream.retry_due(client, days))
+                else:
+                    n = added[c.source] = await stream.ingest(client, c.source, days) or 0
+            except Exception as e:
+                errors.append((c.source, e))
+                await asyncio.to_thread(c.finish, None, e)
+            except BaseException:
+                await asyncio.to_thread(c.release)  # cancelled: hand it to another worker
+                raise
+            else:
+                await asyncio.to_thread(c.finish, n)
+            finally:
+                beat.cancel()
+
+    async def run(client: httpx.AsyncClient):
+        await resolve_sources(sources, client, db)
+        tags = [f"{src['provider']}:{src['slug']}" for src in sources if src.get("slug")]
+        await asyncio.to_thread(work_queue.seed, batch, [RETRY_UNIT])
+        await asyncio.to_thread(work_queue.seed, batch, tags)
+        async with IngestStream(db=db, bulk=bulk, exclusive_writes=True) as stream:
+            await asyncio.gather(*(slot(stream, client) for _ in range(SOURCE_CONCURRENCY)))
+        print(f"[work] {worker}: {len(added)} sources; batch {batch} {await asyncio.to_thread(work_queue.progress, batch)}")
+        for tag, e in errors:
+            print(f"[error] {tag}: {e!r}")
+        if errors:
+            raise errors[0][1]
+
+    if client is None:
+        async with make_client() as client:
+            await run(client)
+    else:
+        await run(client)
+    return added
+
+def main(path=SOURCES_JSON, days=DEFAULT_DAYS, worker=WORKER_MODE):
+    with open(path, "r", encoding="utf-8") as f:
+        sources: List[Dict[str, Any]] = json.load(f)
 
-    asyncio.run(go())
+    try:
+        asyncio.run((ingest_worker if worker else ingest_all)(sources, days=days))
+    finally:
+        # failed runs are in the ledger too: export them so alerts can fire
+        if METRICS_TEXTFILE:
+            with SessionLocal() as db:
+                export_textfile(db, METRICS_TEXTFILE)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,88 @@
+# scripts/renormalize_descriptions.py
+from __future__ import annotations
+import argparse, os
+from sqlalchemy import bindparam, text as sql
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+from db.session import SessionLocal
+from ingest.dedupe import minhash, normalize_text, sha256_bytes, sig_to_bytes
+from ingest.html_text import html_to_text, memo_stats
+from ingest.pipeline import index_minhash, upsert_job_skills
+from ingest.skills_extract import build_matcher, extract_ids_many
+
+# tags or entities left in descriptions stored before HTML normalization
+MARKUP_RE = r"<[a-zA-Z/!]|&(lt|gt|amp|quot|nbsp|#[0-9]+|#x[0-9a-fA-F]+);"
+
+UPDATE_SQL = sql("""
+    UPDATE jobs SET description_text = :text, desc_hash = :desc_hash, minhash = :minhash, embedding = NULL
+    WHERE job_id = :job_id
+""")
+UNLINK_SQL = sql("DELETE FROM job_skills WHERE job_id = ANY(:ids) AND source = 'dict_v1'").bindparams(
+    bindparam("ids", type_=ARRAY(UUID(as_uuid=True)))
+)
+UNBAND_SQL = sql("DELETE FROM job_minhash_bands WHERE job_id = ANY(:ids)").bindparams(
+    bindparam("ids", type_=ARRAY(UUID(as_uuid=True)))
+)
+
+def renormalize(db, todo, n_process=1):
+    """
+    Store new texts for `(job_id, text)` pairs: desc_hash, MinHash signature
+    and LSH bands, and dict_v1 skill links follow the text (no commit).
+    """
+    sigs = [minhash(t) for _, t in todo]
+    ids = [job_id for job_id, _ in todo]
+    db.execute(UPDATE_SQL, [
+        {"job_id": job_id, "text": t, "desc_hash": sha256_bytes(normalize_text(t)),
+         "minhash": sig_to_bytes(sig) if sig is not None else None}
+        for (job_id, t), sig in zip(todo, sigs)
+    ])
+    db.execute(UNBAND_SQL, {"ids": ids})
+    index_minhash(db, list(zip(ids, sigs)))
+    db.execute(UNLINK_SQL, {"ids": ids})
+    found = extract_ids_many([t for _, t in todo], n_process=n_process)
+    upsert_job_skills(db, [
+        {"job_id": job_id, "skill_id": skill_id, "confidence": conf, "source": "dict_v1"}
+        for job_id, hits in zip(ids, found)
+        for skill_id, conf in hits
+    ])
+
+def main(batch=500, n_process=int(os.getenv("JME_EXTRACT_PROCS", "1")), dry_run=False):
+    """
+    One-off backfill: run html_to_text over stored descriptions that still
+    carry markup, then refresh desc_hash, the near-duplicate signature and
+    bands and the dict_v1 skill links, and clear the embedding so
+    scripts.backfill_job_embeddings recomputes it.
+    """
+    seen = changed = 0
+    with SessionLocal() as db:
+        build_matcher(db)
+        last_id = None
+        while True:
+            rows = db.execute(sql("""
+                SELECT j.job_id, j.description_text
+                FROM jobs j
+                WHERE (CAST(:last_id AS uuid) IS NULL OR j.job_id > :last_id)
+                  AND j.description_text ~ :markup
+                ORDER BY j.job_id
+                LIMIT :batch
+            """), {"last_id": last_id, "markup": MARKUP_RE, "batch": batch}).all()
+            if not rows:
+                break
+            seen += len(rows)
+            last_id = rows[-1].job_id
+            todo = [(r.job_id, t) for r in rows if (t := html_to_text(r.description_text)) != r.description_text]
+            changed += len(todo)
+            if dry_run or not todo:
+                continue
+
+            renormalize(db, todo, n_process)
+            db.commit()
+    verb = "Would re-normalize" if dry_run else "Re-normalized"
+    print(f"{verb} {changed}/{seen} descriptions with markup  (memo {memo_stats()})")
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--batch", type=int, default=500)
+    ap.add_argument("--procs", type=int, default=int(os.getenv("JME_EXTRACT_PROCS", "1")))
+    ap.add_argument("--dry-run", action="store_true", help="count affected rows, change nothing")
+    args = ap.parse_args()
+    main(batch=args.batch, n_process=args.procs, dry_run=args.dry_run)
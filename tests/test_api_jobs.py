@@ -33,3 +33,144 @@ def test_jobs_endpoint_empty_then_with_one(db_session):
     assert job["title"] == "ML Engineer"
     assert job["company"] == "Beta Inc"
 
+
+
+def test_city_and_mode_filters_use_normalized_columns(db_session):
+    import datetime as dt
+    from api.routers import cities, modes
+    from ingest.pipeline import save_to_db
+
+    now = dt.datetime.utcnow()
+    save_to_db([
+        {"title": "Data Engineer", "company": "Acme", "city": "Remote - Austin", "region": "TX", "country": "US",
+         "url": "https://example.com/jobs/1", "posted_at": now, "description_text": "Python"},
+        {"title": "Analyst", "company": "Acme", "city": "Austin", "region": "TX", "country": "US",
+         "url": "https://example.com/jobs/2", "posted_at": now, "description_text": "SQL"},
+        {"title": "ML Engineer", "company": "Beta", "city": "London (Hybrid)", "country": "GB",
+         "url": "https://example.com/jobs/3", "posted_at": now, "description_text": "PyTorch"},
+    ], db=db_session)
+
+    def titles(**params):
+        return sorted(j["title"] for j in client.get("/api/jobs", params=params).json()["items"])
+
+    assert titles(city="Austin, TX") == ["Analyst", "Data Engineer"]
+    assert titles(city="Austin, TX", mode="Remote") == ["Data Engineer"]
+    assert titles(mode="In-Office") == ["Analyst"]
+    assert titles(mode="hybrid", city="London, UK") == ["ML Engineer"]
+
+    for router in (cities, modes):
+        app.dependency_overrides[router.get_db] = lambda: (yield db_session)
+    assert client.get("/api/cities", params={"min_count": 1}).json() == [
+        {"city": "Austin, TX", "count": 2}, {"city": "London, UK", "count": 1}]
+    assert client.get("/api/modes").json() == [
+        {"mode": "Hybrid", "count": 1}, {"mode": "On-site", "count": 1}, {"mode": "Remote", "count": 1}]
+
+
+def test_q_is_full_text_search_ranked_by_relevance(db_session):
+    import datetime as dt
+    from ingest.pipeline import save_to_db
+
+    now = dt.datetime.utcnow()
+    save_to_db([
+        {"title": "Platform Engineer", "company": "Acme", "url": "https://example.com/jobs/1",
+         "posted_at": now, "description_text": "Kubernetes clusters and a little Python scripting."},
+        {"title": "Python Engineer", "company": "Beta", "url": "https://example.com/jobs/2",
+         "posted_at": now - dt.timedelta(days=3), "description_text": "Backend services in Python."},
+        {"title": "Accountant", "company": "Gamma", "url": "https://example.com/jobs/3",
+         "posted_at": now, "description_text": "Ledgers and audits."},
+    ], db=db_session)
+
+    def titles(**params):
+        return [j["title"] for j in client.get("/api/jobs", params=params).json()["items"]]
+
+    assert titles(q="python") == ["Platform Engineer", "Python Engineer"]  # newest first
+    assert titles(q="python", sort="relevance") == ["Python Engineer", "Platform Engineer"]
+    assert titles(q='"backend services" -kubernetes') == ["Python Engineer"]
+    assert titles(q="engineers") == ["Platform Engineer", "Python Engineer"]  # stemmed
+    # stopwords only: the tsquery is empty, so q is ignored instead of matching nothing
+    assert sorted(titles(q="the")) == ["Accountant", "Platform Engineer", "Python Engineer"]
+    assert sorted(titles(q="it or the", sort="relevance")) == ["Accountant", "Platform Engineer", "Python Engineer"]
+    assert client.get("/api/jobs", params={"sort": "salary"}).status_code == 422
+
+
+def test_cursor_pages_match_offset_pages(db_session):
+    import datetime as dt
+
+    now = dt.datetime.utcnow()
+    # ties on the sort key: job_id breaks them, so no row is skipped or repeated
+    for i in range(7):
+        db_session.add(Job(title=f"Job {i}", company="Acme", posted_at=now - dt.timedelta(days=i // 2)))
+    db_session.commit()
+
+    by_page = [j["job_id"] for p in (1, 2, 3) for j in
+               client.get("/api/jobs", params={"page": p, "page_size": 3}).json()["items"]]
+
+    by_cursor, cursor, pages = [], None, 0
+    while True:
+        params = {"page_size": 3, **({"cursor": cursor} if cursor else {})}
+        data = client.get("/api/jobs", params=params).json()
+        assert data["total"] == 7
+        by_cursor += [j["job_id"] for j in data["items"]]
+        pages += 1
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+
+    assert pages == 3
+    assert by_cursor == by_page
+    assert len(set(by_cursor)) == 7
+
+    assert client.get("/api/jobs", params={"with_total": False}).json()["total"] is None
+    assert client.get("/api/jobs", params={"cursor": "not-a-cursor"}).status_code == 400
+
+
+def test_skill_filter_resolves_aliases_with_all_and_any(db_session):
+    from sqlalchemy import select
+    from db.models import JobSkill, Skill
+    from api.services.skills import parse_terms
+
+    assert parse_terms(" Python, SQL,,py ") == ["python", "sql", "py"]
+
+    # seeded skills: python (alias "py", category language), postgresql (alias "postgres", category database)
+    ids = dict(db_session.execute(
+        select(Skill.name_canonical, Skill.skill_id).where(Skill.name_canonical.in_(["python", "postgresql"]))
+    ).all())
+    both = Job(title="Data Engineer", company="Acme", description_text="ETL work")
+    only_py = Job(title="Backend Engineer", company="Acme", description_text="APIs")
+    neither = Job(title="Designer", company="Beta", description_text="Figma prototypes")
+    db_session.add_all([both, only_py, neither])
+    db_session.flush()
+    db_session.add_all([
+        JobSkill(job_id=both.job_id, skill_id=ids["python"]),
+        JobSkill(job_id=both.job_id, skill_id=ids["postgresql"]),
+        JobSkill(job_id=only_py.job_id, skill_id=ids["python"]),
+    ])
+    db_session.commit()
+
+    def titles(**params):
+        return sorted(j["title"] for j in client.get("/api/jobs", params=params).json()["items"])
+
+    assert titles(skill="PY") == ["Backend Engineer", "Data Engineer"]
+    assert titles(skill="postgres") == ["Data Engineer"]
+    assert titles(skill="database") == ["Data Engineer"]
+    assert titles(skill="python, postgres") == ["Data Engineer"]
+    assert titles(skill="python, postgres", skill_match="any") == ["Backend Engineer", "Data Engineer"]
+    # not a known skill: matched against the indexed job text instead
+    assert titles(skill="figma") == ["Designer"]
+    assert titles(skill="figma, postgres", skill_match="any") == ["Data Engineer", "Designer"]
+
+
+def test_unknown_skill_the_parser_would_truncate_matches_nothing(db_session):
+    # "f#" is not a seeded skill and plainto_tsquery would reduce it to 'f'
+    db_session.add_all([
+        Job(title="Compiler Engineer", company="Acme", description_text="Type checkers in F# and C"),
+        Job(title="Platform Engineer", company="Acme", description_text="Plan f and g rollouts, full-stack"),
+    ])
+    db_session.commit()
+
+    def titles(**params):
+        return sorted(j["title"] for j in client.get("/api/jobs", params=params).json()["items"])
+
+    assert titles(skill="f#") == []
+    assert titles(skill="f#, full-stack", skill_match="any") == ["Platform Engineer"]
+    assert titles(skill="full-stack") == ["Platform Engineer"]
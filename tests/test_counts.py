@@ -0,0 +1,65 @@
+# tests/test_counts.py
+from fastapi.testclient import TestClient
+
+from api.main import app
+from api.services.counts import COUNTS, CountService, signature
+from db.models import Job
+
+client = TestClient(app)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_signature_only_uses_bound_filters():
+    where = "j.active AND j.city_norm = :city"
+    assert signature(where, {"city": "Austin, TX", "q": "x"}) == signature(where, {"city": "Austin, TX", "q": "y"})
+    assert signature(where, {"city": "Austin, TX"}) != signature(where, {"city": "London, UK"})
+
+
+def test_exact_counts_are_cached_until_ttl(db_session):
+    clock = Clock()
+    counts = CountService(ttl=60, estimate_above=10**9, cache_min=0, clock=clock)
+    db_session.add(Job(title="A", company="Acme"))
+    db_session.commit()
+
+    where, params = "j.company = :company", {"company": "Acme"}
+    assert counts.count(db_session, "jobs j", where, params) == (1, False)
+
+    db_session.add(Job(title="B", company="Acme"))
+    db_session.commit()
+    assert counts.count(db_session, "jobs j", where, params) == (1, False)  # cached
+
+    clock.now = 61
+    assert counts.count(db_session, "jobs j", where, params) == (2, False)
+
+
+def test_small_counts_are_not_cached(db_session):
+    counts = CountService(ttl=60, estimate_above=10**9, cache_min=1000)
+    where, params = "j.company = :company", {"company": "Acme"}
+    assert counts.count(db_session, "jobs j", where, params) == (0, False)
+    db_session.add(Job(title="A", company="Acme"))
+    db_session.commit()
+    assert counts.count(db_session, "jobs j", where, params) == (1, False)
+
+
+def test_broad_filters_return_planner_estimate(db_session, monkeypatch):
+    monkeypatch.setattr(COUNTS, "estimate_above", 1)
+    monkeypatch.setattr(COUNTS, "ttl", 0)
+    db_session.add(Job(title="A", company="Acme"))
+    db_session.commit()
+
+    data = client.get("/api/jobs").json()
+    assert data["total_is_estimate"] is True
+    assert data["total"] >= 1
+    assert len(data["items"]) == 1
+
+    monkeypatch.setattr(COUNTS, "estimate_above", 10**9)
+    data = client.get("/api/jobs").json()
+    assert data["total_is_estimate"] is False
+    assert data["total"] == 1
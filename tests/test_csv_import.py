@@ -0,0 +1,61 @@
+import asyncio
+import csv
+import datetime as dt
+from pathlib import Path
+
+import pytest
+from sqlalchemy import func, select
+
+from db.models import Job, JobSkill
+from ingest.csv_import import import_csv, read_jobdocs
+
+TANIUM = Path(__file__).resolve().parent.parent / "tanium_jobs.csv"
+COLUMNS = ["id", "title", "location", "absolute_url", "updated_at", "departments", "offices", "content_html"]
+
+
+def _write_export(path, rows):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=COLUMNS)
+        w.writeheader()
+        w.writerows({c: r.get(c, "") for c in COLUMNS} for r in rows)
+
+
+def test_import_csv_streams_chunks_and_is_idempotent(db_session, tmp_path):
+    path = tmp_path / "acme_jobs.csv"
+    _write_export(path, [{
+        "id": str(100 + i),
+        "title": f"Data Engineer {i}",
+        "location": "Austin, TX",
+        "absolute_url": f"https://boards.greenhouse.io/acme/jobs/{100 + i}",
+        "updated_at": "2025-09-23T15:53:16-04:00",
+        "content_html": f"&lt;p&gt;Role {i}: Python &amp;amp; SQL on team {i * 7919}.&lt;/p&gt;",
+    } for i in range(5)])
+
+    first = asyncio.run(import_csv(path, "acme", db=db_session, chunk_size=2, progress_every=2))
+    again = asyncio.run(import_csv(path, "acme", db=db_session, chunk_size=2))
+
+    assert first["rows"] == 5 and first["added"] == 5
+    assert again["rows"] == 5 and again["added"] == 0
+    job = db_session.scalars(select(Job).where(Job.external_id == "100")).one()
+    assert job.source == "csv:acme" and job.company == "Acme" and job.city == "Austin"
+    assert job.description_text == "Role 0: Python & SQL on team 0."
+    assert job.posted_at.replace(tzinfo=None) == dt.datetime(2025, 9, 23, 19, 53, 16)
+    assert db_session.scalar(select(func.count()).select_from(JobSkill)) >= 5
+
+
+def test_read_jobdocs_rejects_other_exports(tmp_path):
+    path = tmp_path / "other.csv"
+    path.write_text("name,link\nx,y\n", encoding="utf-8")
+
+    with pytest.raises(ValueError, match="id, title, absolute_url"):
+        next(read_jobdocs(path, "other"))
+
+
+@pytest.mark.parametrize("bulk", [True, False])
+def test_import_tanium_export(db_session, bulk):
+    stats = asyncio.run(import_csv(TANIUM, "tanium", db=db_session, bulk=bulk))
+
+    assert stats["rows"] == 130
+    assert 0 < stats["added"] == db_session.scalar(select(func.count(Job.job_id)))
+    stored = db_session.scalars(select(Job.description_text)).all()
+    assert not any("&lt;" in t or "<p>" in t for t in stored)
@@ -0,0 +1,91 @@
+import datetime as dt
+
+import pytest
+from sqlalchemy import func
+
+from db.models import Job, JobMinhashBand
+from ingest.dedupe import BANDS, ROWS, NUM_PERM, band_hashes, jaccard, lsh_params, minhash, shingles
+from ingest.pipeline import drop_near_duplicates, save_to_db
+
+BODY = " ".join(
+    f"Responsibility {i}: design, build and operate batch pipeline number {i} in Python and SQL."
+    for i in range(40)
+)
+
+
+def _posting(n, description, **extra):
+    return {
+        "title": "Data Engineer",
+        "company": "Zeta",
+        "city": "Remote",
+        "posted_at": dt.datetime.utcnow(),
+        "source": "test_seed",
+        "url": f"https://example.com/jobs/{n}",
+        "description_text": description,
+        **extra,
+    }
+
+
+def test_minhash_estimates_jaccard():
+    edited = "Posted 3 days ago. " + BODY.replace("operate", "run", 1)
+    a, b = shingles(BODY), shingles(edited)
+    exact = len(a & b) / len(a | b)
+
+    assert abs(jaccard(minhash(BODY), minhash(edited)) - exact) < 0.1
+    assert jaccard(minhash(BODY), minhash(BODY.upper())) == 1.0
+    assert jaccard(minhash(BODY), minhash("Line cook wanted for a busy kitchen downtown.")) < 0.1
+    assert minhash("") is None and minhash(" ?! ") is None
+
+
+def test_lsh_params_cover_the_signature():
+    assert BANDS * ROWS == NUM_PERM
+    assert lsh_params(0.8) == (16, 8)
+    assert lsh_params(0.5) == (32, 4)
+    assert len(band_hashes(minhash(BODY))) == BANDS
+
+
+@pytest.mark.parametrize("bulk", [False, True])
+def test_save_to_db_skips_near_duplicate_reposts(db_session, bulk):
+    first = save_to_db([_posting(1, BODY)], db=db_session, bulk=bulk)
+    job = db_session.query(Job).filter_by(url="https://example.com/jobs/1").one()
+    bands = db_session.query(func.count()).filter(JobMinhashBand.job_id == job.job_id).scalar()
+
+    repost = _posting(2, "Posted today! " + BODY + " Apply by Friday.")
+    other = _posting(3, BODY.replace("Python and SQL", "Go and Rust on bare metal"))
+    added = save_to_db([repost, other], db=db_session, bulk=bulk)
+
+    assert first == 1 and job.minhash is not None and bands == BANDS
+    assert added == 1
+    urls = {u for (u,) in db_session.query(Job.url)}
+    assert urls == {"https://example.com/jobs/1", "https://example.com/jobs/3"}
+
+
+def test_near_duplicates_within_one_chunk_and_threshold(db_session):
+    rows = [(_posting(n, text), None, b"") for n, text in
+            [(1, BODY), (2, BODY + " Relocation offered."), (3, "Sous chef, weekend shifts.")]]
+
+    kept = drop_near_duplicates(db_session, rows)
+    strict = drop_near_duplicates(db_session, rows, threshold=1.0)
+
+    assert [r[0]["url"] for r in kept] == ["https://example.com/jobs/1", "https://example.com/jobs/3"]
+    assert len(strict) == 3
+
+
+@pytest.mark.parametrize("bulk", [False, True])
+def test_regional_variants_of_one_req_are_both_stored(db_session, bulk):
+    # same boilerplate, different region in title and location: two jobs, not a repost
+    east = _posting(1, BODY + " Territory: Southeast.", title="Solution Engineer - Southeastern U.S.",
+                    city="Atlanta", region="GA")
+    west = _posting(2, BODY + " Territory: Southwest.", title="Solution Engineer - Southwest",
+                    city="Phoenix", region="AZ")
+    assert len(drop_near_duplicates(db_session, [(east, None, b""), (west, None, b"")])) == 2  # same chunk
+
+    save_to_db([east], db=db_session, bulk=bulk)
+    assert save_to_db([west], db=db_session, bulk=bulk) == 1  # later run
+    assert {t for (t,) in db_session.query(Job.title)} == {east["title"], west["title"]}
+
+def test_closed_jobs_do_not_swallow_reposts(db_session):
+    save_to_db([_posting(1, BODY)], db=db_session)
+    db_session.query(Job).update({Job.active: False})
+
+    assert save_to_db([_posting(2, BODY + " Reopened.")], db=db_session) == 1
@@ -0,0 +1,83 @@
+import asyncio
+import datetime as dt
+
+import httpx
+import pytest
+
+from ingest import pipeline
+from ingest.pipeline import iter_source, parse_job_page
+
+LIST_PAGE = """<html><body><ul>
+  <li><a href="/acme/jobs/1">Data Engineer</a></li>
+  <li><a href="https://boards.greenhouse.io/acme/jobs/2">Analytics Engineer</a></li>
+  <li><a href="/about">About us</a></li>
+</ul></body></html>"""
+
+JOB_PAGE = """<html><body>
+  <h1>{title}</h1>
+  <div class="location">Austin, TX</div>
+  <p>Posted on March 5, 2025</p>
+  <p>We use Python and SQL.</p>
+</body></html>"""
+
+
+def _handler(request: httpx.Request) -> httpx.Response:
+    if request.url.path == "/acme":
+        return httpx.Response(200, text=LIST_PAGE)
+    return httpx.Response(200, text=JOB_PAGE.format(title=request.url.path.rsplit("/", 1)[-1]))
+
+
+@pytest.fixture(params=[2, 0], ids=["processes", "thread"])
+def html_pool(request, monkeypatch):
+    monkeypatch.setattr(pipeline, "HTML_PROCESSES", request.param)
+    monkeypatch.setattr(pipeline, "_HTML_POOL", None)
+    yield
+    if pipeline._HTML_POOL is not None:
+        pipeline._HTML_POOL.shutdown()
+
+
+def test_html_crawl_parses_pages_off_the_event_loop(html_pool):
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(_handler)) as client:
+            return [it async for it in iter_source(client, "html:https://boards.greenhouse.io/acme", 7)]
+
+    items = sorted(asyncio.run(run()), key=lambda it: it["url"])
+
+    assert [it["title"] for it in items] == ["Data Engineer", "Analytics Engineer"]
+    assert all(it["source"] == "html" and it["city"] == "Austin" for it in items)
+    assert items[0]["posted_at"] == dt.datetime(2025, 3, 5)
+    assert "We use Python and SQL." in items[1]["description_text"]
+    assert (pipeline._HTML_POOL is not None) == (pipeline.HTML_PROCESSES > 0)
+
+
+def test_parse_job_page_without_location_or_date():
+    out = parse_job_page("<html><body><p>Remote-friendly role.</p></body></html>")
+
+    assert out["description_text"] == "Remote-friendly role."
+    assert out["location"] is None and out["posted_at"] is None
+
+
+def test_enrich_stubs_only_fetches_ahead_of_the_consumer(monkeypatch):
+    fetched = 0
+    lead = []
+
+    async def fake_enrich(client, stub):
+        nonlocal fetched
+        fetched += 1
+        await asyncio.sleep(0)
+        return {**stub, "description_text": "x"}
+
+    monkeypatch.setattr(pipeline, "enrich_job_html", fake_enrich)
+    stubs = [{"title": f"Job {i}", "url": f"https://example.com/jobs/{i}"} for i in range(200)]
+
+    async def run():
+        consumed = 0
+        async for _ in pipeline.enrich_stubs(None, "html:x", stubs):
+            consumed += 1
+            await asyncio.sleep(0.001)  # slow consumer
+            lead.append(fetched - consumed)
+        return consumed
+
+    assert asyncio.run(run()) == 200
+    # a full hand-over queue plus one page per worker, never the whole board
+    assert max(lead) <= 2 * pipeline.CONCURRENCY
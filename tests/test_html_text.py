@@ -0,0 +1,70 @@
+import pytest
+
+from ingest import html_text
+from ingest.html_text import html_to_text, memo_stats, normalize_description
+from ingest.sources import Greenhouse, Lever
+
+
+@pytest.fixture(params=["lxml", "stdlib"])
+def parser(request, monkeypatch):
+    if request.param == "stdlib":
+        monkeypatch.setattr(html_text, "etree", None)
+    elif html_text.etree is None:
+        pytest.skip("lxml not installed")
+    monkeypatch.setattr(html_text, "_MEMO", type(html_text._MEMO)())
+
+
+def test_escaped_greenhouse_content_becomes_plain_text(parser):
+    raw = ("&lt;p&gt;&lt;strong&gt;The basics&lt;/strong&gt;&lt;/p&gt;\n"
+           "&lt;p&gt;Join our R&amp;amp;D team&amp;nbsp;in Zürich.&lt;/p&gt;"
+           "&lt;ul&gt;&lt;li&gt;Python&lt;/li&gt;&lt;li&gt;SQL&lt;br&gt;and dbt&lt;/li&gt;&lt;/ul&gt;")
+    assert html_to_text(raw) == "The basics\nJoin our R&D team in Zürich.\nPython\nSQL\nand dbt"
+
+
+def test_raw_html_drops_scripts_and_collapses_whitespace(parser):
+    raw = "<div>  Build   <b>APIs</b>\n with  Go</div><script>var x = '<p>no</p>';</script><style>p{}</style>"
+    assert html_to_text(raw) == "Build APIs with Go"
+
+
+def test_plain_text_passes_through(parser):
+    assert html_to_text("Python, SQL &  Airflow\n\n\nKubernetes") == "Python, SQL & Airflow\nKubernetes"
+    assert html_to_text("") == ""
+    assert html_to_text(None) == ""
+
+
+def test_results_are_memoized_by_content(parser):
+    before = memo_stats()
+    html_to_text("<p>same body</p>")
+    html_to_text("<p>same body</p>")
+    after = memo_stats()
+    assert after["misses"] - before["misses"] == 1
+    assert after["hits"] - before["hits"] == 1
+
+
+def test_board_items_are_normalized_before_storage():
+    gh = normalize_description(Greenhouse().item("acme", {"id": 1, "content": "&lt;p&gt;Python&lt;/p&gt;"}))
+    lv = normalize_description(Lever().item("acme", {"id": "x", "description": "<div>Go &amp; Rust</div>"}))
+    plain = normalize_description(Lever().item("acme", {"id": "y", "descriptionPlain": "Go", "description": "<b>Go</b>"}))
+    assert (gh["description_text"], lv["description_text"], plain["description_text"]) == ("Python", "Go & Rust", "Go")
+    assert "description_html" not in gh
+
+
+def test_renormalize_refreshes_the_near_duplicate_signature(db_session):
+    from sqlalchemy import select
+    from db.models import Job, JobMinhashBand
+    from ingest.dedupe import band_hashes, minhash, sig_to_bytes
+    from ingest.pipeline import save_to_db
+    from scripts.renormalize_descriptions import renormalize
+
+    raw = " ".join(f"<p>Duty {i}: run <b>pipeline</b> {i} in Python &amp; SQL.</p>" for i in range(30))
+    save_to_db([{"title": "Data Engineer", "company": "Acme", "city": "Remote",
+                 "url": "https://example.com/jobs/1", "description_text": raw}], db=db_session)
+    job = db_session.scalars(select(Job)).one()
+    text = html_to_text(raw)
+
+    renormalize(db_session, [(job.job_id, text)])
+
+    db_session.refresh(job)
+    bands = set(db_session.execute(select(JobMinhashBand.band, JobMinhashBand.band_hash)).all())
+    assert job.description_text == text and job.minhash == sig_to_bytes(minhash(text))
+    assert bands == set(enumerate(band_hashes(minhash(text))))
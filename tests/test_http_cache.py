@@ -0,0 +1,111 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from ingest import pipeline
+from ingest.http_cache import HttpCache
+from ingest.sources import Greenhouse
+from ingest.stream import IngestStream
+
+
+class StubBoard:
+    """A local job-board API that honours If-None-Match / If-Modified-Since."""
+
+    def __init__(self):
+        self.etag = '"v1"'
+        self.jobs = [{
+            "id": 1,
+            "title": "Data Engineer",
+            "absolute_url": "https://boards.greenhouse.io/acme/jobs/1",
+            "updated_at": None,
+            "location": {"name": "Austin, TX"},
+            "content": "Python and Airflow.",
+        }]
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.requests.append((self.path, dict(self.headers)))
+                if self.path.startswith("/page"):
+                    if self.headers.get("If-Modified-Since") == "Wed, 01 Jan 2025 00:00:00 GMT":
+                        return self._send(304, b"")
+                    return self._send(200, b"<p>hello</p>", {"Last-Modified": "Wed, 01 Jan 2025 00:00:00 GMT"})
+                if self.headers.get("If-None-Match") == stub.etag:
+                    return self._send(304, b"")
+                self._send(200, json.dumps({"jobs": stub.jobs}).encode(), {"ETag": stub.etag})
+
+            def _send(self, status, body, headers=None):
+                self.send_response(status)
+                for k, v in (headers or {}).items():
+                    self.send_header(k, v)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def board(tmp_path, monkeypatch):
+    stub = StubBoard()
+    monkeypatch.setattr(Greenhouse, "API_BASE", f"{stub.url}/v1/boards")
+    monkeypatch.setattr(pipeline, "HTTP_CACHE", HttpCache(tmp_path))
+    yield stub
+    stub.close()
+
+
+def _ingest(db, source):
+    async def run():
+        async with httpx.AsyncClient() as client:
+            async with IngestStream(db=db) as s:
+                return await s.ingest(client, source, days=7)
+    return asyncio.run(run())
+
+
+def test_unchanged_board_short_circuits_on_304(board, db_session):
+    assert _ingest(db_session, "greenhouse:acme") == 1
+    assert _ingest(db_session, "greenhouse:acme") is None
+
+    assert board.requests[1][1].get("If-None-Match") == '"v1"'
+    assert pipeline.HTTP_CACHE.stats() == {"hits": 1, "misses": 1}
+
+
+def test_changed_board_is_downloaded_again(board, db_session):
+    _ingest(db_session, "greenhouse:acme")
+    board.etag = '"v2"'
+    board.jobs.append({**board.jobs[0], "id": 2, "absolute_url": "https://boards.greenhouse.io/acme/jobs/2",
+                       "content": "Scala and Spark."})
+
+    assert _ingest(db_session, "greenhouse:acme") == 1
+    assert pipeline.HTTP_CACHE.stats() == {"hits": 0, "misses": 2}
+
+
+def test_fetch_serves_cached_body_on_304(board):
+    async def run():
+        async with httpx.AsyncClient() as client:
+            return [await pipeline.fetch(client, f"{board.url}/page") for _ in range(2)]
+
+    assert asyncio.run(run()) == ["<p>hello</p>", "<p>hello</p>"]
+    assert pipeline.HTTP_CACHE.hits == 1
+
+
+def test_failed_write_forgets_validators(board, db_session):
+    _ingest(db_session, "greenhouse:acme")
+    pipeline.forget_source("greenhouse:acme")
+
+    assert _ingest(db_session, "greenhouse:acme") == 0  # downloaded again, already stored
+    assert "If-None-Match" not in board.requests[1][1]
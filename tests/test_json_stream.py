@@ -0,0 +1,63 @@
+import asyncio
+import json
+
+import pytest
+
+from ingest import json_stream
+from ingest.json_stream import iter_array
+
+DOC = {
+    "meta": {"total": 3, "note": "before the array, with a ] and a } inside"},
+    "jobs": [
+        {"id": 123, "title": "Data Engineer – Zürich 🚀", "content": "<p>Python &amp; SQL</p>", "pay": 1.5e5},
+        {"id": 124, "title": "Analyst", "tags": [], "remote": True, "location": None},
+        {"id": 125, "title": "Engineer\\nII", "nested": {"a": [1, {"b": "]"}]}},
+    ],
+    "after": 42,
+}
+
+
+def _chunks(data: bytes, size: int):
+    async def gen():
+        for i in range(0, len(data), size):
+            yield data[i:i + size]
+    return gen()
+
+
+def _collect(data: bytes, size: int, key):
+    async def run():
+        return [obj async for obj in iter_array(_chunks(data, size), key)]
+    return asyncio.run(run())
+
+
+@pytest.fixture(params=["fallback", "ijson"])
+def parser(request, monkeypatch):
+    if request.param == "fallback":
+        monkeypatch.setattr(json_stream, "ijson", None)
+    elif json_stream.ijson is None:
+        pytest.skip("ijson not installed")
+    return request.param
+
+
+@pytest.mark.parametrize("size", [1, 2, 7, 64, 1 << 20])
+def test_iter_array_matches_json_loads_for_any_chunking(parser, size):
+    data = json.dumps(DOC, ensure_ascii=False).encode("utf-8")
+    assert _collect(data, size, "jobs") == DOC["jobs"]
+
+
+def test_top_level_array_and_edge_cases(parser):
+    assert _collect(json.dumps(DOC["jobs"]).encode(), 5, None) == DOC["jobs"]
+    assert _collect(b'{"jobs": []}', 3, "jobs") == []
+    assert _collect(b'{"other": [1, 2]}', 3, "jobs") == []
+    assert _collect(b' [ 1 , 22 , 333 ] ', 1, None) == [1, 22, 333]
+
+
+def test_truncated_document_raises(parser):
+    with pytest.raises(Exception):
+        _collect(b'{"jobs": [{"id": 1}, {"id": 2', 4, "jobs")
+
+
+def test_numbers_split_across_chunks(parser):
+    data = b'{"jobs": [1, 2.5, -0.25e-3, 1E+2, 40, {"pay": 12.75}], "n": 3.5}'
+    assert _collect(data, 1, "jobs") == [1, 2.5, -0.25e-3, 1e2, 40, {"pay": 12.75}]
+    assert _collect(b"[1,2.5]", 1, None) == [1, 2.5]
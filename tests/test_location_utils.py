@@ -0,0 +1,33 @@
+import pytest
+
+from ingest.location_utils import normalize_city, normalize_mode
+
+
+@pytest.mark.parametrize("city, region, country, expected", [
+    ("San Francisco", "CA", "US", "San Francisco, CA"),
+    ("London", None, "GB", "London, UK"),
+    ("Munich", "Bavaria", "DE", "Munich, DE"),
+    ("Remote - Austin", "TX", "US", "Austin, TX"),
+    ("Berlin (Hybrid)", None, "DE", "Berlin, DE"),
+    ("Bengaluru; Karnataka", None, "IN", "Bengaluru, IN"),
+    ("Remote", "N/A", "US", "Remote, US"),
+    ("Distributed", None, None, "Remote"),
+    ("EMEA", "Ontario", "CA", "Ontario, CA"),
+    ("N/A", "N/A", "N/A", None),
+    (None, None, None, None),
+])
+def test_normalize_city(city, region, country, expected):
+    assert normalize_city(city, region, country) == expected
+
+
+@pytest.mark.parametrize("city, remote_flag, expected", [
+    ("Remote - Austin", False, "Remote"),
+    ("Home based, UK", False, "Remote"),
+    ("Berlin (Hybrid)", False, "Hybrid"),
+    ("Austin", True, "Remote"),
+    ("Austin", False, "On-site"),
+    ("Remotely", False, "On-site"),  # whole words only
+    (None, False, "On-site"),
+])
+def test_normalize_mode(city, remote_flag, expected):
+    assert normalize_mode(city, remote_flag) == expected
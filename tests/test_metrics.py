@@ -0,0 +1,80 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+from sqlalchemy import select
+
+from db.models import IngestRun, IngestStageStat
+from ingest import pipeline
+from ingest.http_cache import HttpCache
+from ingest.metrics import export_textfile, render_textfile
+from ingest.stream import IngestStream
+
+
+def _board() -> dict:
+    job = lambda i, text: {
+        "id": i,
+        "title": f"Engineer {i}",
+        "absolute_url": f"https://boards.greenhouse.io/acme/jobs/{i}",
+        "updated_at": None,
+        "location": {"name": "Austin, TX"},
+        "content": text,
+    }
+    return {"jobs": [job(1, "Python and SQL."), job(2, "Go and Kafka."), job(3, "Python and SQL.")]}
+
+
+def _streamed(payload: dict) -> httpx.Response:
+    # a body that arrives over the "wire", so num_bytes_downloaded counts it
+    async def body():
+        yield json.dumps(payload).encode()
+    return httpx.Response(200, content=body())
+
+
+@pytest.fixture(autouse=True)
+def no_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(pipeline, "HTTP_CACHE", HttpCache(tmp_path, enabled=False))
+    monkeypatch.setattr(pipeline, "RETRY_BACKOFF", 0)
+
+
+def _ingest(db, handler, source="greenhouse:acme"):
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            async with IngestStream(db=db) as s:
+                return await s.ingest(client, source, days=7)
+    return asyncio.run(run())
+
+
+def test_every_run_is_recorded_with_stage_timings(db_session):
+    assert _ingest(db_session, lambda r: _streamed(_board())) == 2
+
+    run = db_session.scalars(select(IngestRun)).one()
+    assert (run.source, run.status, run.errors) == ("greenhouse:acme", "ok", 0)
+    assert (run.items_seen, run.items_skipped, run.items_added) == (3, 1, 2)
+    assert run.bytes_downloaded > 100 and run.seconds > 0
+    stages = {s.stage: s for s in db_session.scalars(select(IngestStageStat).where(IngestStageStat.run_id == run.run_id))}
+    assert set(stages) == {"fetch", "parse", "extract", "dedupe", "write"}
+    assert stages["parse"].calls == 3 and stages["write"].calls == 1
+
+
+def test_failed_run_counts_retries_and_is_exported(db_session, tmp_path):
+    with pytest.raises(httpx.HTTPStatusError):
+        _ingest(db_session, lambda r: httpx.Response(503), source="greenhouse:down")
+    _ingest(db_session, lambda r: _streamed(_board()))
+
+    failed = db_session.scalars(select(IngestRun).where(IngestRun.source == "greenhouse:down")).one()
+    assert failed.status == "error" and "503" in failed.error
+    assert failed.errors == pipeline.MAX_RETRIES  # two retried attempts + the final failure
+
+    out = tmp_path / "metrics" / "jme_ingest.prom"
+    export_textfile(db_session, out)
+    text = out.read_text()
+    assert 'jme_ingest_run_ok{source="greenhouse:down"} 0' in text
+    assert 'jme_ingest_run_ok{source="greenhouse:acme"} 1' in text
+    assert 'jme_ingest_items{source="greenhouse:acme",outcome="added"} 2' in text
+    assert 'jme_ingest_stage_seconds{source="greenhouse:acme",stage="fetch"}' in text
+    assert text.count("# TYPE jme_ingest_errors gauge") == 1
+
+
+def test_render_textfile_without_runs(db_session):
+    assert render_textfile(db_session).startswith("# HELP jme_ingest_last_run_timestamp_seconds")
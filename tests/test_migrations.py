@@ -7,3 +7,34 @@ def test_alembic_head_exists():
     script = ScriptDirectory.from_config(cfg)
     head = script.get_current_head()
     assert head is not None
+
+def test_skill_indexes_survive_aliases_that_are_not_json(alembic_cfg, db_session):
+    from alembic import command
+    from sqlalchemy import create_engine, text
+
+    # CREATE INDEX CONCURRENTLY waits for the per-test transaction to end
+    db_session.get_bind().rollback()
+    engine = create_engine(alembic_cfg.get_main_option("sqlalchemy.url"))
+    command.downgrade(alembic_cfg, "3c8e1f5a7d29")
+    try:
+        with engine.begin() as conn:
+            conn.execute(text(
+                "INSERT INTO skills (name_canonical, category, aliases_json) "
+                "VALUES ('hand-edited', 'tool', 'foo, bar')"
+            ))
+        command.upgrade(alembic_cfg, "head")
+        with engine.begin() as conn:
+            aliases = conn.execute(text(
+                "SELECT aliases_json FROM skills WHERE name_canonical = 'hand-edited'"
+            )).scalar_one()
+            valid = conn.execute(text(
+                "SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                "WHERE c.relname = 'skills_aliases_idx'"
+            )).scalar_one()
+        assert aliases == "[]"
+        assert valid
+    finally:
+        command.upgrade(alembic_cfg, "head")
+        with engine.begin() as conn:
+            conn.execute(text("DELETE FROM skills WHERE name_canonical = 'hand-edited'"))
+        engine.dispose()
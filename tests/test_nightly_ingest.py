@@ -0,0 +1,69 @@
+import asyncio
+
+import httpx
+import pytest
+from sqlalchemy import func
+
+from db.models import Job
+import scripts.nightly_ingest as nightly
+
+
+def _greenhouse_board(slug: str) -> dict:
+    return {"jobs": [{
+        "id": 1,
+        "title": f"Data Engineer at {slug}",
+        "absolute_url": f"https://boards.greenhouse.io/{slug}/jobs/1",
+        "updated_at": None,
+        "location": {"name": "Austin, TX"},
+        "content": f"{slug} builds pipelines with Python and Airflow.",
+    }]}
+
+
+def _client(handler) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def test_ingest_all_shares_client_and_writes_every_source(db_session):
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        slug = request.url.path.split("/")[3]
+        seen.append(slug)
+        return httpx.Response(200, json=_greenhouse_board(slug))
+
+    sources = [{"provider": "greenhouse", "slug": s} for s in ("alpha", "beta", "gamma")]
+    added = asyncio.run(nightly.ingest_all(sources, days=7, client=_client(handler), db=db_session))
+
+    assert sorted(seen) == ["alpha", "beta", "gamma"]
+    assert added == {"greenhouse:alpha": 1, "greenhouse:beta": 1, "greenhouse:gamma": 1}
+    assert db_session.query(func.count(Job.job_id)).scalar() == 3
+
+
+def test_ingest_all_keeps_going_when_one_source_fails(db_session):
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        slug = request.url.path.split("/")[3]
+        if slug == "broken":
+            return httpx.Response(404)
+        return httpx.Response(200, json=_greenhouse_board(slug))
+
+    sources = [{"provider": "greenhouse", "slug": s} for s in ("broken", "alpha")]
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(nightly.ingest_all(sources, days=7, client=_client(handler), db=db_session))
+
+    assert db_session.query(func.count(Job.job_id)).scalar() == 1
+
+
+def test_ingest_all_resolves_company_only_sources(db_session):
+    def handler(request: httpx.Request) -> httpx.Response:
+        parts = request.url.path.split("/")  # /v1/boards/<slug>[/jobs]
+        if parts[3] != "acme":
+            return httpx.Response(404, json={})
+        return httpx.Response(200, json=_greenhouse_board("acme") if len(parts) > 4 else {"name": "Acme"})
+
+    sources = [{"provider": "greenhouse", "company": "Acme Corp"},
+               {"provider": "greenhouse", "company": "Nobody", "candidates": ["nobody"]}]
+    added = asyncio.run(nightly.ingest_all(sources, days=7, client=_client(handler), db=db_session))
+
+    assert sources[0]["slug"] == "acme" and sources[1]["slug"] is None
+    assert added == {"greenhouse:acme": 1}
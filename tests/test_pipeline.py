@@ -1,5 +1,5 @@
 import datetime as dt
-from sqlalchemy import func
+from sqlalchemy import func, text
 
 from db.session import SessionLocal
 from db.models import Job, Skill, JobSkill
@@ -51,3 +51,72 @@ def test_save_to_db_idempotent_by_url_or_hash(db_session):
 
     jobs_after = db_session.query(func.count(Job.job_id)).scalar()
     assert jobs_after == jobs_before + 1  # deduped by hash
+
+def test_save_to_db_dedupes_within_one_batch(db_session):
+    base = {
+        "title": "Data Engineer",
+        "company": "Gamma",
+        "city": "Remote",
+        "posted_at": dt.datetime.utcnow(),
+        "source": "test_seed",
+    }
+    items = [
+        {**base, "url": "https://example.com/jobs/1?utm_source=x", "description_text": "Spark and Scala."},
+        {**base, "url": "https://example.com/jobs/1", "description_text": "Spark and Scala, reposted."},
+        {**base, "url": "https://example.com/jobs/2", "description_text": "Spark and Scala."},
+        {**base, "url": "https://example.com/jobs/3", "description_text": "dbt and Snowflake."},
+    ]
+
+    added = save_to_db(items, db=db_session)
+
+    assert added == 2
+    assert db_session.query(func.count(Job.job_id)).scalar() == 2
+
+def test_save_to_db_backfills_hashes_on_existing_url(db_session):
+    db_session.add(Job(title="Analyst", company="Delta", url="https://example.com/jobs/42"))
+    db_session.flush()
+
+    items = [{
+        "title": "Analyst",
+        "company": "Delta",
+        "source": "test_seed",
+        "url": "https://example.com/jobs/42",
+        "description_text": "Excel and Tableau.",
+    }]
+    added = save_to_db(items, db=db_session)
+
+    job = db_session.query(Job).filter_by(url="https://example.com/jobs/42").one()
+    assert added == 0
+    assert job.url_hash is not None
+    assert job.desc_hash is not None
+
+def test_save_to_db_bulk_path_writes_jobs_and_skills(db_session):
+    base = {
+        "title": "Platform Engineer",
+        "company": "Epsilon",
+        "city": "Remote",
+        "posted_at": dt.datetime.utcnow(),
+        "source": "test_seed",
+    }
+    items = [
+        {**base, "url": "https://example.com/jobs/501", "description_text": "Python and Kubernetes."},
+        {**base, "url": "https://example.com/jobs/502", "description_text": "Terraform on AWS."},
+        {**base, "url": "https://example.com/jobs/502", "description_text": "Terraform on AWS, again."},
+    ]
+
+    added = save_to_db(items, db=db_session, bulk=True)
+    again = save_to_db(items, db=db_session, bulk=True)
+
+    assert added == 2
+    assert again == 0
+    job = db_session.query(Job).filter_by(url="https://example.com/jobs/501").one()
+    assert job.url_hash is not None and job.seniority is not None
+    linked = (
+        db_session.query(Skill.name_canonical)
+        .join(JobSkill, JobSkill.skill_id == Skill.skill_id)
+        .filter(JobSkill.job_id == job.job_id)
+        .all()
+    )
+    assert {"python", "kubernetes"} <= {n for (n,) in linked}
+    staged = db_session.execute(text("SELECT COUNT(*) FROM jobs_stage")).scalar()
+    assert staged == 0
@@ -0,0 +1,81 @@
+import asyncio
+from datetime import datetime, timezone
+
+import httpx
+
+from ingest import pipeline
+from ingest.ratelimit import LIMITER, HostLimiter, TokenBucket, configure_from_sources, parse_retry_after
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_bucket_allows_burst_then_paces_at_rate():
+    clock = FakeClock()
+    b = TokenBucket(rate=2, burst=2, clock=clock)
+    assert [b.reserve() for _ in range(2)] == [0.0, 0.0]
+    assert b.reserve() == 0.5
+    assert b.reserve() == 1.0
+    clock.now = 5.0  # idle refills, capped at burst
+    assert [b.reserve() for _ in range(3)] == [0.0, 0.0, 0.5]
+
+
+def test_throttle_honors_retry_after_and_recovers():
+    clock = FakeClock()
+    limiter = HostLimiter(rate=4, burst=4, clock=clock)
+    url = "https://api.lever.co/v0/postings/acme"
+    limiter.observe(url, 429, {"Retry-After": "30"})
+    b = limiter.bucket(url)
+    assert b.rate == 2
+    assert b.reserve() == 30
+    for _ in range(20):
+        limiter.observe(url, 200)
+    assert b.rate == 4
+    # other hosts are unaffected
+    assert limiter.bucket("https://boards-api.greenhouse.io/v1/boards/x/jobs").reserve() == 0
+
+
+def test_parse_retry_after_accepts_seconds_and_http_dates():
+    now = datetime(2025, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+    assert parse_retry_after("7") == 7
+    assert parse_retry_after("Wed, 01 Jan 2025 12:00:10 GMT", now=now) == 10
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def test_per_provider_limits_from_sources():
+    limiter = HostLimiter(rate=4, burst=4)
+    configure_from_sources([
+        {"provider": "greenhouse", "slug": "a"},
+        {"provider": "lever", "slug": "b", "rate_per_sec": 0.5, "burst": 1},
+    ], limiter)
+    assert limiter.bucket("api.lever.co").rate == 0.5
+    assert limiter.bucket("api.lever.co").burst == 1
+    assert limiter.bucket("boards-api.greenhouse.io").rate == 4
+
+
+def test_get_json_retries_after_429(monkeypatch):
+    monkeypatch.setattr(pipeline, "RETRY_BACKOFF", 0)
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.host)
+        if len(calls) == 1:
+            return httpx.Response(429, headers={"Retry-After": "0"})
+        return httpx.Response(200, json={"jobs": []})
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await pipeline._get_json(client, "https://ratelimit.test/jobs")
+
+    try:
+        assert asyncio.run(run()) == {"jobs": []}
+        assert len(calls) == 2
+        assert LIMITER.bucket("ratelimit.test").rate < LIMITER.rate
+    finally:
+        LIMITER.reset()
@@ -0,0 +1,107 @@
+import asyncio
+
+import httpx
+import pytest
+from sqlalchemy import select, text as sql
+
+from db.models import IngestRetry, Job
+from ingest import pipeline
+from ingest.http_cache import HttpCache
+from ingest.retry_queue import RETRY_BASE
+from ingest.stream import IngestStream
+
+BOARD = "greenhouse:acme"
+HTML = "html:https://boards.greenhouse.io/acme"
+
+
+def _board() -> dict:
+    return {"jobs": [{
+        "id": i, "title": f"Engineer {i}", "updated_at": None, "location": {"name": "Austin, TX"},
+        "absolute_url": f"https://boards.greenhouse.io/acme/jobs/{i}", "content": f"Posting {i}: Python.",
+    } for i in (1, 2)]}
+
+
+def _html(down: set):
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/acme":
+            return httpx.Response(200, text='<a href="/acme/jobs/1">Data Engineer</a>'
+                                             '<a href="/acme/jobs/2">Analytics Engineer</a>')
+        if request.url.path in down:
+            return httpx.Response(503)
+        return httpx.Response(200, text=f"<h1>Job</h1><p>{request.url.path} needs SQL.</p>")
+    return handler
+
+
+@pytest.fixture(autouse=True)
+def fast(tmp_path, monkeypatch):
+    monkeypatch.setattr(pipeline, "HTTP_CACHE", HttpCache(tmp_path, enabled=False))
+    monkeypatch.setattr(pipeline, "RETRY_BACKOFF", 0)
+    monkeypatch.setattr(pipeline, "HTML_PROCESSES", 0)
+    monkeypatch.setattr(pipeline, "_HTML_POOL", None)
+
+
+def _run(db, handler, fn):
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            async with IngestStream(db=db) as s:
+                return await fn(s, client)
+    return asyncio.run(run())
+
+
+def _ingest(db, handler, source):
+    return _run(db, handler, lambda s, client: s.ingest(client, source, days=7))
+
+
+def _retry(db, handler):
+    return _run(db, handler, lambda s, client: s.retry_due(client, days=7))
+
+
+def _make_due(db):
+    db.execute(sql("UPDATE ingest_retries SET next_attempt_at = now() - interval '1 second'"))
+
+
+def test_failed_board_backs_off_then_drains(db_session):
+    for _ in range(2):
+        with pytest.raises(httpx.HTTPStatusError):
+            _ingest(db_session, lambda r: httpx.Response(503), BOARD)
+
+    unit = db_session.scalars(select(IngestRetry)).one()
+    assert (unit.source, unit.kind, unit.attempts) == (BOARD, "board", 2)
+    assert unit.url == "https://boards-api.greenhouse.io/v1/boards/acme/jobs?content=true"
+    delay = db_session.execute(sql("SELECT extract(epoch FROM next_attempt_at - now()) FROM ingest_retries")).scalar()
+    assert float(delay) == pytest.approx(2 * RETRY_BASE.total_seconds())
+    assert _retry(db_session, lambda r: httpx.Response(200, json=_board())) == []  # not due yet
+
+    _make_due(db_session)
+    assert _retry(db_session, lambda r: httpx.Response(200, json=_board())) == [BOARD]
+    assert db_session.scalars(select(IngestRetry)).all() == []
+    assert db_session.scalar(select(Job.job_id).where(Job.source == BOARD).limit(1)) is not None
+
+
+def test_missing_board_is_not_queued(db_session):
+    with pytest.raises(httpx.HTTPStatusError):
+        _ingest(db_session, lambda r: httpx.Response(404), BOARD)
+
+    assert db_session.scalars(select(IngestRetry)).all() == []
+
+
+def test_failed_posting_is_refetched_without_a_recrawl(db_session):
+    assert _ingest(db_session, _html({"/acme/jobs/2"}), HTML) == 1
+
+    unit = db_session.scalars(select(IngestRetry)).one()
+    assert (unit.kind, unit.attempts) == ("posting", 1)
+    assert unit.payload == {"title": "Analytics Engineer", "url": "https://boards.greenhouse.io/acme/jobs/2",
+                            "source": "html"}
+
+    _make_due(db_session)
+    fetched = []
+
+    def handler(request):
+        fetched.append(request.url.path)
+        return _html(set())(request)
+
+    assert _retry(db_session, handler) == []
+    assert fetched == ["/acme/jobs/2"]
+    assert db_session.scalars(select(IngestRetry)).all() == []
+    titles = db_session.scalars(select(Job.title).where(Job.url.like("%/acme/jobs/%"))).all()
+    assert sorted(titles) == ["Analytics Engineer", "Data Engineer"]
@@ -1,6 +1,6 @@
 import pytest
 from db.session import SessionLocal
-from ingest.skills_extract import build_matcher, extract
+from ingest.skills_extract import build_matcher, extract, extract_ids, extract_many, skill_id_map
 
 @pytest.fixture(scope="module", autouse=True)
 def _build():
@@ -19,3 +19,91 @@ def test_aliases_work():
     skills = dict(extract(txt))
     assert "scikit-learn" in skills
     assert "kubernetes" in skills
+
+def test_extract_ids_resolves_without_queries():
+    ids = skill_id_map()
+    assert "python" in ids and "kubernetes" in ids
+
+    found = dict(extract_ids("We love sklearn and k8s."))
+    assert ids["scikit-learn"] in found
+    assert ids["kubernetes"] in found
+
+def test_matcher_cache_follows_dictionary_version(db_session, tmp_path, monkeypatch):
+    import ingest.skills_extract as se
+    from db.models import Skill
+
+    monkeypatch.setattr(se, "MATCHER_CACHE_DIR", tmp_path)
+    build_matcher(db_session)
+    first = se._MATCHER
+    build_matcher(db_session)
+    assert se._MATCHER is first  # same dictionary -> reused
+
+    py = db_session.query(Skill).filter_by(name_canonical="python").one()
+    py.aliases_json = '["py", "pyth0n"]'
+    db_session.flush()
+    build_matcher(db_session)
+    assert se._MATCHER is not first
+    assert "python" in dict(extract("Strong pyth0n skills"))
+
+    # a cold process loads the prebuilt matcher from disk, not from `skills`
+    assert list(tmp_path.glob("*.spacy"))
+    monkeypatch.setattr(se, "_MATCHER", None)
+    monkeypatch.setattr(se, "_skills_from_db", lambda db: pytest.fail("dictionary re-read"))
+    build_matcher(db_session)
+    assert "python" in dict(extract("Strong pyth0n skills"))
+
+def test_extract_many_matches_extract_in_order():
+    texts = [
+        "We use Python, Pandas and scikit-learn on Kubernetes.",
+        "",
+        "We love sklearn and k8s.",
+        "Nothing relevant here.",
+    ] * 5
+    expected = [extract(t) for t in texts]
+
+    assert extract_many(texts, batch_size=3) == expected
+    assert extract_many(texts, n_process=2, batch_size=3) == expected
+
+def test_automaton_reports_overlapping_matches():
+    from ingest.aho_corasick import Automaton
+
+    a = Automaton(["spring", "spring boot", "boot", "ts"], accelerate=False)
+    assert sorted(a.iter("spring boot, ts")) == [
+        (0, 6, "spring"), (0, 11, "spring boot"), (7, 11, "boot"), (13, 15, "ts"),
+    ]
+
+TRICKY = [
+    "C#/.NET", "c++11", "Node.JS,", "C++-based", "scikit -learn", "scikit- learn",
+    "Node.JS's", "scikit-learn's", "react.js/node.js", "c++17/14", "R.", "ci/cd",
+    "Spring-Boot", "Go,Rust", "e.g. Python", "node.js.", "We use C#/.NET  and\tNode.JS, C++.",
+]
+
+def test_token_spans_match_spacy():
+    from ingest.en_tokens import token_spans
+    from ingest.skills_extract import _ensure_nlp
+
+    nlp = _ensure_nlp()
+    for t in TRICKY:
+        doc = nlp.make_doc(t)
+        want = [(w.idx, w.idx + len(w)) for w in doc if not w.is_space]
+        assert token_spans(t) == want, t
+
+def test_aho_backend_matches_spacy_on_eval_samples(monkeypatch):
+    import json
+    from pathlib import Path
+    import ingest.skills_extract as se
+
+    lines = Path("data/eval_samples.jsonl").read_text(encoding="utf-8").splitlines()
+    texts = [json.loads(l)["text"] for l in lines]
+    texts += ["Node.js and R&D work.", "Python/SQL; scikit - learn (k8s)."]
+    texts += TRICKY
+
+    with SessionLocal() as db:
+        build_matcher(db)
+        expected = extract_many(texts)
+        monkeypatch.setattr(se, "BACKEND", "aho")
+        build_matcher(db)
+        assert se._BACKEND == "aho"
+        assert extract_many(texts) == expected
+        monkeypatch.setattr(se, "BACKEND", "spacy")
+        build_matcher(db)
@@ -0,0 +1,149 @@
+import asyncio
+import datetime as dt
+
+import httpx
+import pytest
+from sqlalchemy import select
+
+from db.models import BoardProbe
+from ingest import pipeline
+from ingest.pipeline import iter_source
+from ingest.ratelimit import LIMITER, HostLimiter
+from ingest.sources import REGISTRY, Greenhouse, Lever
+from ingest.sources.base import SourceAdapter, slug_candidates
+
+LIVE = {"acme", "acme-labs"}
+
+
+class ProbeServer:
+    """Greenhouse board-metadata endpoint that 404s unknown slugs and tracks overlap."""
+
+    def __init__(self, fail=()):
+        self.calls = []
+        self.fail = set(fail)
+        self.in_flight = self.peak = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        slug = request.url.path.rsplit("/", 1)[-1]
+        self.calls.append(slug)
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        if slug in self.fail:
+            return httpx.Response(503)
+        return httpx.Response(200 if slug in LIVE else 404, json={})
+
+
+def _resolve(server, candidates, db, provider=Greenhouse):
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(server)) as client:
+            adapter = provider(client, limiter=HostLimiter(rate=1000, burst=100))
+            return await adapter.resolve_board("Acme", candidates, db)
+    return asyncio.run(run())
+
+
+def test_resolve_board_probes_concurrently_and_caches_hits_and_misses(db_session):
+    server = ProbeServer()
+    candidates = ["acme-inc", "acmeinc", "acme", "acme-labs"]
+
+    first = _resolve(server, candidates, db_session)
+    second = _resolve(server, candidates, db_session)
+
+    assert first == second == "acme"  # first live slug in candidate order
+    assert sorted(server.calls) == sorted(candidates)  # all probed once, none on the second run
+    assert server.peak > 1
+    cached = {p.slug: p.found for p in db_session.scalars(select(BoardProbe))}
+    assert cached == {"acme-inc": False, "acmeinc": False, "acme": True, "acme-labs": True}
+
+
+def test_resolve_board_does_not_cache_errors_and_expires_misses(db_session):
+    server = ProbeServer(fail={"acme"})
+    assert _resolve(server, ["acme-inc", "acme"], db_session) is None
+
+    db_session.execute(
+        BoardProbe.__table__.update().values(checked_at=dt.datetime.now(dt.timezone.utc) - dt.timedelta(days=8))
+    )
+    server.fail.clear()
+    assert _resolve(server, ["acme-inc", "acme"], db_session) == "acme"
+    assert len(server.calls) == 4  # the 503 was not cached and the miss had expired
+
+
+def test_slug_candidates():
+    assert slug_candidates("The Home Depot") == ["homedepot", "home-depot", "thehomedepot", "home"]
+    assert slug_candidates("Cloudflare, Inc.") == ["cloudflare", "cloudflareinc"]
+
+
+class Toy(SourceAdapter):
+    name = "toy"
+    API_BASE = "https://toy.test/api"
+    JSON_KEY = "postings"
+
+    def probe_url(self, slug):
+        return f"{self.API_BASE}/{slug}"
+
+    def board_url(self, board_id):
+        return f"{self.API_BASE}/{board_id}/postings"
+
+    def item(self, board_id, raw):
+        return {"title": raw["name"], "company": board_id, "url": raw["link"],
+                "description_text": raw["body"], "source": f"toy:{board_id}", "external_id": raw["id"]}
+
+
+def test_iter_source_dispatches_through_registry(monkeypatch, tmp_path):
+    monkeypatch.setitem(REGISTRY, "toy", Toy)
+    monkeypatch.setattr(pipeline, "HTTP_CACHE", pipeline.HTTP_CACHE.__class__(tmp_path))
+    body = {"postings": [{"id": "7", "name": "Welder", "link": "https://toy.test/j/7", "body": "MIG and TIG."}]}
+    transport = httpx.MockTransport(lambda r: httpx.Response(200, json=body))
+
+    async def run():
+        async with httpx.AsyncClient(transport=transport) as client:
+            return [it async for it in iter_source(client, "toy:shop", 7)]
+
+    items = asyncio.run(run())
+
+    assert [(it["title"], it["source"], it["external_id"]) for it in items] == [("Welder", "toy:shop", "7")]
+    assert pipeline.board_url("toy:shop") == "https://toy.test/api/shop/postings"
+    assert pipeline.board_url("html:https://example.com") is None
+
+
+def test_builtin_adapters_are_registered():
+    assert REGISTRY["greenhouse"] is Greenhouse and REGISTRY["lever"] is Lever
+    assert pipeline.board_url("greenhouse:acme") == "https://boards-api.greenhouse.io/v1/boards/acme/jobs?content=true"
+    assert pipeline.board_url("lever:acme") == "https://api.lever.co/v0/postings/acme?mode=json"
+
+
+def test_request_delay_paces_only_that_adapter():
+    host = "boards-api.greenhouse.io"
+    shared = LIMITER.bucket(host).rate
+
+    slow = Greenhouse(request_delay=2.0)
+
+    assert slow.limiter is not LIMITER and slow.limiter.bucket(host).rate == 0.5
+    assert LIMITER.bucket(host).rate == shared
+    assert Greenhouse().limiter is LIMITER
+
+
+class CountingLimiter(HostLimiter):
+    def __init__(self):
+        super().__init__(rate=1000, burst=100)
+        self.urls = []
+
+    async def acquire(self, url):
+        self.urls.append(url)
+        await super().acquire(url)
+
+
+@pytest.mark.parametrize("stream", [True, False])
+def test_board_fetches_are_paced_by_the_adapters_limiter(monkeypatch, tmp_path, stream):
+    monkeypatch.setattr(pipeline, "STREAM_JSON", stream)
+    monkeypatch.setattr(pipeline, "HTTP_CACHE", pipeline.HTTP_CACHE.__class__(tmp_path, enabled=False))
+    own = CountingLimiter()
+    body = {"jobs": [{"id": 1, "title": "Welder"}]}
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(lambda r: httpx.Response(200, json=body))) as client:
+            return await Greenhouse(client, limiter=own).fetch_jobs("acme")
+
+    assert [j["id"] for j in asyncio.run(run())] == [1]
+    assert own.urls == [Greenhouse().board_url("acme")]
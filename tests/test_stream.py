@@ -0,0 +1,68 @@
+import asyncio
+import time
+
+import httpx
+from sqlalchemy import func, select
+
+from db.models import Job, JobSkill, SourceState
+from ingest import stream as stream_mod
+from ingest.stream import IngestStream
+
+
+def _board(n: int) -> dict:
+    return {"jobs": [{
+        "id": i,
+        "title": f"Engineer {i}",
+        "absolute_url": f"https://boards.greenhouse.io/acme/jobs/{i}",
+        "updated_at": None,
+        "location": {"name": "Austin, TX"},
+        "content": f"Role {i}: Python, SQL and Docker.",
+    } for i in range(n)]}
+
+
+def test_stream_writes_every_chunk_through_the_process_pool(db_session, monkeypatch):
+    monkeypatch.setattr(stream_mod, "BATCH_SIZE", 2)
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, json=_board(7)))
+
+    async def run():
+        async with httpx.AsyncClient(transport=transport) as client:
+            async with IngestStream(db=db_session, n_process=2) as s:
+                return await s.ingest(client, "greenhouse:acme", days=7)
+
+    assert asyncio.run(run()) == 7
+    assert db_session.scalar(select(func.count(Job.job_id))) == 7
+    assert db_session.scalar(select(func.count()).select_from(JobSkill)) >= 7
+    assert len(db_session.get(SourceState, "greenhouse:acme").job_ids) == 7
+
+
+def test_stream_backpressure_bounds_items_in_flight(db_session, monkeypatch):
+    batch = 5
+    monkeypatch.setattr(stream_mod, "BATCH_SIZE", batch)
+    produced = 0
+    lag = []
+
+    async def fake_source(client, source, days):
+        nonlocal produced
+        for i in range(200):
+            produced += 1
+            yield {"title": f"t{i}", "company": "Acme", "url": f"https://example.com/{i}",
+                   "description_text": f"posting {i} with Python", "source": "seed"}
+
+    real_write = IngestStream._write
+
+    def slow_write(self, chunk):
+        time.sleep(0.01)  # DB slower than the producer
+        n = real_write(self, chunk)
+        lag.append(produced - len(lag) * batch - len(chunk))
+        return n
+
+    monkeypatch.setattr(stream_mod, "iter_source", fake_source)
+    monkeypatch.setattr(IngestStream, "_write", slow_write)
+
+    async def run():
+        async with IngestStream(db=db_session) as s:
+            return await s.ingest(None, "seed", days=7)
+
+    assert asyncio.run(run()) == 200
+    # at most: a full queue on each side, one chunk per stage, one being built
+    assert max(lag) <= (2 * stream_mod.QUEUE_DEPTH + 3) * batch
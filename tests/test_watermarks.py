@@ -0,0 +1,168 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from api.main import app
+from db.models import Job, SourceState
+from ingest import pipeline
+from ingest import stream as stream_mod
+from ingest.http_cache import HttpCache
+from ingest.stream import IngestStream
+
+SOURCE = "greenhouse:acme"
+client = TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def no_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(pipeline, "HTTP_CACHE", HttpCache(tmp_path, enabled=False))
+
+
+def _posting(ext_id: str, posted_at: datetime, text: str = "") -> dict:
+    return {
+        "id": int(ext_id),
+        "title": f"Engineer {ext_id}",
+        "absolute_url": f"https://boards.greenhouse.io/acme/jobs/{ext_id}",
+        "updated_at": posted_at.isoformat() + "Z",
+        "location": {"name": "Austin, TX"},
+        "content": text or f"Posting {ext_id} needs Python and SQL.",
+    }
+
+
+def _ingest(db, board: list, source: str = SOURCE) -> int:
+    payload = {"jobs": board} if source.startswith("greenhouse:") else board
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, json=payload))
+
+    async def run():
+        async with httpx.AsyncClient(transport=transport) as http:
+            async with IngestStream(db=db) as s:
+                return await s.ingest(http, source, days=7)
+    return asyncio.run(run())
+
+
+@pytest.fixture
+def parsed(monkeypatch):
+    """external_ids of the postings that got past the watermark (into HTML → text)."""
+    seen = []
+    real = stream_mod.normalize_description
+
+    def spy(it):
+        seen.append(it.get("external_id"))
+        return real(it)
+
+    monkeypatch.setattr(stream_mod, "normalize_description", spy)
+    return seen
+
+
+def test_second_run_only_processes_the_delta(db_session, parsed):
+    t0 = datetime.utcnow() - timedelta(days=2)
+    board = [_posting("1", t0), _posting("2", t0)]
+    assert _ingest(db_session, board) == 2
+
+    state = db_session.get(SourceState, SOURCE)
+    assert sorted(state.job_ids) == ["1", "2"]
+
+    # unchanged board: nothing reaches the writer
+    parsed.clear()
+    assert _ingest(db_session, board) == 0
+    assert parsed == []
+
+    # posting 2 was edited, posting 3 is new
+    changed = [_posting("1", t0), _posting("2", t0 + timedelta(hours=1)), _posting("3", t0)]
+    _ingest(db_session, changed)
+    assert sorted(parsed) == ["2", "3"]
+
+
+def test_lever_edits_are_found_by_their_update_timestamp(db_session, parsed):
+    created = datetime.utcnow() - timedelta(days=2)
+
+    def lever(updated: datetime, text: str) -> dict:
+        return {
+            "id": "a1", "text": "Engineer", "hostedUrl": "https://jobs.lever.co/acme/a1",
+            "createdAt": int((created - datetime(1970, 1, 1)).total_seconds() * 1000),
+            "updatedAt": int((updated - datetime(1970, 1, 1)).total_seconds() * 1000),
+            "categories": {"location": "Austin, TX"}, "descriptionPlain": text,
+        }
+
+    assert _ingest(db_session, [lever(created, "Ship Python services.")], "lever:acme") == 1
+    parsed.clear()
+    _ingest(db_session, [lever(created, "Ship Python services.")], "lever:acme")
+    assert parsed == []
+
+    # createdAt (posted_at) stays put; only updatedAt moves
+    _ingest(db_session, [lever(created + timedelta(hours=1), "Ship Go services.")], "lever:acme")
+    assert parsed == ["a1"]
+    assert db_session.scalars(select(Job.description_text)).all() == ["Ship Go services."]
+
+def test_vanished_postings_are_marked_inactive_and_hidden(db_session):
+    t0 = datetime.utcnow() - timedelta(days=1)
+    _ingest(db_session, [_posting("1", t0), _posting("2", t0)])
+    _ingest(db_session, [_posting("1", t0)])
+
+    active = dict(db_session.execute(select(Job.external_id, Job.active)).all())
+    assert active == {"1": True, "2": False}
+
+    titles = [j["title"] for j in client.get("/api/jobs").json()["items"]]
+    assert titles == ["Engineer 1"]
+
+    # the posting comes back: revived, not duplicated
+    _ingest(db_session, [_posting("1", t0), _posting("2", t0)])
+    assert db_session.scalar(select(Job.active).where(Job.external_id == "2")) is True
+    assert len(db_session.scalars(select(Job.job_id)).all()) == 2
+
+
+def test_repost_under_a_new_id_takes_over_the_stored_row(db_session):
+    t0 = datetime.utcnow() - timedelta(days=1)
+    text = "Staff engineer for the payments platform: Python, Kafka and SQL."
+    _ingest(db_session, [_posting("1", t0, text)])
+
+    # one run: id 1 leaves the board, id 2 arrives with the same title and description
+    _ingest(db_session, [{**_posting("2", t0, text), "title": "Engineer 1"}])
+    rows = db_session.execute(select(Job.external_id, Job.active, Job.url)).all()
+    assert rows == [("2", True, "https://boards.greenhouse.io/acme/jobs/2")]
+    assert [j["title"] for j in client.get("/api/jobs").json()["items"]] == ["Engineer 1"]
+
+    # closed by a later run, then reposted once more: live again under the new id
+    _ingest(db_session, [])
+    assert db_session.scalar(select(Job.active)) is False
+    _ingest(db_session, [{**_posting("3", t0, text), "title": "Engineer 1"}])
+    assert db_session.execute(select(Job.external_id, Job.active)).all() == [("3", True)]
+
+
+def test_same_text_under_two_live_ids_stays_one_row(db_session):
+    t0 = datetime.utcnow() - timedelta(days=1)
+    text = "Data analyst, dashboards in Tableau and SQL."
+    _ingest(db_session, [_posting("1", t0, text)])
+    _ingest(db_session, [_posting("1", t0, text), _posting("2", t0, text)])
+
+    assert db_session.execute(select(Job.external_id, Job.active)).all() == [("1", True)]
+
+
+def test_edited_postings_update_their_row(db_session):
+    from db.models import JobSkill, Skill
+
+    t0 = datetime.utcnow() - timedelta(days=2)
+    _ingest(db_session, [_posting("1", t0, "Backend engineer: Python and PostgreSQL.")])
+    _ingest(db_session, [_posting("1", t0 + timedelta(hours=1), "Backend engineer: Go and Kubernetes.")])
+
+    job = db_session.scalars(select(Job)).one()
+    db_session.refresh(job)
+    assert job.description_text == "Backend engineer: Go and Kubernetes."
+    skills = set(db_session.scalars(
+        select(Skill.name_canonical).join(JobSkill, JobSkill.skill_id == Skill.skill_id)
+        .where(JobSkill.job_id == job.job_id)
+    ))
+    assert "kubernetes" in skills and "python" not in skills
+
+
+def test_edited_repost_takes_over_the_near_duplicate_row(db_session):
+    t0 = datetime.utcnow() - timedelta(days=1)
+    text = " ".join(f"Duty {i}: build and run ingest pipeline {i} with Python and SQL." for i in range(40))
+    _ingest(db_session, [_posting("1", t0, text)])
+
+    _ingest(db_session, [{**_posting("2", t0, "Reposted! " + text), "title": "Engineer 1"}])
+    assert db_session.execute(select(Job.external_id, Job.active)).all() == [("2", True)]
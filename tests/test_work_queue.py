@@ -0,0 +1,115 @@
+import asyncio
+import uuid
+
+import httpx
+import pytest
+from sqlalchemy import func, text as sql
+from sqlalchemy.exc import OperationalError
+
+from db.models import Job
+from db.session import SessionLocal
+from ingest import work_queue
+from ingest.dedupe import sha256_bytes
+from ingest.pipeline import lock_rows
+import scripts.nightly_ingest as nightly
+
+
+@pytest.fixture
+def batch():
+    name = f"test-{uuid.uuid4()}"
+    yield name
+    with SessionLocal() as s:  # claims commit for real
+        s.execute(sql("SET LOCAL lock_timeout = '5s'"))  # a failed test may leave a claim open
+        s.execute(sql("DELETE FROM ingest_work WHERE batch = :b"), {"b": name})
+        s.commit()
+
+
+def _handler(fetched):
+    def handler(request: httpx.Request) -> httpx.Response:
+        slug = request.url.path.split("/")[3]
+        fetched.append(slug)
+        return httpx.Response(200, json={"jobs": [{
+            "id": 1, "title": f"Data Engineer at {slug}", "updated_at": None,
+            "absolute_url": f"https://boards.greenhouse.io/{slug}/jobs/1",
+            "location": {"name": "Austin, TX"}, "content": f"{slug} builds pipelines with Python.",
+        }]})
+    return handler
+
+
+def test_claims_skip_locked_rows_and_released_rows_come_back(batch):
+    work_queue.seed(batch, ["a", "b"])
+    work_queue.seed(batch, ["a", "c"])  # idempotent
+
+    first = work_queue.claim(batch, "w1")
+    second = work_queue.claim(batch, "w2")
+    assert (first.source, second.source) == ("a", "b")
+
+    first.release()  # w1 died
+    second.finish(3)
+    again = work_queue.claim(batch, "w3")
+    assert again.source == "a"
+    again.finish(None, RuntimeError("boom"))
+    last = work_queue.claim(batch, "w3")
+    assert last.source == "c"
+    last.finish(0)
+
+    assert work_queue.claim(batch, "w4") is None
+    assert work_queue.progress(batch) == {"done": 2, "failed": 1}
+
+
+def test_workers_share_a_batch_without_duplicates_or_lost_sources(db_session, batch):
+    sources = [{"provider": "greenhouse", "slug": s} for s in ("alpha", "beta", "gamma")]
+    work_queue.seed(batch, [nightly.RETRY_UNIT])
+    work_queue.seed(batch, ["greenhouse:beta"])
+    held = work_queue.claim(batch, "other")  # another worker is mid-run on the retry queue...
+    busy = work_queue.claim(batch, "other")  # ...and on beta
+    assert (held.source, busy.source) == (nightly.RETRY_UNIT, "greenhouse:beta")
+
+    fetched = []
+    run = lambda name: asyncio.run(nightly.ingest_worker(
+        sources, days=7, batch=batch, worker=name,
+        client=httpx.AsyncClient(transport=httpx.MockTransport(_handler(fetched))), db=db_session))
+
+    assert run("w1") == {"greenhouse:alpha": 1, "greenhouse:gamma": 1}
+    held.finish(0)
+    busy.release()  # the other worker crashed before finishing beta
+    assert run("w2") == {"greenhouse:beta": 1}
+    assert run("w3") == {}
+
+    assert sorted(fetched) == ["alpha", "beta", "gamma"]
+    assert db_session.query(func.count(Job.job_id)).scalar() == 3
+    assert work_queue.progress(batch) == {"done": 4}
+
+
+def test_claims_commit_and_stale_claims_are_taken_over(batch):
+    work_queue.seed(batch, ["a"])
+    first = work_queue.claim(batch, "w1")
+    with SessionLocal() as s:  # the claim is a committed row, not a lock held by w1
+        row = s.execute(sql("SELECT status, worker FROM ingest_work WHERE batch = :b FOR UPDATE NOWAIT"),
+                        {"b": batch}).one()
+    assert tuple(row) == ("claimed", "w1")
+    assert work_queue.claim(batch, "w2") is None and first.heartbeat()
+
+    with SessionLocal() as s:  # w1 hangs and stops heartbeating
+        s.execute(sql("UPDATE ingest_work SET heartbeat_at = now() - interval '10 minutes' WHERE batch = :b"),
+                  {"b": batch})
+        s.commit()
+    taken = work_queue.claim(batch, "w2", stale=60)
+    assert taken.source == "a"
+    assert not first.heartbeat()
+    first.finish(5)  # too late: the claim is w2's now
+    assert work_queue.progress(batch) == {"claimed": 1}
+    taken.finish(2)
+    assert work_queue.progress(batch) == {"done": 1}
+
+
+def test_row_locks_only_block_writers_of_the_same_posting():
+    a, b = sha256_bytes("https://example.com/jobs/a"), sha256_bytes("https://example.com/jobs/b")
+    with SessionLocal() as one, SessionLocal() as two:
+        lock_rows(one, [a])
+        two.execute(sql("SET LOCAL lock_timeout = '200ms'"))
+        lock_rows(two, [b])  # another posting: no wait
+        with pytest.raises(OperationalError):
+            lock_rows(two, [a, b])
+        one.rollback()
+        two.rollback()
@@ -1,6 +1,6 @@
 "use client";
 
-import { useEffect, useMemo, useState } from "react";
+import { useEffect, useMemo, useRef, useState } from "react";
 import { useRouter, useSearchParams } from "next/navigation";
 import { fetchJSON } from "@/lib/api";
 import CitySelect from "@/components/CitySelect";
@@ -57,8 +57,8 @@ type Job = {
   remote_flag?: boolean;
 };
 
-type JobsResp = { total: number; page: number; page_size: number; items: Job[] };
-type SortMode = "newest" | "title" | "company";
+type JobsResp = { total: number; total_is_estimate: boolean; page: number; page_size: number; next_cursor: string | null; items: Job[] };
+type SortMode = "newest" | "relevance" | "title" | "company";
 
 /* ------------------------ component ------------------------ */
 
@@ -81,6 +81,10 @@ export default function JobsClient() {
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState<string | null>(null);
 
+  // next_cursor of each page we have seen, keyed by the page it opens;
+  // cleared whenever the filters or the sort change
+  const cursors = useRef<{ key: string; byPage: Record<number, string> }>({ key: "", byPage: {} });
+
   // hydrate filters from URL on first mount
   useEffect(() => {
     const q0    = params.get("q") || "";
@@ -122,13 +126,22 @@ export default function JobsClient() {
       setLoading(true);
       setError(null);
 
-      fetchJSON<JobsResp>("/api/jobs", {  params: { q, city, mode, skill, days, page, page_size: 20 },})
-        .then((data) => setResp(data))
+      // relevance and newest are ordered server-side; title/company re-sort the page below
+      const apiSort = sort === "relevance" ? "relevance" : "newest";
+      const key = JSON.stringify([q, city, mode, skill, days, apiSort]);
+      if (cursors.current.key !== key) cursors.current = { key, byPage: {} };
+      // a known cursor fetches the page by keyset; otherwise fall back to page/offset
+      const cursor = cursors.current.byPage[page];
+      fetchJSON<JobsResp>("/api/jobs", {  params: { q, city, mode, skill, days, page, cursor, page_size: 20, sort: apiSort },})
+        .then((data) => {
+          if (data.next_cursor) cursors.current.byPage[page + 1] = data.next_cursor;
+          setResp(data);
+        })
         .catch((e) => setError(String(e)))
         .finally(() => setLoading(false));
 
       return () => ac.abort();
-    }, [q, city, mode, skill, days, page]);
+    }, [q, city, mode, skill, days, page, sort]);
 
   // skill typeahead
   useEffect(() => {
@@ -181,7 +194,7 @@ export default function JobsClient() {
           <input
             value={skill}
             onChange={e => { setPage(1); setSkill(e.target.value); }}
-            placeholder="e.g. python"
+            placeholder="e.g. python, sql"
             className="bg-transparent border rounded px-3 py-2 min-w-[200px]"
             list="skill-suggest"
           />
@@ -233,6 +246,7 @@ export default function JobsClient() {
             className="bg-transparent border rounded px-3 py-2"
           >
             <option value="newest">Newest</option>
+            <option value="relevance">Relevance</option>
             <option value="title">Title (A→Z)</option>
             <option value="company">Company (A→Z)</option>
           </select>
@@ -259,7 +273,7 @@ export default function JobsClient() {
       {!loading && resp && resp.total > 0 && (
         <>
           <div className="text-sm opacity-70">
-            Showing {(resp.page - 1) * resp.page_size + 1}–{Math.min(resp.page * resp.page_size, resp.total)} of {resp.total}
+            Showing {(resp.page - 1) * resp.page_size + 1}–{Math.min(resp.page * resp.page_size, resp.total)} of {resp.total_is_estimate ? `about ${resp.total.toLocaleString()}` : resp.total}
           </div>
 
           <ul className="divide-y divide-neutral-800 rounded border">
@@ -295,7 +309,7 @@ export default function JobsClient() {
               Prev
             </button>
             <div className="text-sm opacity-80">Page {page} / {totalPages}</div>
-            <button disabled={page >= totalPages} onClick={() => setPage((p) => Math.min(totalPages, p + 1))} className="border rounded px-3 py-2 disabled:opacity-50">
+            <button disabled={page >= totalPages && !resp.next_cursor} onClick={() => setPage((p) => p + 1)} className="border rounded px-3 py-2 disabled:opacity-50">
               Next
             </button>
           </div>